@@ -0,0 +1 @@
+# Offline micro-benchmarks (run from the repo root: python -m benchmarks.<name>).
@@ -0,0 +1,56 @@
+"""
+Contact queue push/pop cost vs. number of pending contacts.
+
+    python -m benchmarks.contact_queue [--pending 1000 100000 300000] [--ops 2000] [--path /tmp/q.sqlite3]
+
+The queue is prefilled to each size (panel-sized batches, mixed priorities), then
+`ops` single-contact pushes and pops are timed. Per-operation cost should stay
+roughly flat as the queue grows (indexed, O(log n)). Uses an in-memory database
+unless --path is given.
+"""
+import argparse
+import os
+import time
+from typing import Dict, List
+
+from logic.contact_queue import ContactItem, ContactQueue
+
+
+def _contacts(start: int, count: int) -> List[ContactItem]:
+    return [ContactItem(phone_number=f"0912{n:07d}", priority=n % 3) for n in range(start, start + count)]
+
+
+def _measure(pending: int, ops: int, path: str) -> Dict[str, float]:
+    if path and os.path.exists(path):
+        os.remove(path)
+    queue = ContactQueue(path)
+    for start in range(0, pending, 500):
+        queue.push(_contacts(start, min(500, pending - start)))
+
+    started = time.perf_counter()
+    for n in range(pending, pending + ops):
+        queue.push(_contacts(n, 1))
+    push_us = (time.perf_counter() - started) / ops * 1e6
+
+    started = time.perf_counter()
+    for _ in range(ops):
+        queue.pop()
+    pop_us = (time.perf_counter() - started) / ops * 1e6
+    queue.close()
+    return {"push": push_us, "pop": pop_us}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pending", type=int, nargs="+", default=[1000, 100_000, 300_000])
+    parser.add_argument("--ops", type=int, default=2000)
+    parser.add_argument("--path", default="")
+    args = parser.parse_args()
+    print(f"{'pending':>8} | {'push us':>8} | {'pop us':>8}")
+    for pending in args.pending:
+        result = _measure(pending, args.ops, args.path)
+        print(f"{pending:>8} | {result['push']:>8.1f} | {result['pop']:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
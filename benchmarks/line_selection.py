@@ -0,0 +1,123 @@
+"""
+Outbound line selection cost vs. number of lines: LineScheduler vs. the old linear scan.
+
+    python -m benchmarks.line_selection [--lines 10 100 500] [--ops 20000]
+
+Both sides run the same workload: pick a line, originate on it, and hang up the
+oldest call once `concurrent` calls per line are up, so lines keep cycling between
+eligible and full. The legacy scan is reproduced here as it was: a dict of stats per
+line with a deque of datetime attempts pruned on every check.
+"""
+import argparse
+import time
+from collections import deque
+from datetime import date, datetime, timedelta
+from typing import Deque, Dict, Optional, Tuple
+
+from logic.line_scheduler import LineScheduler
+
+
+PER_MINUTE = 1_000_000
+PER_DAY = 1_000_000_000
+
+
+class _LegacyLines:
+    def __init__(self, lines: list, max_concurrent: int):
+        self.max_concurrent = max_concurrent
+        self.waiting_inbound: Dict[str, int] = {}
+        self.line_stats = {
+            line: {
+                "active": 0,
+                "inbound_active": 0,
+                "attempts": deque(),
+                "daily": 0,
+                "daily_marker": date.today(),
+                "last_originated_ts": 0.0,
+            }
+            for line in lines
+        }
+
+    def _prune(self, stats: dict) -> None:
+        cutoff = datetime.utcnow() - timedelta(minutes=1)
+        attempts: Deque[datetime] = stats["attempts"]
+        while attempts and attempts[0] < cutoff:
+            attempts.popleft()
+        today = date.today()
+        if stats["daily_marker"] != today:
+            stats["daily_marker"] = today
+            stats["daily"] = 0
+
+    def select(self) -> Optional[str]:
+        now_mono = time.monotonic()
+        best = None
+        best_load = None
+        for line, stats in self.line_stats.items():
+            self._prune(stats)
+            if self.waiting_inbound.get(line, 0) > 0:
+                continue
+            # The 1s per-line gap is disabled here so both sides see the same eligible set.
+            total_active = stats["active"] + stats["inbound_active"]
+            if total_active >= self.max_concurrent:
+                continue
+            if len(stats["attempts"]) >= PER_MINUTE or stats["daily"] >= PER_DAY:
+                continue
+            load = (total_active, len(stats["attempts"]), stats["daily"])
+            if best_load is None or load < best_load:
+                best, best_load = line, load
+        return best
+
+    def take(self, line: str) -> None:
+        stats = self.line_stats[line]
+        stats["active"] += 1
+        stats["attempts"].append(datetime.utcnow())
+        stats["daily"] += 1
+        stats["last_originated_ts"] = time.monotonic()
+
+    def release(self, line: str) -> None:
+        self.line_stats[line]["active"] -= 1
+
+
+class _Clock:
+    """Fake monotonic clock: 1.1s per tick, so the per-second bucket never blocks."""
+
+    def __init__(self) -> None:
+        self.now = 0
+
+    def __call__(self) -> int:
+        return self.now
+
+
+def _run(lines_impl, ops: int, line_count: int, concurrent: int, clock: Optional[_Clock] = None) -> Tuple[float, int]:
+    calls: Deque[str] = deque()
+    limit = line_count * concurrent
+    started = time.perf_counter()
+    for _ in range(ops):
+        if clock is not None:
+            clock.now += 1_100_000_000
+        if len(calls) >= limit:
+            lines_impl.release(calls.popleft())
+        line = lines_impl.select()
+        if line is not None:
+            lines_impl.take(line)
+            calls.append(line)
+    return (time.perf_counter() - started) / ops, len(calls)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lines", type=int, nargs="+", default=[10, 100, 500])
+    parser.add_argument("--ops", type=int, default=20000)
+    parser.add_argument("--concurrent", type=int, default=2)
+    args = parser.parse_args()
+    print(f"{'lines':>6} | {'legacy us/op':>12} | {'scheduler us/op':>15} | {'speedup':>7}")
+    for count in args.lines:
+        names = [f"0219100{i:04d}" for i in range(count)]
+        legacy, _ = _run(_LegacyLines(names, args.concurrent), args.ops, count, args.concurrent)
+        clock = _Clock()
+        scheduler = LineScheduler(names, args.concurrent, PER_MINUTE, PER_DAY, clock=clock)
+        current, _ = _run(scheduler, args.ops, count, args.concurrent, clock)
+        print(f"{count:>6} | {legacy * 1e6:>12.1f} | {current * 1e6:>15.1f} | {legacy / current:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
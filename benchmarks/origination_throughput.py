@@ -0,0 +1,90 @@
+"""
+Dialer origination throughput vs. MAX_ORIGINATIONS_IN_FLIGHT against a slow ARI.
+
+    python -m benchmarks.origination_throughput [--latency 0.05] [--lines 100] [--in-flight 1 4 16]
+
+Every ARI request takes `latency` seconds (FakeAriClient). The engine-wide throttle
+is disabled and calls never end (no ARI events), so the per-line 1/s gap and the
+pipeline depth are the only bounds; the min gap column shows the per-line limit held.
+"""
+import argparse
+import asyncio
+import dataclasses
+import logging
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+from config.settings import get_settings
+from core.replay import FakeAriClient
+from logic.base import BaseScenario
+from logic.dialer import Dialer
+from sessions.session_manager import SessionManager
+
+
+async def _measure(lines: int, in_flight: int, latency: float, duration: float) -> Dict[str, float]:
+    settings = get_settings()
+    settings.dialer = dataclasses.replace(
+        settings.dialer,
+        outbound_numbers=[f"0219100{i:04d}" for i in range(lines)],
+        static_contacts=[],
+        max_concurrent_calls=1000,
+        max_calls_per_minute=60,
+        max_calls_per_day=100_000,
+        max_originations_per_second=0,
+        trunk_originations_per_second={},
+        max_originations_in_flight=in_flight,
+        contact_queue_path="",
+        reputation_path="",
+    )
+    ari = FakeAriClient(latency=latency)
+    manager = SessionManager(ari, BaseScenario())
+    dialer = Dialer(settings, ari, manager)
+    manager.attach_dialer(dialer)
+
+    started_at: Dict[str, List[float]] = defaultdict(list)
+    originate = ari.originate_call
+
+    async def _timed_originate(**kwargs):
+        line = kwargs["caller_id"]
+        started_at[line].append(time.monotonic())
+        return await originate(**kwargs)
+
+    ari.originate_call = _timed_originate
+    await dialer.add_contacts([f"0912{i:07d}" for i in range(lines * 10)])
+    stop = asyncio.Event()
+    runner = asyncio.create_task(dialer.run(stop))
+    await asyncio.sleep(duration)
+    stop.set()
+    await dialer.stop()
+    await runner
+
+    total = sum(len(stamps) for stamps in started_at.values())
+    min_gap = min(
+        (b - a for stamps in started_at.values() for a, b in zip(stamps, stamps[1:])),
+        default=float("inf"),
+    )
+    return {"rate": total / duration, "min_gap": min_gap}
+
+
+async def _main(lines: int, depths: List[int], latency: float, duration: float) -> None:
+    print(f"ARI latency {latency * 1000:.0f}ms, {lines} lines, {duration:.0f}s per run")
+    print(f"{'in flight':>9} | {'originations/s':>14} | {'min gap per line s':>18}")
+    for depth in depths:
+        result = await _measure(lines, depth, latency, duration)
+        print(f"{depth:>9} | {result['rate']:>14.1f} | {result['min_gap']:>18.3f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lines", type=int, default=100)
+    parser.add_argument("--in-flight", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--duration", type=float, default=3.0)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+    asyncio.run(_main(args.lines, args.in_flight, args.latency, args.duration))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Session cleanup cost vs. number of live sessions.
+
+    python -m benchmarks.session_cleanup [--sizes 1000 10000] [--samples 500]
+
+Each session owns two channels, three playbacks, one recording and one protocol id.
+Cleanup should stay flat as the number of live sessions grows.
+"""
+import argparse
+import asyncio
+import logging
+import time
+
+from core.replay import FakeAriClient
+from sessions.session_manager import SessionManager
+
+
+async def _populate(manager: SessionManager, count: int) -> list:
+    sessions = []
+    for i in range(count):
+        session = await manager.create_outbound_session(contact_number=f"0912{i:07d}")
+        sid = session.session_id
+        await manager._index_channel(sid, f"chan-{i}-a")
+        await manager._index_channel(sid, f"chan-{i}-b")
+        await manager.register_protocol_id(sid, f"proto-{i}")
+        await manager.register_recording(sid, f"interest-{sid}")
+        for p in range(3):
+            await manager.register_playback(sid, f"pb-{i}-{p}")
+        sessions.append(session)
+    return sessions
+
+
+async def _measure(size: int, samples: int) -> float:
+    manager = SessionManager(FakeAriClient(), None)
+    sessions = await _populate(manager, size)
+    victims = sessions[: min(samples, size)]
+    started = time.perf_counter()
+    for session in victims:
+        await manager._cleanup_session(session)
+    elapsed = time.perf_counter() - started
+    assert len(manager.sessions) == size - len(victims)
+    return elapsed / len(victims)
+
+
+async def _main(sizes: list, samples: int) -> None:
+    print(f"{'live sessions':>14} | {'cleanup us/session':>18}")
+    for size in sizes:
+        per_cleanup = await _measure(size, samples)
+        print(f"{size:>14} | {per_cleanup * 1e6:>18.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--samples", type=int, default=500)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+    asyncio.run(_main(args.sizes, args.samples))
+
+
+if __name__ == "__main__":
+    main()
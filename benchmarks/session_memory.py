@@ -0,0 +1,124 @@
+"""
+Memory held by live sessions: typed SessionState vs. the old string-metadata layout.
+
+    python -m benchmarks.session_memory [--sessions 5000]
+
+Both layouts carry the same mid-call data (answered, said yes, recording the
+follow-up phase, hangup cause known). The legacy layout is reproduced here as it
+was: non-slotted dataclasses, every flag/timestamp a string in `metadata`, and an
+asyncio.Lock allocated per session.
+"""
+import argparse
+import asyncio
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Set
+
+from sessions.session import CallLeg, LegDirection, LegState, Session, SessionStatus
+
+
+@dataclass
+class _LegacyCallLeg:
+    channel_id: str
+    direction: LegDirection
+    endpoint: str
+    state: LegState = LegState.CREATED
+    variables: Dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class _LegacySession:
+    session_id: str
+    inbound_leg: Optional[_LegacyCallLeg] = None
+    outbound_leg: Optional[_LegacyCallLeg] = None
+    operator_leg: Optional[_LegacyCallLeg] = None
+    status: SessionStatus = SessionStatus.INITIATING
+    metadata: Dict[str, str] = field(default_factory=dict)
+    playbacks: Dict[str, str] = field(default_factory=dict)
+    responses: List[Dict[str, str]] = field(default_factory=list)
+    result: Optional[str] = None
+    processed_recordings: Set[str] = field(default_factory=set)
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock, repr=False, compare=False)
+
+
+def _legacy(i: int) -> _LegacySession:
+    session = _LegacySession(session_id=f"session-{i:08d}")
+    session.outbound_leg = _LegacyCallLeg(f"chan-{i}", LegDirection.OUTBOUND, f"0912{i:07d}", LegState.ANSWERED)
+    session.status = SessionStatus.ACTIVE
+    session.metadata.update(
+        {
+            "contact_number": f"0912{i:07d}",
+            "number_id": str(i),
+            "batch_id": "batch-1",
+            "attempted_at": "2026-10-17T09:00:00.000000",
+            "outbound_line": "02191302954",
+            "answered_at": str(time.time()),
+            "intent_yes": "1",
+            "yes_at": str(time.time()),
+            "recording_phase": "number_followup",
+            "recording_name": f"number_followup-session-{i:08d}",
+            "unknown_interest_count": "0",
+            "unknown_number_followup_count": "0",
+            "alo_played_interest": "1",
+            "hangup_cause": "16",
+            "hangup_cause_txt": "Normal Clearing",
+        }
+    )
+    return session
+
+
+def _typed(i: int) -> Session:
+    session = Session(session_id=f"session-{i:08d}")
+    session.outbound_leg = CallLeg(f"chan-{i}", LegDirection.OUTBOUND, f"0912{i:07d}", LegState.ANSWERED)
+    session.status = SessionStatus.ACTIVE
+    session.metadata.update(
+        {
+            "contact_number": f"0912{i:07d}",
+            "number_id": str(i),
+            "batch_id": "batch-1",
+            "attempted_at": "2026-10-17T09:00:00.000000",
+        }
+    )
+    state = session.state
+    state.line = "02191302954"
+    state.answered_at = time.time()
+    state.intent_yes = True
+    state.yes_at = time.time()
+    state.recording_phase = "number_followup"
+    state.recording_name = f"number_followup-session-{i:08d}"
+    state.alo_played = ("interest",)
+    state.hangup_cause = "16"
+    state.hangup_cause_txt = "Normal Clearing"
+    return session
+
+
+def _measure(build: Callable[[int], object], count: int) -> int:
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    sessions = [build(i) for i in range(count)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    total = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    del sessions
+    return total
+
+
+async def _main(count: int) -> None:
+    legacy = _measure(_legacy, count)
+    typed = _measure(_typed, count)
+    print(f"{'layout':>10} | {'total KiB':>10} | {'bytes/session':>13}")
+    for name, total in (("legacy", legacy), ("typed", typed)):
+        print(f"{name:>10} | {total / 1024:>10.1f} | {total / count:>13.0f}")
+    print(f"saved {100 * (legacy - typed) / legacy:.1f}% per session")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=5000)
+    args = parser.parse_args()
+    asyncio.run(_main(args.sessions))
+
+
+if __name__ == "__main__":
+    main()
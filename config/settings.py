@@ -1,7 +1,7 @@
 import os
 from dataclasses import dataclass
 from datetime import time
-from typing import List
+from typing import Dict, List, Optional
 
 
 def _load_dotenv(path: str = ".env") -> None:
@@ -34,6 +34,55 @@ def _parse_list(value: str) -> List[str]:
     return [item.strip() for item in value.split(",") if item.strip()]
 
 
+def _parse_rates(value: str) -> Dict[str, float]:
+    """Parse `name:rate,name:rate`; malformed entries are skipped."""
+    rates: Dict[str, float] = {}
+    for item in _parse_list(value):
+        name, _, rate = item.rpartition(":")
+        try:
+            rates[name.strip()] = float(rate)
+        except ValueError:
+            continue
+    return {name: rate for name, rate in rates.items() if name}
+
+
+def _parse_pairs(value: str) -> Dict[str, str]:
+    """Parse `name:value,name:value` into strings; entries without both parts are skipped."""
+    pairs: Dict[str, str] = {}
+    for item in _parse_list(value):
+        name, _, tag = item.rpartition(":")
+        if name.strip() and tag.strip():
+            pairs[name.strip()] = tag.strip().lower()
+    return pairs
+
+
+@dataclass
+class RetryPolicy:
+    delay: float  # seconds after the failed attempt
+    max_attempts: int  # including the first call
+    window_start: Optional[time] = None  # local time-of-day window for retries (optional)
+    window_end: Optional[time] = None
+
+
+def _parse_retry_policies(value: str) -> Dict[str, RetryPolicy]:
+    """Parse `result:delay_s:max_attempts[@HH:MM-HH:MM],...`; malformed entries are skipped."""
+    policies: Dict[str, RetryPolicy] = {}
+    for item in _parse_list(value):
+        head, _, window = item.partition("@")
+        try:
+            result, delay, attempts = (part.strip() for part in head.split(":"))
+            policy = RetryPolicy(delay=float(delay), max_attempts=int(attempts))
+            if window:
+                start, end = window.split("-")
+                policy.window_start = _parse_time(start.strip(), default=time(0, 0))
+                policy.window_end = _parse_time(end.strip(), default=time(23, 59))
+        except ValueError:
+            continue
+        if result:
+            policies[result] = policy
+    return policies
+
+
 @dataclass
 class AriSettings:
     base_url: str
@@ -41,6 +90,8 @@ class AriSettings:
     app_name: str
     username: str
     password: str
+    event_filter: bool
+    capture_path: str
 
 
 @dataclass
@@ -79,7 +130,11 @@ class OperatorSettings:
 @dataclass
 class DialerSettings:
     outbound_trunk: str
+    outbound_trunks: Dict[str, float]  # trunk -> routing weight; empty uses outbound_trunk only
+    trunk_max_concurrent: Dict[str, float]  # trunk -> concurrent call cap (0/missing = unlimited)
+    trunk_health_window: int
     outbound_numbers: List[str]
+    line_carriers: Dict[str, str]  # line -> carrier tag (e.g. mci, irancell, rightel)
     default_caller_id: str
     origination_timeout: int
     max_concurrent_calls: int
@@ -88,10 +143,32 @@ class DialerSettings:
     max_calls_per_minute: int
     max_calls_per_day: int
     max_originations_per_second: float
+    trunk_originations_per_second: Dict[str, float]
+    origination_burst: int
+    max_originations_in_flight: int
     call_window_start: time
     call_window_end: time
     static_contacts: List[str]
     batch_size: int
+    prefetch_seconds: float
+    max_batch_size: int
+    contact_queue_path: str  # empty keeps the queue in memory (lost on restart)
+    retry_policies: Dict[str, RetryPolicy]  # call result -> local retry policy
+    numbering_plan: str  # "ir" validates destinations before dialing; empty disables
+    unallocated_prefixes: List[str]  # overrides the built-in unallocated mobile ranges when set
+    reputation_path: str  # empty keeps the number-reputation cache in memory
+    reputation_half_life: float  # seconds
+    reputation_ttl: float  # seconds
+    reputation_max_entries: int
+    reputation_defer_score: float  # 0 disables deferring
+    reputation_skip_score: float  # 0 disables skipping
+    line_health_window: int  # recent calls per line in its hangup-cause histogram
+    line_failure_threshold: float  # share of line-blocked causes (21/34/41/42) that quarantines a line; 0 disables
+    line_quarantine_min_calls: int
+    line_quarantine_seconds: float  # first cooldown; doubles after each failed probe
+    line_quarantine_max_seconds: float
+    line_quarantine_max_fraction: float  # never quarantine more than this share of the lines at once
+    lease_reconcile_interval: float  # seconds between line-lease checks against ARI; 0 disables
     default_retry: int
 
 
@@ -101,6 +178,11 @@ class ConcurrencySettings:
     max_parallel_tts: int
     max_parallel_llm: int
     http_max_connections: int
+    event_workers: int
+    event_queue_max: int
+    event_queue_high: int
+    event_queue_low: int
+    ws_max_queue: int
 
 
 @dataclass
@@ -134,6 +216,31 @@ class ScenarioSettings:
     audio_src_dir: str  # Scenario-specific audio source directory
 
 
+@dataclass
+class StoreSettings:
+    backend: str  # "", "memory" or "redis"
+    url: str
+    engine_id: str
+    ttl: int
+    owner_ttl: int
+    flush_interval: float
+
+
+@dataclass
+class JournalSettings:
+    path: str  # empty disables the crash-recovery journal
+    fsync_interval: float
+    compact_every: int
+
+
+@dataclass
+class PacingSettings:
+    mode: str  # "" (dial within MAX_CONCURRENT_CALLS) or "predictive"
+    target_occupancy: float
+    max_ratio: float
+    window: int
+
+
 @dataclass
 class Settings:
     ari: AriSettings
@@ -147,6 +254,9 @@ class Settings:
     timeouts: TimeoutSettings
     sms: SMSSettings
     scenario: ScenarioSettings
+    store: StoreSettings
+    journal: JournalSettings
+    pacing: PacingSettings
     log_level: str
 
 
@@ -165,6 +275,8 @@ def get_settings() -> Settings:
         app_name=os.getenv("ARI_APP_NAME", "salehi"),
         username=os.getenv("ARI_USERNAME", "salehi"),
         password=os.getenv("ARI_PASSWORD", "changeme"),
+        event_filter=os.getenv("ARI_EVENT_FILTER", "true").lower() not in ("0", "false", "no"),
+        capture_path=os.getenv("ARI_CAPTURE_PATH", ""),
     )
 
     gapgpt = GapGPTSettings(
@@ -193,7 +305,11 @@ def get_settings() -> Settings:
 
     dialer = DialerSettings(
         outbound_trunk=os.getenv("OUTBOUND_TRUNK", "TO-CUCM-Gaptel"),
+        outbound_trunks=_parse_rates(os.getenv("OUTBOUND_TRUNKS", "")),
+        trunk_max_concurrent=_parse_rates(os.getenv("TRUNK_MAX_CONCURRENT", "")),
+        trunk_health_window=max(int(os.getenv("TRUNK_HEALTH_WINDOW", "50")), 1),
         outbound_numbers=_parse_list(os.getenv("OUTBOUND_NUMBERS", "")),
+        line_carriers=_parse_pairs(os.getenv("OUTBOUND_LINE_CARRIERS", "")),
         default_caller_id=os.getenv("DEFAULT_CALLER_ID", "1000"),
         origination_timeout=int(os.getenv("ORIGINATION_TIMEOUT", "30")),
         max_concurrent_calls=int(os.getenv("MAX_CONCURRENT_CALLS", "2")),
@@ -202,10 +318,32 @@ def get_settings() -> Settings:
         max_calls_per_minute=int(os.getenv("MAX_CALLS_PER_MINUTE", "10")),
         max_calls_per_day=int(os.getenv("MAX_CALLS_PER_DAY", "200")),
         max_originations_per_second=float(os.getenv("MAX_ORIGINATIONS_PER_SECOND", "3")),
+        trunk_originations_per_second=_parse_rates(os.getenv("TRUNK_ORIGINATIONS_PER_SECOND", "")),
+        origination_burst=int(os.getenv("ORIGINATION_BURST", "1")),
+        max_originations_in_flight=max(int(os.getenv("MAX_ORIGINATIONS_IN_FLIGHT", "1")), 1),
         call_window_start=call_window_start,
         call_window_end=call_window_end,
         static_contacts=_parse_list(os.getenv("STATIC_CONTACTS", "")),
         batch_size=int(os.getenv("DIALER_BATCH_SIZE", os.getenv("MAX_CALLS_PER_MINUTE", "10"))),
+        prefetch_seconds=float(os.getenv("PANEL_PREFETCH_SECONDS", "30")),
+        max_batch_size=int(os.getenv("PANEL_MAX_BATCH_SIZE", "500")),
+        contact_queue_path=os.getenv("CONTACT_QUEUE_PATH", "state/contacts.sqlite3"),
+        retry_policies=_parse_retry_policies(os.getenv("RETRY_POLICIES", "")),
+        numbering_plan=os.getenv("NUMBERING_PLAN", "").strip().lower(),
+        unallocated_prefixes=_parse_list(os.getenv("NUMBERING_UNALLOCATED_PREFIXES", "")),
+        reputation_path=os.getenv("REPUTATION_PATH", "state/reputation.sqlite3"),
+        reputation_half_life=max(float(os.getenv("REPUTATION_HALF_LIFE_HOURS", "24")), 0.01) * 3600,
+        reputation_ttl=float(os.getenv("REPUTATION_TTL_DAYS", "30")) * 86400,
+        reputation_max_entries=max(int(os.getenv("REPUTATION_MAX_ENTRIES", "1000000")), 1),
+        reputation_defer_score=float(os.getenv("REPUTATION_DEFER_SCORE", "2")),
+        reputation_skip_score=float(os.getenv("REPUTATION_SKIP_SCORE", "4")),
+        line_health_window=max(int(os.getenv("LINE_HEALTH_WINDOW", "20")), 1),
+        line_failure_threshold=float(os.getenv("LINE_FAILURE_THRESHOLD", "0.6")),
+        line_quarantine_min_calls=max(int(os.getenv("LINE_QUARANTINE_MIN_CALLS", "5")), 1),
+        line_quarantine_seconds=float(os.getenv("LINE_QUARANTINE_SECONDS", "60")),
+        line_quarantine_max_seconds=float(os.getenv("LINE_QUARANTINE_MAX_SECONDS", "3600")),
+        line_quarantine_max_fraction=float(os.getenv("LINE_QUARANTINE_MAX_FRACTION", "0.5")),
+        lease_reconcile_interval=float(os.getenv("LEASE_RECONCILE_INTERVAL", "60")),
         default_retry=int(os.getenv("DIALER_DEFAULT_RETRY", "60")),
     )
 
@@ -235,6 +373,11 @@ def get_settings() -> Settings:
         max_parallel_tts=int(os.getenv("MAX_PARALLEL_TTS", "50")),
         max_parallel_llm=int(os.getenv("MAX_PARALLEL_LLM", "10")),
         http_max_connections=int(os.getenv("HTTP_MAX_CONNECTIONS", "100")),
+        event_workers=int(os.getenv("ARI_EVENT_WORKERS", "8")),
+        event_queue_max=int(os.getenv("ARI_EVENT_QUEUE_MAX", "2000")),
+        event_queue_high=int(os.getenv("ARI_EVENT_QUEUE_HIGH", "1000")),
+        event_queue_low=int(os.getenv("ARI_EVENT_QUEUE_LOW", "200")),
+        ws_max_queue=int(os.getenv("ARI_WS_MAX_QUEUE", "64")),
     )
 
     timeouts = TimeoutSettings(
@@ -260,6 +403,28 @@ def get_settings() -> Settings:
         audio_src_dir=f"assets/audio/{scenario_name}/src",
     )
 
+    store = StoreSettings(
+        backend=os.getenv("SESSION_STORE", "").lower(),
+        url=os.getenv("SESSION_STORE_URL", "redis://127.0.0.1:6379/0"),
+        engine_id=os.getenv("ENGINE_ID", ""),
+        ttl=int(os.getenv("SESSION_STORE_TTL", "3600")),
+        owner_ttl=int(os.getenv("SESSION_STORE_OWNER_TTL", "30")),
+        flush_interval=float(os.getenv("SESSION_STORE_FLUSH_INTERVAL", "0.5")),
+    )
+
+    journal = JournalSettings(
+        path=os.getenv("ENGINE_JOURNAL_PATH", "state/engine-journal.jsonl"),
+        fsync_interval=float(os.getenv("ENGINE_JOURNAL_FSYNC_MS", "50")) / 1000.0,
+        compact_every=int(os.getenv("ENGINE_JOURNAL_COMPACT_EVERY", "5000")),
+    )
+
+    pacing = PacingSettings(
+        mode=os.getenv("PACING_MODE", "").lower(),
+        target_occupancy=float(os.getenv("PACING_TARGET_OCCUPANCY", "0.85")),
+        max_ratio=float(os.getenv("PACING_MAX_RATIO", "3")),
+        window=int(os.getenv("PACING_WINDOW", "200")),
+    )
+
     log_level = os.getenv("LOG_LEVEL", "INFO")
 
     return Settings(
@@ -274,5 +439,8 @@ def get_settings() -> Settings:
         timeouts=timeouts,
         sms=sms,
         scenario=scenario,
+        store=store,
+        journal=journal,
+        pacing=pacing,
         log_level=log_level,
     )
@@ -1,5 +1,5 @@
 import logging
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 import httpx
 
@@ -44,7 +44,7 @@ class AriClient:
         path: str,
         params: Optional[Dict[str, Any]] = None,
         json: Optional[Dict[str, Any]] = None,
-    ) -> Dict[str, Any]:
+    ) -> Any:
         logger.debug("ARI %s %s params=%s json=%s", method, path, params, json)
         response = await self.client.request(
             method=method,
@@ -57,6 +57,24 @@ class AriClient:
             return response.json()
         return {}
 
+    async def set_event_filter(self, allowed_types: List[str]) -> Dict[str, Any]:
+        """
+        Restrict the events Asterisk sends to this application (ARI eventFilter allow-list).
+        """
+        return await self._request(
+            "PUT",
+            f"/applications/{self.app_name}/eventFilter",
+            json={"allowed": [{"type": event_type} for event_type in allowed_types]},
+        )
+
+    async def list_channels(self) -> List[Dict[str, Any]]:
+        result = await self._request("GET", "/channels")
+        return result if isinstance(result, list) else []
+
+    async def list_bridges(self) -> List[Dict[str, Any]]:
+        result = await self._request("GET", "/bridges")
+        return result if isinstance(result, list) else []
+
     async def create_bridge(self, name: str, bridge_type: str = "mixing") -> Dict[str, Any]:
         return await self._request(
             "POST",
@@ -1,30 +1,62 @@
 import asyncio
 import json
 import logging
-from typing import Awaitable, Callable, Optional
+import re
+from typing import Awaitable, Callable, Iterable, List, Optional
 
 import websockets
 from websockets import WebSocketClientProtocol
 from websockets.exceptions import ConnectionClosedError, ConnectionClosedOK
 
 from config.settings import AriSettings
+from core.event_capture import EventRecorder
+from core.event_dispatcher import EventDispatcher
 
 
 logger = logging.getLogger(__name__)
 
+# Matches the first `"type": "Name"` key; nested ARI objects use prefixed keys (bridge_type, ...).
+_EVENT_TYPE_RE = re.compile(r'(?<!\\)"type"\s*:\s*"([A-Za-z]+)"')
+
 
 class AriWebSocketClient:
     """
-    Subscribes to ARI events and forwards them to the provided async handler.
+    Subscribes to ARI events and forwards them to the provided async handler
+    through an ordered, per-call event dispatcher.
     """
 
     def __init__(
         self,
         settings: AriSettings,
         event_handler: Callable[[dict], Awaitable[None]],
+        routing_key: Optional[Callable[[dict], Optional[str]]] = None,
+        workers: int = 8,
+        max_pending: int = 2000,
+        high_watermark: int = 1000,
+        low_watermark: int = 200,
+        ws_max_queue: int = 64,
+        allowed_event_types: Optional[Iterable[str]] = None,
+        recorder: Optional[EventRecorder] = None,
     ):
         self.settings = settings
         self.event_handler = event_handler
+        # When set, events of other types are discarded before JSON decoding.
+        self.allowed_event_types = frozenset(allowed_event_types) if allowed_event_types else None
+        self.discarded_events = 0
+        # Optional raw-stream capture for offline replay (python -m core.replay).
+        self.recorder = recorder
+        self._connect_listeners: List[Callable[[bool], Awaitable[None]]] = []
+        self._connected_once = False
+        self.dispatcher = EventDispatcher(
+            event_handler,
+            workers=workers,
+            routing_key=routing_key,
+            max_pending=max_pending,
+            high_watermark=high_watermark,
+            low_watermark=low_watermark,
+        )
+        # Bounded frame buffer inside websockets; beyond it the socket itself pushes back.
+        self.ws_max_queue = ws_max_queue
         self._ws: Optional[WebSocketClientProtocol] = None
         self._stop_event = asyncio.Event()
 
@@ -37,34 +69,65 @@ class AriWebSocketClient:
 
     async def run(self) -> None:
         """
-        Maintain the WebSocket connection and fan out events as tasks.
+        Maintain the WebSocket connection and hand events to the dispatcher workers.
         """
-        while not self._stop_event.is_set():
-            url = self._build_url()
-            try:
-                logger.info("Connecting to ARI WebSocket at %s", self.settings.ws_url)
-                async with websockets.connect(
-                    url,
-                    ping_interval=20,
-                    ping_timeout=20,
-                    max_queue=None,
-                ) as ws:
-                    self._ws = ws
-                    logger.info("Connected to ARI WebSocket")
-                    await self._consume(ws)
-            except (ConnectionClosedError, ConnectionClosedOK) as exc:
-                if self._stop_event.is_set():
-                    break
-                logger.warning("ARI WebSocket closed: %s; reconnecting...", exc)
-            except Exception as exc:
-                if self._stop_event.is_set():
-                    break
-                logger.exception("WebSocket error; reconnecting: %s", exc)
-            self._ws = None
-            if not self._stop_event.is_set():
-                await asyncio.sleep(1)
+        self.dispatcher.start()
+        try:
+            while not self._stop_event.is_set():
+                url = self._build_url()
+                try:
+                    logger.info("Connecting to ARI WebSocket at %s", self.settings.ws_url)
+                    async with websockets.connect(
+                        url,
+                        ping_interval=20,
+                        ping_timeout=20,
+                        max_queue=self.ws_max_queue,
+                    ) as ws:
+                        self._ws = ws
+                        logger.info("Connected to ARI WebSocket")
+                        self._notify_connected()
+                        await self._consume(ws)
+                except (ConnectionClosedError, ConnectionClosedOK) as exc:
+                    if self._stop_event.is_set():
+                        break
+                    logger.warning("ARI WebSocket closed: %s; reconnecting...", exc)
+                except Exception as exc:
+                    if self._stop_event.is_set():
+                        break
+                    logger.exception("WebSocket error; reconnecting: %s", exc)
+                self._ws = None
+                if not self._stop_event.is_set():
+                    await asyncio.sleep(1)
+        finally:
+            await self.dispatcher.stop()
+            if self.recorder:
+                self.recorder.close()
         logger.info("ARI WebSocket listener stopped")
 
+    def add_connect_listener(self, listener: Callable[[bool], Awaitable[None]]) -> None:
+        """
+        Register an async callback run after every successful connect.
+        It receives True when the connection is a reconnect (events may have been missed).
+        """
+        self._connect_listeners.append(listener)
+
+    def _notify_connected(self) -> None:
+        reconnected = self._connected_once
+        self._connected_once = True
+        for listener in self._connect_listeners:
+            # Run in the background so the reader starts draining frames immediately.
+            task = asyncio.create_task(listener(reconnected))
+            task.add_done_callback(self._log_listener_exception)
+
+    @staticmethod
+    def _log_listener_exception(task: asyncio.Task) -> None:
+        try:
+            exc = task.exception()
+        except asyncio.CancelledError:
+            return
+        if exc:
+            logger.error("ARI connect listener failed: %s", exc, exc_info=exc)
+
     async def _consume(self, ws: WebSocketClientProtocol) -> None:
         async for message in ws:
             if self._stop_event.is_set():
@@ -72,11 +135,17 @@ class AriWebSocketClient:
             await self._handle_message(message)
 
     async def _handle_message(self, message: str) -> None:
+        if self.recorder:
+            self.recorder.record(message)
+        if self.allowed_event_types is not None:
+            match = _EVENT_TYPE_RE.search(message)
+            if match and match.group(1) not in self.allowed_event_types:
+                self.discarded_events += 1
+                return
         try:
             event = json.loads(message)
             logger.debug("Received ARI event: %s", event.get("type"))
-            task = asyncio.create_task(self.event_handler(event))
-            task.add_done_callback(self._log_task_exception)
+            await self.dispatcher.submit(event)
         except json.JSONDecodeError:
             logger.error("Failed to decode ARI event: %s", message)
         except Exception as exc:
@@ -86,12 +155,3 @@ class AriWebSocketClient:
         self._stop_event.set()
         if self._ws:
             await self._ws.close()
-
-    @staticmethod
-    def _log_task_exception(task: asyncio.Task) -> None:
-        try:
-            exc = task.exception()
-        except asyncio.CancelledError:
-            return
-        if exc:
-            logger.exception("Unhandled exception in ARI event task: %s", exc)
@@ -0,0 +1,102 @@
+import gzip
+import logging
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+# First line of every recording run; offsets restart at 0 after it.
+RUN_HEADER = "#run"
+GZIP_MAGIC = b"\x1f\x8b"
+
+
+class EventRecorder:
+    """
+    Records the raw ARI WebSocket stream to a gzip file for offline replay.
+
+    One line per frame: `<offset_ms>\\t<raw json>` where offset_ms is the monotonic time
+    since recording started. Frames are kept verbatim so a capture reproduces exactly
+    what the engine received. Every run starts with a `#run` header line, after which
+    offsets count from 0 again, so appending to an existing capture is safe (see
+    read_capture).
+    """
+
+    def __init__(self, path: str, flush_interval: float = 1.0):
+        # Allow strftime placeholders so each run writes its own capture file.
+        self.path = Path(datetime.now().strftime(path))
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.flush_interval = flush_interval
+        self._file = gzip.open(self.path, "at", encoding="utf-8", compresslevel=6)
+        self._file.write(f"{RUN_HEADER}\t{datetime.now().isoformat(timespec='seconds')}\n")
+        self._started = time.monotonic()
+        self._last_flush = self._started
+        self.frames = 0
+        logger.info("Recording ARI event stream to %s", self.path)
+
+    def record(self, message: str) -> None:
+        if self._file is None:
+            return
+        now = time.monotonic()
+        offset_ms = int((now - self._started) * 1000)
+        # ARI frames are single-line JSON; guard anyway so one frame stays one line.
+        frame = message.replace("\n", " ")
+        try:
+            self._file.write(f"{offset_ms}\t{frame}\n")
+            self.frames += 1
+            if now - self._last_flush >= self.flush_interval:
+                self._file.flush()
+                self._last_flush = now
+        except Exception as exc:
+            logger.warning("ARI capture write failed; disabling capture: %s", exc)
+            self.close()
+
+    def close(self) -> None:
+        if self._file is None:
+            return
+        try:
+            self._file.close()
+        finally:
+            self._file = None
+        logger.info("ARI capture closed (%d frames) at %s", self.frames, self.path)
+
+
+def read_capture(path: str) -> Iterator[Tuple[float, str]]:
+    """
+    Yield (offset_seconds, raw_frame) pairs from a capture file, gzip or plain (told
+    apart by the gzip magic bytes, whatever the file is named). Runs appended to one
+    file are laid end to end, so offsets never go backwards. Tolerates a truncated
+    tail (e.g. the engine was killed mid-write).
+    """
+    with open(path, "rb") as raw:
+        compressed = raw.read(2) == GZIP_MAGIC
+    opener = gzip.open if compressed else open
+    with opener(path, "rt", encoding="utf-8") as handle:
+        base = last = 0.0
+        try:
+            for line in handle:
+                offset, sep, frame = line.rstrip("\n").partition("\t")
+                if offset == RUN_HEADER:
+                    base = last
+                    continue
+                if not sep:
+                    continue
+                try:
+                    last = base + int(offset) / 1000.0
+                except ValueError:
+                    continue
+                yield last, frame
+        except (EOFError, gzip.BadGzipFile) as exc:
+            logger.warning("Capture %s ends with a truncated block: %s", path, exc)
+
+
+def build_recorder(path: Optional[str]) -> Optional[EventRecorder]:
+    if not path:
+        return None
+    try:
+        return EventRecorder(path)
+    except Exception as exc:
+        logger.warning("Could not open ARI capture file %s: %s", path, exc)
+        return None
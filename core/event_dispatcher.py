@@ -0,0 +1,230 @@
+import asyncio
+import logging
+import time
+import zlib
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from utils.metrics import LatencyStats
+
+
+logger = logging.getLogger(__name__)
+
+
+def default_routing_key(event: dict) -> Optional[str]:
+    """
+    Derive a per-call ordering key from the raw ARI payload (channel id, or the
+    channel a playback/recording targets). Returns None when nothing identifies a call.
+    """
+    channel = event.get("channel") or {}
+    if channel.get("id"):
+        return channel["id"]
+    for field in ("playback", "recording"):
+        target = (event.get(field) or {}).get("target_uri") or ""
+        if ":" in target:
+            return target.split(":", 1)[1]
+    peer = event.get("peer") or {}
+    if peer.get("id"):
+        return peer["id"]
+    bridge = event.get("bridge") or {}
+    return bridge.get("id")
+
+
+class EventDispatcher:
+    """
+    Routes ARI events to a fixed pool of ordered worker queues.
+
+    Events that share a routing key (session or channel) always hash to the same worker,
+    so one call's events are handled strictly in arrival order while different calls
+    are processed in parallel. Replaces the unbounded task-per-event fan-out.
+
+    Ingest is bounded: once `max_pending` events are queued, `submit` waits for the
+    workers to drain below `low_watermark` (the WebSocket reader stops reading, so the
+    socket applies backpressure instead of frames piling up in memory). Events that
+    cannot be queued within `ingest_timeout` are dropped and counted. Crossing
+    `high_watermark` flips the saturation flag and notifies listeners (the dialer
+    pauses originations until the queue falls back under `low_watermark`).
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[dict], Awaitable[None]],
+        workers: int = 8,
+        routing_key: Optional[Callable[[dict], Optional[str]]] = None,
+        slow_handler_ms: float = 500.0,
+        stats_interval: float = 60.0,
+        max_pending: int = 2000,
+        high_watermark: int = 1000,
+        low_watermark: int = 200,
+        ingest_timeout: float = 10.0,
+    ):
+        self.handler = handler
+        self.worker_count = max(1, workers)
+        self.routing_key = routing_key or default_routing_key
+        self.slow_handler_s = slow_handler_ms / 1000.0
+        self.stats_interval = stats_interval
+        self.max_pending = max(1, max_pending)
+        self.high_watermark = min(max(1, high_watermark), self.max_pending)
+        self.low_watermark = min(max(0, low_watermark), self.high_watermark - 1)
+        self.ingest_timeout = ingest_timeout
+        self.queues: List[asyncio.Queue] = [asyncio.Queue() for _ in range(self.worker_count)]
+        self.handler_latency = LatencyStats()
+        self.queue_wait = LatencyStats()
+        self.ingest_delay = LatencyStats()
+        self.max_depth_seen = 0
+        self.delayed_events = 0
+        self.dropped_events = 0
+        self.saturated = False
+        self._pending = 0
+        self._drained = asyncio.Event()
+        self._drained.set()
+        self._saturation_listeners: List[Callable[[bool], None]] = []
+        self._stats_providers: Dict[str, Callable[[], Dict[str, object]]] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._rr = 0
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        for idx, queue in enumerate(self.queues):
+            self._tasks.append(asyncio.create_task(self._worker(idx, queue)))
+        if self.stats_interval > 0:
+            self._tasks.append(asyncio.create_task(self._report_stats()))
+        logger.info("Event dispatcher started with %d ordered workers", self.worker_count)
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    def add_saturation_listener(self, listener: Callable[[bool], None]) -> None:
+        """
+        Register a callback invoked with True when the queue crosses the high watermark
+        and False once it drains below the low watermark.
+        """
+        self._saturation_listeners.append(listener)
+
+    def add_stats_provider(self, name: str, provider: Callable[[], Dict[str, object]]) -> None:
+        """Include another component's counters (e.g. lock contention) in the periodic stats line."""
+        self._stats_providers[name] = provider
+
+    async def submit(self, event: dict) -> bool:
+        """
+        Enqueue an event on the worker owning its routing key.
+        Waits while the ingest queue is full; returns False if the event had to be dropped.
+        """
+        if self._pending >= self.max_pending:
+            self.delayed_events += 1
+            self._drained.clear()
+            started = time.perf_counter()
+            try:
+                await asyncio.wait_for(self._drained.wait(), timeout=self.ingest_timeout)
+            except asyncio.TimeoutError:
+                self.dropped_events += 1
+                logger.error(
+                    "ARI ingest queue full for %.1fs; dropping %s event (dropped=%d depth=%d)",
+                    self.ingest_timeout,
+                    event.get("type"),
+                    self.dropped_events,
+                    self._pending,
+                )
+                return False
+            finally:
+                self.ingest_delay.observe(time.perf_counter() - started)
+        queue = self.queues[self._worker_for(event)]
+        queue.put_nowait((time.perf_counter(), event))
+        self._pending += 1
+        if self._pending > self.max_depth_seen:
+            self.max_depth_seen = self._pending
+        if not self.saturated and self._pending >= self.high_watermark:
+            self._set_saturated(True)
+        return True
+
+    def depth(self) -> int:
+        return self._pending
+
+    def stats(self) -> Dict[str, object]:
+        stats: Dict[str, object] = {
+            "workers": self.worker_count,
+            "depth": self._pending,
+            "max_depth": self.max_depth_seen,
+            "per_worker_depth": [q.qsize() for q in self.queues],
+            "saturated": self.saturated,
+            "delayed_events": self.delayed_events,
+            "dropped_events": self.dropped_events,
+            "handler_latency": self.handler_latency.snapshot(),
+            "queue_wait": self.queue_wait.snapshot(),
+            "ingest_delay": self.ingest_delay.snapshot(),
+        }
+        for name, provider in self._stats_providers.items():
+            try:
+                stats[name] = provider()
+            except Exception as exc:
+                logger.debug("Stats provider %s failed: %s", name, exc)
+        return stats
+
+    def _set_saturated(self, saturated: bool) -> None:
+        self.saturated = saturated
+        if saturated:
+            logger.warning(
+                "ARI event ingest saturated: depth=%d (high=%d); pausing originations",
+                self._pending,
+                self.high_watermark,
+            )
+        else:
+            logger.info("ARI event ingest drained: depth=%d (low=%d)", self._pending, self.low_watermark)
+        for listener in self._saturation_listeners:
+            try:
+                listener(saturated)
+            except Exception as exc:
+                logger.debug("Saturation listener failed: %s", exc)
+
+    def _on_event_done(self) -> None:
+        self._pending -= 1
+        if self._pending <= self.low_watermark:
+            self._drained.set()
+            if self.saturated:
+                self._set_saturated(False)
+
+    def _worker_for(self, event: dict) -> int:
+        try:
+            key = self.routing_key(event)
+        except Exception as exc:
+            logger.debug("Routing key lookup failed for %s: %s", event.get("type"), exc)
+            key = None
+        if not key:
+            self._rr = (self._rr + 1) % self.worker_count
+            return self._rr
+        # crc32 is stable across processes (unlike hash()) and cheap for short ids.
+        return zlib.crc32(key.encode()) % self.worker_count
+
+    async def _worker(self, idx: int, queue: asyncio.Queue) -> None:
+        while True:
+            enqueued_at, event = await queue.get()
+            started = time.perf_counter()
+            self.queue_wait.observe(started - enqueued_at)
+            try:
+                await self.handler(event)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.exception("Unhandled exception in ARI event handler (%s): %s", event.get("type"), exc)
+            finally:
+                elapsed = time.perf_counter() - started
+                self.handler_latency.observe(elapsed)
+                queue.task_done()
+                self._on_event_done()
+            if elapsed >= self.slow_handler_s:
+                logger.warning(
+                    "Slow ARI event handler: type=%s took %.0fms (worker=%d depth=%d)",
+                    event.get("type"),
+                    elapsed * 1000,
+                    idx,
+                    queue.qsize(),
+                )
+
+    async def _report_stats(self) -> None:
+        while True:
+            await asyncio.sleep(self.stats_interval)
+            if self.handler_latency.count:
+                logger.info("ARI event dispatcher stats: %s", self.stats())
@@ -0,0 +1,222 @@
+"""
+Replay a recorded ARI event capture into SessionManager without Asterisk.
+
+Usage:
+    python -m core.replay logs/ari-capture.jsonl.gz               # as fast as possible
+    python -m core.replay logs/ari-capture.jsonl.gz --speed 1     # original timing
+    python -m core.replay logs/ari-capture.jsonl.gz --workers 0   # strictly sequential
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from core.event_capture import read_capture
+from core.event_dispatcher import EventDispatcher
+from utils.metrics import LatencyStats
+
+
+logger = logging.getLogger(__name__)
+
+
+class FakeAriClient:
+    """
+    In-memory stand-in for AriClient used by replays and benchmarks.
+    Every call succeeds (after an optional simulated latency) and returns synthetic ids;
+    calls are counted per method.
+    """
+
+    def __init__(self, app_name: str = "salehi", latency: float = 0.0):
+        self.app_name = app_name
+        self.latency = latency
+        self.calls: Counter = Counter()
+        self.channels: Dict[str, Dict[str, Any]] = {}
+        self._ids = itertools.count(1)
+
+    def _next_id(self, prefix: str) -> str:
+        return f"{prefix}-{next(self._ids)}"
+
+    async def _call(self, name: str) -> None:
+        self.calls[name] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    async def close(self) -> None:
+        return None
+
+    async def set_event_filter(self, allowed_types: List[str]) -> Dict[str, Any]:
+        await self._call("set_event_filter")
+        return {"name": self.app_name}
+
+    async def list_channels(self) -> List[Dict[str, Any]]:
+        await self._call("list_channels")
+        return list(self.channels.values())
+
+    async def list_bridges(self) -> List[Dict[str, Any]]:
+        await self._call("list_bridges")
+        return []
+
+    async def create_bridge(self, name: str, bridge_type: str = "mixing") -> Dict[str, Any]:
+        await self._call("create_bridge")
+        return {"id": self._next_id("bridge"), "name": name, "bridge_type": bridge_type}
+
+    async def delete_bridge(self, bridge_id: str) -> None:
+        await self._call("delete_bridge")
+
+    async def add_channel_to_bridge(self, bridge_id: str, channel_id: str, role: Optional[str] = None) -> None:
+        await self._call("add_channel_to_bridge")
+
+    async def remove_channel_from_bridge(self, bridge_id: str, channel_id: str) -> None:
+        await self._call("remove_channel_from_bridge")
+
+    async def answer_channel(self, channel_id: str) -> None:
+        await self._call("answer_channel")
+
+    async def hangup_channel(self, channel_id: str, reason: str = "normal") -> None:
+        await self._call("hangup_channel")
+        self.channels.pop(channel_id, None)
+
+    async def play_on_channel(self, channel_id: str, media: str, lang: Optional[str] = None) -> Dict[str, Any]:
+        await self._call("play_on_channel")
+        return {"id": self._next_id("playback"), "media_uri": media, "target_uri": f"channel:{channel_id}"}
+
+    async def play_on_bridge(self, bridge_id: str, media: str, lang: Optional[str] = None) -> Dict[str, Any]:
+        await self._call("play_on_bridge")
+        return {"id": self._next_id("playback"), "media_uri": media, "target_uri": f"bridge:{bridge_id}"}
+
+    async def originate_call(
+        self,
+        endpoint: str,
+        app_args: str,
+        caller_id: Optional[str] = None,
+        timeout: int = 30,
+        variables: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        await self._call("originate_call")
+        channel_id = self._next_id("channel")
+        channel = {
+            "id": channel_id,
+            "state": "Down",
+            "dialplan": {"app_name": "Stasis", "app_data": f"{self.app_name},{app_args}"},
+        }
+        self.channels[channel_id] = channel
+        return channel
+
+    async def stop_playback(self, playback_id: str) -> None:
+        await self._call("stop_playback")
+
+    async def record_channel(self, channel_id: str, name: str, **kwargs: Any) -> Dict[str, Any]:
+        await self._call("record_channel")
+        return {"name": name, "target_uri": f"channel:{channel_id}"}
+
+    async def record_bridge(self, bridge_id: str, name: str, **kwargs: Any) -> Dict[str, Any]:
+        await self._call("record_bridge")
+        return {"name": name, "target_uri": f"bridge:{bridge_id}"}
+
+    async def get_channel_variable(self, channel_id: str, variable: str) -> Optional[str]:
+        await self._call("get_channel_variable")
+        return None
+
+    async def fetch_stored_recording(self, name: str) -> bytes:
+        await self._call("fetch_stored_recording")
+        return b""
+
+
+async def replay_capture(
+    path: str,
+    handler,
+    speed: float = 0.0,
+    workers: int = 8,
+    routing_key=None,
+) -> Dict[str, Any]:
+    """
+    Feed a capture into `handler`. speed=0 replays as fast as possible, 1.0 at the recorded
+    pace, 2.0 twice as fast. With workers>0 events go through the production EventDispatcher
+    (same ordering guarantees); workers=0 awaits each event sequentially.
+    """
+    dispatcher: Optional[EventDispatcher] = None
+    sequential_latency = LatencyStats()
+    if workers > 0:
+        dispatcher = EventDispatcher(handler, workers=workers, routing_key=routing_key, stats_interval=0)
+        dispatcher.start()
+    types: Counter = Counter()
+    frames = 0
+    decode_errors = 0
+    started = time.perf_counter()
+    try:
+        for offset, frame in read_capture(path):
+            if speed > 0:
+                delay = started + offset / speed - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            try:
+                event = json.loads(frame)
+            except json.JSONDecodeError:
+                decode_errors += 1
+                continue
+            frames += 1
+            types[event.get("type")] += 1
+            if dispatcher:
+                await dispatcher.submit(event)
+            else:
+                t0 = time.perf_counter()
+                try:
+                    await handler(event)
+                except Exception as exc:
+                    logger.exception("Replay handler failed for %s: %s", event.get("type"), exc)
+                sequential_latency.observe(time.perf_counter() - t0)
+        if dispatcher:
+            while dispatcher.depth():
+                await asyncio.sleep(0.005)
+    finally:
+        if dispatcher:
+            await dispatcher.stop()
+    elapsed = time.perf_counter() - started
+    return {
+        "events": frames,
+        "decode_errors": decode_errors,
+        "elapsed_s": round(elapsed, 3),
+        "events_per_s": round(frames / elapsed, 1) if elapsed > 0 else 0.0,
+        "handler_latency": (dispatcher.handler_latency if dispatcher else sequential_latency).snapshot(),
+        "event_types": dict(types.most_common()),
+    }
+
+
+async def _run(args: argparse.Namespace) -> None:
+    # Imported here so `core` stays importable without the sessions package.
+    from logic.base import BaseScenario
+    from sessions.session_manager import SessionManager
+
+    ari = FakeAriClient(app_name=args.app, latency=args.ari_latency_ms / 1000.0)
+    manager = SessionManager(ari, BaseScenario())
+    stats = await replay_capture(
+        args.capture,
+        manager.handle_event,
+        speed=args.speed,
+        workers=args.workers,
+        routing_key=manager.routing_key,
+    )
+    stats["ari_calls"] = dict(ari.calls.most_common())
+    stats["sessions_left"] = len(manager.sessions)
+    print(json.dumps(stats, indent=2, ensure_ascii=False))
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Replay a recorded ARI event capture into SessionManager.")
+    parser.add_argument("capture", help="capture file written with ARI_CAPTURE_PATH")
+    parser.add_argument("--speed", type=float, default=0.0, help="0 = as fast as possible, 1 = recorded pace")
+    parser.add_argument("--workers", type=int, default=8, help="dispatcher workers (0 = sequential)")
+    parser.add_argument("--app", default="salehi", help="ARI application name used in the capture")
+    parser.add_argument("--ari-latency-ms", type=float, default=0.0, help="simulated ARI REST latency")
+    parser.add_argument("--log-level", default="WARNING")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=getattr(logging, args.log_level.upper(), logging.WARNING))
+    asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
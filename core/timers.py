@@ -0,0 +1,143 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from utils.metrics import LatencyStats
+
+
+logger = logging.getLogger(__name__)
+
+
+class TimerHandle:
+    """A scheduled callback; `cancel()` is O(1) (the heap entry is dropped lazily)."""
+
+    __slots__ = ("when", "callback", "args", "cancelled", "service")
+
+    def __init__(self, when: float, callback: Callable[..., Any], args: Tuple[Any, ...], service: "TimerService"):
+        self.when = when
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+        # Cleared once the timer has fired.
+        self.service: Optional["TimerService"] = service
+
+    def cancel(self) -> None:
+        if not self.cancelled and self.service is not None:
+            self.cancelled = True
+            self.service._cancelled(self)
+
+
+class TimerService:
+    """
+    Engine-wide timers on one heap, run by a single coroutine.
+
+    Replaces a sleeping task per pending timeout: a timer is a slotted handle in the
+    heap until it fires or is cancelled, and only a timer that fires with a coroutine
+    callback costs a task. The runner sleeps until the earliest deadline and is woken
+    when an earlier one is added. Cancelled entries stay in the heap until they reach
+    the top, or until they outnumber the live ones and the heap is rebuilt.
+
+    Callbacks run on the event loop and must not block; an async callback is started
+    as a task. `lateness` records how far behind its deadline each timer fired.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self._heap: List[Tuple[float, int, TimerHandle]] = []
+        self._counter = itertools.count()
+        self._live = 0
+        self._stale = 0
+        self._runner: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Future] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self.fired = 0
+        self.cancelled = 0
+        self.lateness = LatencyStats()
+
+    def __len__(self) -> int:
+        return self._live
+
+    def call_later(self, delay: float, callback: Callable[..., Any], *args: Any) -> TimerHandle:
+        return self.call_at(self.clock() + max(delay, 0.0), callback, *args)
+
+    def call_at(self, when: float, callback: Callable[..., Any], *args: Any) -> TimerHandle:
+        handle = TimerHandle(when, callback, args, self)
+        earliest = self._heap[0][0] if self._heap else None
+        heapq.heappush(self._heap, (when, next(self._counter), handle))
+        self._live += 1
+        if self._runner is None or self._runner.done():
+            self._runner = asyncio.create_task(self._run())
+        elif earliest is None or when < earliest:
+            self._wake()
+        return handle
+
+    def _cancelled(self, handle: TimerHandle) -> None:
+        self._live -= 1
+        self._stale += 1
+        self.cancelled += 1
+        if self._stale > self._live + 64:
+            self._heap = [entry for entry in self._heap if not entry[2].cancelled]
+            heapq.heapify(self._heap)
+            self._stale = 0
+
+    def _wake(self) -> None:
+        if self._wakeup is not None and not self._wakeup.done():
+            self._wakeup.set_result(None)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            now = self.clock()
+            while self._heap and self._heap[0][0] <= now:
+                _, _, handle = heapq.heappop(self._heap)
+                if handle.cancelled:
+                    self._stale -= 1
+                    continue
+                self._live -= 1
+                handle.service = None
+                self._fire(handle, now)
+            timeout = self._heap[0][0] - now if self._heap else None
+            self._wakeup = loop.create_future()
+            try:
+                await asyncio.wait_for(self._wakeup, timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def _fire(self, handle: TimerHandle, now: float) -> None:
+        self.fired += 1
+        self.lateness.observe(now - handle.when)
+        try:
+            result = handle.callback(*handle.args)
+        except Exception:
+            logger.exception("Timer callback %r failed", handle.callback)
+            return
+        if asyncio.iscoroutine(result):
+            task = asyncio.create_task(result)
+            self._tasks.add(task)
+            task.add_done_callback(self._task_done)
+
+    def _task_done(self, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Timer task failed", exc_info=task.exception())
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending": self._live,
+            "fired": self.fired,
+            "cancelled": self.cancelled,
+            "running_callbacks": len(self._tasks),
+            "lateness": self.lateness.snapshot(),
+        }
+
+    async def close(self) -> None:
+        """Stop the runner and cancel callbacks still running; pending timers never fire."""
+        for task in [self._runner, *self._tasks]:
+            if task is not None:
+                task.cancel()
+        await asyncio.gather(*[t for t in (self._runner, *self._tasks) if t is not None], return_exceptions=True)
+        self._runner = None
+        self._tasks.clear()
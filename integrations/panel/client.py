@@ -2,7 +2,7 @@ import asyncio
 import logging
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 import httpx
 
@@ -14,6 +14,7 @@ logger = logging.getLogger(__name__)
 class PanelNumber:
     id: int
     phone_number: str
+    priority: int = 0
 
 
 @dataclass
@@ -54,8 +55,12 @@ class PanelClient:
             limits=limits,
             headers={"Authorization": f"Bearer {api_token}"},
         )
-        self.pending_reports: list[dict] = []
+        # Unreported results by id, in report order; the journal records them one by one.
+        self.pending_reports: Dict[int, dict] = {}
+        self._report_seq = 0
         self.lock = asyncio.Lock()
+        # Optional utils.journal.Journal: unreported results survive a restart.
+        self.journal = None
 
     async def close(self) -> None:
         await self.client.aclose()
@@ -81,7 +86,7 @@ class PanelClient:
                 )
             batch = data.get("batch", {}) or {}
             numbers = [
-                PanelNumber(id=item["id"], phone_number=item["phone_number"])
+                PanelNumber(id=item["id"], phone_number=item["phone_number"], priority=int(item.get("priority") or 0))
                 for item in batch.get("numbers", []) or []
             ]
             agents = [
@@ -151,27 +156,54 @@ class PanelClient:
         except Exception as exc:
             logger.warning("Failed to report result to panel; queueing. err=%s payload=%s", exc, payload)
             async with self.lock:
-                self.pending_reports.append(payload)
+                self._report_seq += 1
+                self.pending_reports[self._report_seq] = payload
+                self._journal("panel_add", id=self._report_seq, report=payload)
 
     async def flush_pending(self) -> None:
         async with self.lock:
             if not self.pending_reports:
                 return
-            queued = list(self.pending_reports)
+            queued = list(self.pending_reports.items())
             self.pending_reports.clear()
-        for payload in queued:
+        done: List[int] = []
+        for idx, (report_id, payload) in enumerate(queued):
             if not payload.get("number_id") and not payload.get("phone_number"):
                 logger.debug("Dropping queued panel report without number/phone: %s", payload)
+                done.append(report_id)
                 continue
             try:
                 resp = await self.client.post("/api/dialer/report-result", json=payload)
                 resp.raise_for_status()
                 logger.info("Flushed queued report to panel number_id=%s", payload.get("number_id"))
+                done.append(report_id)
             except Exception as exc:
                 logger.warning("Failed to flush queued report; requeue. err=%s payload=%s", exc, payload)
                 async with self.lock:
-                    self.pending_reports.append(payload)
+                    # Keep this one and everything not yet attempted.
+                    self.pending_reports.update(queued[idx:])
                 break
+        if done:
+            self._journal("panel_done", ids=done)
+
+    def _journal(self, kind: str, **data: Any) -> None:
+        if self.journal is not None:
+            self.journal.append(kind, **data)
+
+    def journal_snapshot(self) -> List[Dict[str, Any]]:
+        return [{"k": "panel_add", "id": report_id, "report": payload} for report_id, payload in self.pending_reports.items()]
+
+    def restore_from_journal(self, records: List[Dict[str, Any]]) -> None:
+        for record in records:
+            kind = record.get("k")
+            if kind == "panel_add":
+                self.pending_reports[record["id"]] = record["report"]
+                self._report_seq = max(self._report_seq, record["id"])
+            elif kind == "panel_done":
+                for report_id in record["ids"]:
+                    self.pending_reports.pop(report_id, None)
+        if self.pending_reports:
+            logger.info("Restored %d unreported panel result(s) from journal", len(self.pending_reports))
 
     @staticmethod
     def _parse_dt(value: Optional[str]) -> Optional[datetime]:
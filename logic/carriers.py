@@ -0,0 +1,81 @@
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from logic.contact_queue import dedup_key
+
+
+# Iranian mobile ranges (national format) -> operator.
+CARRIER_PREFIXES: Dict[str, str] = {
+    **{f"091{d}": "mci" for d in range(10)},
+    **{f"099{d}": "mci" for d in range(5)},
+    **{f"090{d}": "irancell" for d in range(6)},
+    **{p: "irancell" for p in ("0930", "0933", "0935", "0936", "0937", "0938", "0939", "0941")},
+    **{p: "rightel" for p in ("0920", "0921", "0922")},
+    "0998": "shatel",
+}
+
+
+class PrefixTable:
+    """
+    Longest-prefix match of a number to a carrier. The table is a single dict probed
+    once per distinct prefix length (longest first), so a lookup is a handful of
+    slices and hash probes whatever the table size.
+    """
+
+    def __init__(self, prefixes: Dict[str, str]):
+        self.prefixes = dict(prefixes)
+        self.lengths = sorted({len(prefix) for prefix in self.prefixes}, reverse=True)
+
+    def match(self, number: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+        """(matched prefix, carrier), or (None, None) for an unknown range."""
+        if not number:
+            return None, None
+        key = dedup_key(number)
+        for length in self.lengths:
+            carrier = self.prefixes.get(key[:length])
+            if carrier is not None:
+                return key[:length], carrier
+        return None, None
+
+    def carrier_of(self, number: Optional[str]) -> Optional[str]:
+        return self.match(number)[1]
+
+
+class AffinityStats:
+    """Answer rate per destination prefix, split by whether the line's carrier matched."""
+
+    def __init__(self) -> None:
+        # (prefix, same carrier) -> [attempts, answered]
+        self.counts: Dict[Tuple[str, bool], List[int]] = {}
+        self.pending: Dict[str, Tuple[str, bool]] = {}
+
+    def on_dialed(self, session_id: str, prefix: Optional[str], same_carrier: bool) -> None:
+        key = (prefix or "other", same_carrier)
+        self.counts.setdefault(key, [0, 0])[0] += 1
+        self.pending[session_id] = key
+
+    def on_answered(self, session_id: str) -> None:
+        key = self.pending.pop(session_id, None)
+        if key is not None:
+            self.counts[key][1] += 1
+
+    def discard(self, session_id: str) -> None:
+        self.pending.pop(session_id, None)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        report: Dict[str, Dict[str, Any]] = {}
+        for (prefix, same), (attempts, answered) in sorted(self.counts.items()):
+            report.setdefault(prefix, {})["same_carrier" if same else "other_carrier"] = {
+                "attempts": attempts,
+                "answer_rate": round(answered / attempts, 3) if attempts else None,
+            }
+        return report
+
+
+def line_carriers(lines: Iterable[str], tags: Dict[str, str], table: PrefixTable) -> Dict[str, str]:
+    """Carrier per line: OUTBOUND_LINE_CARRIERS tag, else the line's own number range."""
+    carriers: Dict[str, str] = {}
+    for line in lines:
+        carrier = tags.get(line) or table.carrier_of(line)
+        if carrier:
+            carriers[line] = carrier
+    return carriers
@@ -0,0 +1,221 @@
+import logging
+import sqlite3
+import time
+from dataclasses import dataclass
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ContactItem:
+    phone_number: str
+    number_id: Optional[int] = None
+    batch_id: Optional[str] = None
+    attempted_at: Optional[datetime] = None
+    priority: int = 0
+    # 1 for the first call; retries carry the attempt number they will make.
+    attempt: int = 1
+    # Queue position (assigned on enqueue); a requeued contact keeps its place.
+    seq: Optional[int] = None
+
+    def to_record(self) -> Dict[str, Any]:
+        return {"p": self.phone_number, "id": self.number_id, "b": self.batch_id, "n": self.attempt, "pr": self.priority}
+
+
+def dedup_key(number: str) -> str:
+    """
+    Same subscriber, same key: the digits in national format (0098/+98/98 folded to 0,
+    a missing trunk 0 restored). Also the normalized form the numbering plan checks.
+    """
+    digits = "".join(ch for ch in number if ch.isdigit())
+    if digits.startswith("00"):
+        digits = digits[2:]
+    if digits.startswith("98") and len(digits) == 12:
+        digits = digits[2:]
+    if len(digits) == 10 and digits[0] != "0":
+        digits = "0" + digits
+    return digits or number.strip()
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS contacts (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    phone TEXT NOT NULL,
+    number TEXT NOT NULL,
+    number_id INTEGER,
+    batch_id TEXT,
+    priority INTEGER NOT NULL DEFAULT 0,
+    next_eligible REAL NOT NULL DEFAULT 0,
+    attempt INTEGER NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS contacts_ready ON contacts (next_eligible, priority DESC, seq);
+CREATE INDEX IF NOT EXISTS contacts_phone ON contacts (phone);
+CREATE INDEX IF NOT EXISTS contacts_batch ON contacts (batch_id);
+CREATE TABLE IF NOT EXISTS seen (
+    phone TEXT PRIMARY KEY,
+    day TEXT NOT NULL,
+    number_id INTEGER
+);
+CREATE INDEX IF NOT EXISTS seen_day ON seen (day);
+"""
+
+
+class ContactQueue:
+    """
+    Pending outbound contacts in an embedded SQLite database, so the queue survives
+    restarts on its own.
+
+    Contacts are dialed highest `priority` first, FIFO within a priority. A contact
+    may carry a not-before time (epoch seconds); it stays deferred (next_eligible > 0)
+    until promoted, after which it is ready (next_eligible = 0). Both the ready scan
+    and promotion walk the (next_eligible, priority, seq) index, so push and pop stay
+    O(log n) however many contacts are pending.
+
+    A number (by `dedup_key`) is accepted at most once per calendar day and never
+    while an earlier copy is still pending. A re-issue of the copy already queued or
+    dialed (same panel `number_id`) is dropped quietly; only a different number_id
+    for the same subscriber comes back as a duplicate. Requeued contacts bypass
+    dedup and keep their original position.
+
+    The database runs in WAL mode with synchronous=NORMAL: commits do not fsync, so
+    the calls are cheap enough to make from the event loop.
+    """
+
+    def __init__(self, path: str = "", clock: Callable[[], float] = time.time):
+        self.path = path or ":memory:"
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self.created = self.path == ":memory:" or not Path(self.path).exists()
+        self.clock = clock
+        self.db = sqlite3.connect(self.path, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(_SCHEMA)
+        columns = {row[1] for row in self.db.execute("PRAGMA table_info(contacts)")}
+        if "attempt" not in columns:
+            self.db.execute("ALTER TABLE contacts ADD COLUMN attempt INTEGER NOT NULL DEFAULT 1")
+        if "number_id" not in {row[1] for row in self.db.execute("PRAGMA table_info(seen)")}:
+            self.db.execute("ALTER TABLE seen ADD COLUMN number_id INTEGER")
+        self._size = self.db.execute("SELECT COUNT(*) FROM contacts").fetchone()[0]
+        self._next_due = self._earliest_deferred()
+        self._seen_day: Optional[str] = None
+        self.duplicates = 0
+        self.reissued = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __bool__(self) -> bool:
+        return self._size > 0
+
+    def close(self) -> None:
+        self.db.close()
+
+    # Enqueue ---------------------------------------------------------------
+    def push(
+        self, items: Iterable[ContactItem], not_before: float = 0.0
+    ) -> Tuple[List[ContactItem], List[ContactItem]]:
+        """
+        Enqueue `items`; returns (accepted, duplicates). Re-issues of the copy already
+        queued or dialed today are in neither list.
+        """
+        today = date.today().isoformat()
+        if self._seen_day != today:
+            self.db.execute("DELETE FROM seen WHERE day < ?", (today,))
+            self._seen_day = today
+        accepted: List[ContactItem] = []
+        duplicates: List[ContactItem] = []
+        reissued = 0
+        self.db.execute("BEGIN")
+        try:
+            for item in items:
+                key = dedup_key(item.phone_number)
+                pending = self.db.execute("SELECT number_id FROM contacts WHERE phone = ? LIMIT 1", (key,)).fetchone()
+                # The copy that owns today's slot: the pending one, else this one.
+                owner = pending[0] if pending else item.number_id
+                marked = self.db.execute(
+                    "INSERT INTO seen (phone, day, number_id) VALUES (?, ?, ?) "
+                    "ON CONFLICT (phone) DO UPDATE SET day = excluded.day, number_id = excluded.number_id "
+                    "WHERE seen.day <> excluded.day",
+                    (key, today, owner),
+                ).rowcount
+                if marked and not pending:
+                    self._insert(item, key, not_before)
+                    accepted.append(item)
+                    continue
+                if not pending:
+                    owner = self.db.execute("SELECT number_id FROM seen WHERE phone = ?", (key,)).fetchone()[0]
+                if item.number_id is not None and item.number_id == owner:
+                    # The panel handing the same number back; its copy carries the result.
+                    reissued += 1
+                else:
+                    duplicates.append(item)
+            self.db.execute("COMMIT")
+        except Exception:
+            self.db.execute("ROLLBACK")
+            raise
+        self.duplicates += len(duplicates)
+        self.reissued += reissued
+        return accepted, duplicates
+
+    def requeue(self, item: ContactItem, not_before: float = 0.0) -> None:
+        """Put a popped contact back in its original place (no dedup)."""
+        self._insert(item, dedup_key(item.phone_number), not_before)
+
+    def _insert(self, item: ContactItem, key: str, not_before: float) -> None:
+        cursor = self.db.execute(
+            "INSERT INTO contacts (seq, phone, number, number_id, batch_id, priority, next_eligible, attempt) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (item.seq, key, item.phone_number, item.number_id, item.batch_id, item.priority, not_before, item.attempt),
+        )
+        item.seq = cursor.lastrowid
+        self._size += 1
+        if not_before > 0 and (self._next_due is None or not_before < self._next_due):
+            self._next_due = not_before
+
+    # Dequeue ---------------------------------------------------------------
+    def pop(self) -> Optional[ContactItem]:
+        """Highest-priority ready contact, or None."""
+        if not self._size:
+            return None
+        self._promote()
+        row = self.db.execute(
+            "SELECT seq, number, number_id, batch_id, priority, attempt FROM contacts "
+            "WHERE next_eligible = 0 ORDER BY priority DESC, seq LIMIT 1"
+        ).fetchone()
+        if row is None:
+            return None
+        self.db.execute("DELETE FROM contacts WHERE seq = ?", (row[0],))
+        self._size -= 1
+        return ContactItem(
+            phone_number=row[1], number_id=row[2], batch_id=row[3], priority=row[4], attempt=row[5], seq=row[0]
+        )
+
+    def _promote(self) -> None:
+        now = self.clock()
+        if self._next_due is None or now < self._next_due:
+            return
+        self.db.execute("UPDATE contacts SET next_eligible = 0 WHERE next_eligible > 0 AND next_eligible <= ?", (now,))
+        self._next_due = self._earliest_deferred()
+
+    def _earliest_deferred(self) -> Optional[float]:
+        return self.db.execute("SELECT MIN(next_eligible) FROM contacts WHERE next_eligible > 0").fetchone()[0]
+
+    def next_ready_in(self) -> Optional[float]:
+        """Seconds until a deferred contact becomes ready (None if none is deferred)."""
+        if self._next_due is None:
+            return None
+        return max(self._next_due - self.clock(), 0.0)
+
+    def remove_batch(self, batch_id: str) -> int:
+        """Drop every pending contact of a panel batch (e.g. the batch was withdrawn)."""
+        removed = self.db.execute("DELETE FROM contacts WHERE batch_id = ?", (batch_id,)).rowcount
+        self._size -= removed
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        return {"pending": self._size, "duplicates": self.duplicates, "reissued": self.reissued}
@@ -1,28 +1,43 @@
 import asyncio
 import logging
+import math
 import time
 from collections import deque
-from dataclasses import dataclass
-from datetime import date, datetime, timedelta
-from typing import Deque, List, Optional
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Deque, Dict, Iterable, List, Optional
 
 from config.settings import Settings
 from core.ari_client import AriClient
+from core.timers import TimerHandle, TimerService
 from integrations.panel.client import NextBatchResponse, PanelClient, PanelNumber
 from integrations.sms.melipayamak import SMSClient
+from logic.carriers import CARRIER_PREFIXES, AffinityStats, PrefixTable, line_carriers
+from logic.contact_queue import ContactItem, ContactQueue
+from logic.leases import INBOUND, OPERATOR, OUTBOUND, LeaseRegistry, LineLease
+from logic.line_health import QUARANTINE, RECOVERED, LineHealth
+from logic.line_scheduler import LineScheduler, LineState, OriginationThrottle
+from logic.numbering import UNALLOCATED_PREFIXES, NumberingPlan
+from logic.pacing import PredictivePacer
+from logic.reputation import DEAD_RESULTS, DEFER, SKIP, ReputationCache
+from logic.retry import RetryScheduler
+from logic.trunks import ORIGINATE_FAILED, TrunkRouter
 from sessions.session import SessionStatus
 from sessions.session_manager import SessionManager
+from utils.journal import Journal
+from utils.metrics import LatencyStats, RateMeter
 
 
 logger = logging.getLogger(__name__)
 
+# Upper bound on any dialer wait, so day rollover is noticed even with no events.
+MAX_IDLE_WAIT = 30.0
+# STT/LLM slots free up without a dialer event; re-check this often while held on them.
+PACING_SLOT_RECHECK = 0.5
 
-@dataclass
-class ContactItem:
-    phone_number: str
-    number_id: Optional[int] = None
-    batch_id: Optional[str] = None
-    attempted_at: Optional[datetime] = None
+
+def _epoch(value: datetime) -> float:
+    # Dialer timestamps are naive UTC (datetime.utcnow()).
+    return value.replace(tzinfo=timezone.utc).timestamp()
 
 
 class Dialer:
@@ -36,27 +51,93 @@ class Dialer:
         ari_client: AriClient,
         session_manager: SessionManager,
         panel_client: Optional[PanelClient] = None,
+        timers: Optional[TimerService] = None,
     ):
         self.settings = settings
         self.ari_client = ari_client
         self.session_manager = session_manager
         self.panel_client = panel_client
-        self.contacts: Deque[ContactItem] = deque(
-            [ContactItem(phone_number=number) for number in settings.dialer.static_contacts]
+        self.contacts = ContactQueue(settings.dialer.contact_queue_path)
+        # Numbers outside the numbering plan are reported to the panel instead of dialed.
+        self.numbering: Optional[NumberingPlan] = None
+        if settings.dialer.numbering_plan == "ir":
+            self.numbering = NumberingPlan(unallocated=settings.dialer.unallocated_prefixes or UNALLOCATED_PREFIXES)
+        elif settings.dialer.numbering_plan:
+            logger.warning("Unknown NUMBERING_PLAN=%s; dialing numbers unchecked", settings.dialer.numbering_plan)
+        # Numbers that recently came back power_off are deferred or skipped on enqueue.
+        self.reputation = ReputationCache(
+            settings.dialer.reputation_path,
+            half_life=settings.dialer.reputation_half_life,
+            ttl=settings.dialer.reputation_ttl,
+            max_entries=settings.dialer.reputation_max_entries,
+            defer_score=settings.dialer.reputation_defer_score,
+            skip_score=settings.dialer.reputation_skip_score,
+        )
+        self._rated: set[str] = set()
+        if self.contacts.created and settings.dialer.static_contacts:
+            # Seeded once: afterwards the on-disk queue is authoritative.
+            self.contacts.push(ContactItem(phone_number=number) for number in settings.dialer.static_contacts)
+        lines = [norm for norm in map(self._normalize_number, settings.dialer.outbound_numbers) if norm]
+        # Predictive pacing: dial ahead of MAX_CONCURRENT_CALLS based on live answer rates.
+        self.pacer: Optional[PredictivePacer] = None
+        if settings.pacing.mode == "predictive":
+            self.pacer = PredictivePacer(
+                target=settings.pacing.target_occupancy,
+                max_ratio=settings.pacing.max_ratio,
+                window=settings.pacing.window,
+                ai_slots=min(settings.concurrency.max_parallel_stt, settings.concurrency.max_parallel_llm),
+                busy_calls=lambda: sum(state.occupied for state in self.lines),
+            )
+        elif settings.pacing.mode:
+            logger.warning("Unknown PACING_MODE=%s; dialing within MAX_CONCURRENT_CALLS", settings.pacing.mode)
+        self._pacing_hour = datetime.now().hour
+        # Destination carrier by number range; lines are tagged so calls can stay on-net.
+        self.carriers = PrefixTable(CARRIER_PREFIXES)
+        tags = {self._normalize_number(line): tag for line, tag in settings.dialer.line_carriers.items()}
+        self.affinity = AffinityStats()
+        # Per-line concurrency, per-second/per-minute buckets and daily quota.
+        self.lines = LineScheduler(
+            dict.fromkeys(lines),
+            max_concurrent=settings.dialer.max_concurrent_calls,
+            per_minute=settings.dialer.max_calls_per_minute,
+            per_day=settings.dialer.max_calls_per_day,
+            limit_for=self._line_limit if self.pacer else None,
+            carriers=line_carriers(lines, tags, self.carriers),
+        )
+        # Per-line hangup-cause histograms; lines the carrier blocks are quarantined.
+        self.line_health = LineHealth(
+            lines,
+            window=settings.dialer.line_health_window,
+            threshold=settings.dialer.line_failure_threshold,
+            min_calls=settings.dialer.line_quarantine_min_calls,
+            cooldown=settings.dialer.line_quarantine_seconds,
+            max_cooldown=settings.dialer.line_quarantine_max_seconds,
+            max_fraction=settings.dialer.line_quarantine_max_fraction,
+        )
+        # Calls that failed because of their line; kept out of the number's reputation.
+        self._line_failures: set[str] = set()
+        # Outbound sessions whose customer answered (for per-line occupancy).
+        self.answered_sessions: set[str] = set()
+        # Weighted, health-scored routing over OUTBOUND_TRUNKS (OUTBOUND_TRUNK alone by default).
+        weights = {name: w for name, w in settings.dialer.outbound_trunks.items() if w > 0}
+        self.trunks = TrunkRouter(
+            weights or {settings.dialer.outbound_trunk: 1.0},
+            settings.dialer.trunk_max_concurrent,
+            window=settings.dialer.trunk_health_window,
+        )
+        # Every call's hold on a line/trunk; the only way occupancy changes (see _claim_line).
+        self.leases = LeaseRegistry(self.lines, self.trunks)
+        self._suspect_leases: set[int] = set()
+        self._reconcile_timer: Optional[TimerHandle] = None
+        self.lease_repairs: Dict[str, int] = {}
+        # Outbound calls whose trunk outcome (hangup cause) is not recorded yet.
+        self._trunk_unscored: set[str] = set()
+        # Global / per-trunk origination pacing, applied on top of the per-line limits.
+        self.throttle = OriginationThrottle(
+            settings.dialer.max_originations_per_second,
+            settings.dialer.trunk_originations_per_second,
+            burst=settings.dialer.origination_burst,
         )
-        self.line_stats = {}
-        for num in settings.dialer.outbound_numbers:
-            norm = self._normalize_number(num)
-            if not norm:
-                continue
-            self.line_stats[norm] = {
-                "active": 0,
-                "inbound_active": 0,
-                "attempts": deque(),
-                "daily": 0,
-                "daily_marker": date.today(),
-                "last_originated_ts": 0.0,
-            }
         self.attempt_timestamps: Deque[datetime] = deque()  # global per-minute
         self.daily_counter = 0  # global per-day
         self.daily_marker: date = date.today()
@@ -65,104 +146,269 @@ class Dialer:
         self.last_originate_window_start: float = 0.0
         self.originate_count_in_window: int = 0
         self.next_panel_poll: datetime = datetime.utcnow()
-        self.timeout_tasks: dict[str, asyncio.Task] = {}
+        # Background panel fetch (at most one in flight) and the inputs used to size it.
+        self._prefetch_task: Optional[asyncio.Task] = None
+        self._panel_allowed = False
+        self._panel_exhausted = False
+        self.dial_rate = RateMeter(60.0)
+        self.panel_latency = LatencyStats()
+        self.timers = timers or TimerService()
+        # Local retries for busy/missed/... results (RETRY_POLICIES), fed back through the queue.
+        self.retries = RetryScheduler(settings.dialer.retry_policies)
+        self._retried: set[str] = set()
+        self.timeout_timers: dict[str, TimerHandle] = {}
         self.paused_by_failures = False
         self.failure_streak = 0
         self.sms_client = SMSClient(settings.sms) if settings.sms.api_key and settings.sms.sender else None
         self.paused_reason = ""
-        self.session_line: dict[str, str] = {}
-        self.inbound_session_line: dict[str, str] = {}
-        self.waiting_inbound: dict[str, int] = {}
         # When an operator leg is being placed, pause queue origination until it obtains a line.
         self.operator_priority_requests: int = 0
+        # Set by the ARI event dispatcher while its ingest queue is above the high watermark.
+        self.engine_saturated = False
+        # Crash-recovery journal (queue mutations, line counters, calls in flight).
+        self.journal: Optional[Journal] = None
+        self.in_flight: Dict[str, Dict[str, Any]] = {}
+        self.interrupted_calls: Dict[str, Dict[str, Any]] = {}
+        # Resolved (and replaced) whenever capacity, the queue or a pause changes; see _wake().
+        self._state_changed: Optional[asyncio.Future] = None
+        self.wakeups = 0
+        # Originate requests awaiting ARI (up to MAX_ORIGINATIONS_IN_FLIGHT).
+        self._originations: set[asyncio.Task] = set()
+        # Panel reports for numbers dropped at dial time (see _next_contact).
+        self._reports: set[asyncio.Task] = set()
 
     async def run(self, stop_event: asyncio.Event) -> None:
         if self._running:
             return
         self._running = True
         logger.info("Dialer started with %d queued contacts", len(self.contacts))
+        self._schedule_reconcile()
         try:
             while not stop_event.is_set() and self._running:
+                # Arm before checking state so a signal raised meanwhile is not missed.
+                signal = self._arm_wakeup()
                 self._reset_daily_if_needed()
-                await self._maybe_refill_from_panel()
-                if self.paused_by_failures:
-                    await asyncio.sleep(2)
+                self._maybe_prefetch()
+                if self.paused_by_failures or self.operator_priority_requests > 0 or self.engine_saturated:
+                    await self._wait_for_wakeup(signal, self._seconds_until_panel_poll())
+                    continue
+                line = self._available_line()
+                if not line:
+                    await self._wait_for_wakeup(signal, self.lines.next_eligible_in())
+                    continue
+                trunk, pace = self.trunks.select(self.throttle.ready_in)
+                if trunk is None:
+                    # Woken by a finishing call when every trunk is at its concurrency cap.
+                    await self._wait_for_wakeup(signal, pace)
                     continue
-                if self.operator_priority_requests > 0:
-                    await asyncio.sleep(0.05)
+                if not self._may_overdial(line):
+                    await self._wait_for_wakeup(signal, PACING_SLOT_RECHECK)
                     continue
-                if not await self._can_start_call():
-                    await asyncio.sleep(1)
+                if len(self._originations) >= self.settings.dialer.max_originations_in_flight:
+                    # Woken when one of them returns.
+                    await self._wait_for_wakeup(signal, None)
                     continue
-                contact = await self._next_contact()
+                # Select, pop and claim happen without an await in between, so neither an
+                # operator reservation nor another origination can take the same slot.
+                contact = self._next_contact()
                 if not contact:
-                    await asyncio.sleep(5)
+                    await self._wait_for_wakeup(signal, self._seconds_until_contact())
                     continue
-                await self._originate(contact)
-                await asyncio.sleep(0.05)
+                lease = self._claim_line(self._line_for(contact, line), trunk)
+                task = asyncio.create_task(self._originate(contact, lease))
+                self._originations.add(task)
+                task.add_done_callback(self._origination_done)
         finally:
             self._running = False
+            if self._reconcile_timer is not None:
+                self._reconcile_timer.cancel()
+            pending = [*self._originations, *self._reports, *([self._prefetch_task] if self._prefetch_task else [])]
+            if pending:
+                # Let a batch the panel already handed out land in the queue (and journal).
+                await asyncio.gather(*pending, return_exceptions=True)
             logger.info("Dialer stopped")
 
+    def _origination_done(self, task: asyncio.Task) -> None:
+        self._originations.discard(task)
+        self._wake()
+
     async def stop(self) -> None:
         self._running = False
+        self._wake()
 
-    async def add_contacts(self, numbers: List[str]) -> None:
-        async with self.lock:
-            for number in numbers:
-                clean = number.strip()
-                if clean:
-                    self.contacts.append(ContactItem(phone_number=clean))
-        logger.info("Queued %d new contacts", len(numbers))
+    def _arm_wakeup(self) -> asyncio.Future:
+        if self._state_changed is None or self._state_changed.done():
+            self._state_changed = asyncio.get_running_loop().create_future()
+        return self._state_changed
+
+    def _wake(self) -> None:
+        """
+        Signal that a line may have freed up, contacts were queued or a pause ended.
+        Wakes every waiter (the run loop and operator line reservations) at once.
+        """
+        if self._state_changed is not None and not self._state_changed.done():
+            self._state_changed.set_result(None)
+            self.wakeups += 1
+
+    async def _wait_for_wakeup(self, signal: asyncio.Future, timeout: Optional[float]) -> None:
+        # Cap idle waits so day rollover and settings drift are still picked up.
+        timeout = MAX_IDLE_WAIT if timeout is None else min(max(timeout, 0.0), MAX_IDLE_WAIT)
+        try:
+            await asyncio.wait_for(asyncio.shield(signal), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def _seconds_until_panel_poll(self) -> Optional[float]:
+        if not self.panel_client or self._prefetch_task is not None:
+            # A fetch in flight wakes us when it lands.
+            return None
+        due_in = (self.next_panel_poll - datetime.utcnow()).total_seconds()
+        if due_in <= 0 and self._prefetch_size() <= 0:
+            # Overdue but _maybe_prefetch has no room to fetch into: wait for a line to free
+            # up (which wakes us) instead of retrying the poll on every pass.
+            return None
+        return due_in
+
+    def _seconds_until_contact(self) -> Optional[float]:
+        """Until the next panel poll or the earliest deferred contact, whichever comes first."""
+        waits = [w for w in (self._seconds_until_panel_poll(), self.contacts.next_ready_in()) if w is not None]
+        return min(waits) if waits else None
+
+    def set_engine_saturated(self, saturated: bool) -> None:
+        """
+        Event-engine backpressure hook: hold new originations while ARI events are backing up.
+        """
+        if saturated != self.engine_saturated:
+            logger.warning("Dialer %s originations: event engine %s",
+                           "pausing" if saturated else "resuming",
+                           "saturated" if saturated else "drained")
+        self.engine_saturated = saturated
+        if not saturated:
+            self._wake()
+
+    async def add_contacts(self, numbers: List[str], priority: int = 0) -> None:
+        items, invalid = self._screen(ContactItem(phone_number=n.strip(), priority=priority) for n in numbers if n.strip())
+        accepted, duplicates, unreachable = self._enqueue(items)
+        self._wake()
+        logger.info(
+            "Queued %d new contacts (%d duplicate(s), %d invalid, %d recently unreachable skipped)",
+            len(accepted),
+            len(duplicates),
+            len(invalid),
+            len(unreachable),
+        )
+
+    async def on_call_answered(self, session_id: str) -> None:
+        """Customer leg of an outbound call answered: it now occupies its line."""
+        lease = self.leases.get(session_id)
+        if lease is None or session_id in self.answered_sessions:
+            return
+        self.answered_sessions.add(session_id)
+        self.affinity.on_answered(session_id)
+        if self.pacer is not None:
+            self.pacer.on_answered(session_id)
+        self.leases.mark_answered(lease)
 
     async def on_session_completed(self, session_id: str) -> None:
         logger.debug("Session %s completed; dialer notified", session_id)
+        timer = self.timeout_timers.pop(session_id, None)
+        if timer is not None:
+            timer.cancel()
         async with self.lock:
-            line = self.session_line.pop(session_id, None)
-            if line and line in self.line_stats:
-                self.line_stats[line]["active"] = max(self.line_stats[line]["active"] - 1, 0)
-            inbound_line = self.inbound_session_line.pop(session_id, None)
-            if inbound_line and inbound_line in self.line_stats:
-                stats = self.line_stats[inbound_line]
-                stats["inbound_active"] = max(stats.get("inbound_active", 0) - 1, 0)
+            # First, so nothing below can keep the session's lines held.
+            self.leases.release_session(session_id)
+            if self.in_flight.pop(session_id, None) is not None:
+                self._journal("call_end", sid=session_id)
+            if self.pacer is not None:
+                self.pacer.on_finished(session_id)
+            self.answered_sessions.discard(session_id)
+            self.affinity.discard(session_id)
+            self._retried.discard(session_id)
+            self._rated.discard(session_id)
+            self._line_failures.discard(session_id)
+            self._trunk_unscored.discard(session_id)
+        self._wake()
         # reset failure streak on completion unless paused
         if not self.paused_by_failures:
             self.failure_streak = 0
 
+    async def on_call_hangup(self, session_id: str, cause: Optional[str], answered: bool) -> None:
+        """Customer leg hung up: score its trunk and line by the hangup cause (once per call)."""
+        if session_id not in self._trunk_unscored:
+            return
+        self._trunk_unscored.discard(session_id)
+        lease = self.leases.get(session_id)
+        if lease is None:
+            return
+        self.trunks.record_outcome(lease.trunk, cause, answered=answered)
+        line = lease.line
+        if self.line_health.is_line_failure(cause, answered):
+            self._line_failures.add(session_id)
+        change = self.line_health.record(line, cause, answered)
+        if change == QUARANTINE:
+            self._quarantine_line(line)
+        elif change == RECOVERED:
+            logger.info("Line %s passed its probe call; back in rotation", line)
+            self.lines.reinstate(line)
+            self._wake()
+
+    def _quarantine_line(self, line: str) -> None:
+        cooldown = self.line_health.records[line].cooldown
+        logger.warning("Line %s quarantined for %.0fs: carrier rejecting its calls", line, cooldown)
+        self.lines.hold(line)
+        self.timers.call_later(cooldown, self._end_quarantine, line)
+
+    def _end_quarantine(self, line: str) -> None:
+        self.line_health.cooldown_over(line)
+        self.lines.probe(line)
+        logger.info("Line %s cooldown over; placing a probe call", line)
+        self._wake()
+
     async def register_inbound_session(self, session_id: str, line: str) -> bool:
         """
         Track inbound sessions per line so MAX_CONCURRENT_CALLS applies to combined inbound+outbound.
         Returns False when the line is already at or above capacity (caller should wait).
         """
         async with self.lock:
-            stats = self.line_stats.get(line)
-            if not stats:
+            if line not in self.lines:
                 return True  # unknown line; do not block
-            total_active = self._line_active_total(stats)
-            if total_active >= self.settings.dialer.max_concurrent_calls:
-                self.waiting_inbound[line] = self.waiting_inbound.get(line, 0) + 1
+            if not self.lines.has_room(line):
+                self.lines.set_waiting(line, +1)
                 return False
-            stats["inbound_active"] = stats.get("inbound_active", 0) + 1
-            self.inbound_session_line[session_id] = line
+            self.leases.acquire(line, INBOUND, session_id=session_id)
             return True
 
+    async def adopt_session(
+        self, session_id: str, line: Optional[str], inbound: bool = False, answered: bool = False
+    ) -> None:
+        """
+        Count a call restored from the session store against its line, so per-line
+        limits stay correct after a restart.
+        """
+        if not line:
+            return
+        async with self.lock:
+            if line not in self.lines:
+                return
+            if inbound:
+                self.leases.acquire(line, INBOUND, session_id=session_id)
+            else:
+                self.leases.acquire(line, OUTBOUND, session_id=session_id, restored=True, answered=answered)
+                if answered:
+                    self.answered_sessions.add(session_id)
+
     async def try_register_waiting_inbound(self, session_id: str, line: str) -> bool:
         """
         Attempt to promote a waiting inbound call into an active slot.
         """
         async with self.lock:
-            stats = self.line_stats.get(line)
-            if not stats:
+            if line not in self.lines:
                 return True
-            total_active = self._line_active_total(stats)
-            if total_active >= self.settings.dialer.max_concurrent_calls:
+            if not self.lines.has_room(line):
                 return False
-            stats["inbound_active"] = stats.get("inbound_active", 0) + 1
-            self.inbound_session_line[session_id] = line
-            if line in self.waiting_inbound:
-                self.waiting_inbound[line] = max(0, self.waiting_inbound[line] - 1)
-                if self.waiting_inbound[line] == 0:
-                    del self.waiting_inbound[line]
+            self.leases.acquire(line, INBOUND, session_id=session_id)
+            if self.lines.set_waiting(line, -1) == 0:
+                self._wake()
             return True
 
     async def cancel_waiting_inbound(self, line: str) -> None:
@@ -170,10 +416,8 @@ class Dialer:
         Drop a waiting inbound marker when the caller hangs up before being served.
         """
         async with self.lock:
-            if line in self.waiting_inbound:
-                self.waiting_inbound[line] = max(0, self.waiting_inbound[line] - 1)
-                if self.waiting_inbound[line] == 0:
-                    del self.waiting_inbound[line]
+            if line in self.lines and self.lines.set_waiting(line, -1) == 0:
+                self._wake()
 
     async def on_result(
         self,
@@ -184,6 +428,8 @@ class Dialer:
         batch_id: Optional[str],
         attempted_at_iso: Optional[str],
     ) -> None:
+        self._schedule_retry(session_id, result, number_id, phone_number, batch_id)
+        self._rate_number(session_id, result, phone_number)
         is_failure = bool(result and result.startswith("failed"))
         if is_failure:
             self.failure_streak += 1
@@ -206,6 +452,53 @@ class Dialer:
                 session_id, result, number_id, phone_number, batch_id, attempted_at_iso
             )
 
+    def _schedule_retry(
+        self,
+        session_id: str,
+        result: Optional[str],
+        number_id: Optional[int],
+        phone_number: Optional[str],
+        batch_id: Optional[str],
+    ) -> None:
+        # Only calls this dialer originated (not inbound or operator legs), once per call.
+        call = self.in_flight.get(session_id)
+        if not self.retries or call is None or not phone_number or session_id in self._retried:
+            return
+        attempt = call.get("n", 1)
+        due = self.retries.next_attempt_at(result, attempt)
+        if due is None:
+            return
+        self._retried.add(session_id)
+        contact = ContactItem(
+            phone_number=phone_number,
+            number_id=number_id,
+            batch_id=batch_id,
+            priority=call.get("pr", 0),
+            attempt=attempt + 1,
+        )
+        self.contacts.requeue(contact, not_before=due.timestamp())
+        # The loop may be sleeping on a later deadline.
+        self._wake()
+        logger.info(
+            "Retry %d for %s (%s) scheduled at %s", attempt + 1, phone_number, result, due.isoformat(timespec="seconds")
+        )
+
+    def _rate_number(self, session_id: str, result: Optional[str], phone_number: Optional[str]) -> None:
+        # Calls this dialer originated, once per call: the first dead result or the answer.
+        if session_id not in self.in_flight or not phone_number or session_id in self._rated:
+            return
+        if session_id in self._line_failures:
+            # The carrier rejected our line (on_call_hangup runs first), not this number.
+            return
+        answered = session_id in self.answered_sessions
+        if not answered and result not in DEAD_RESULTS:
+            return
+        self._rated.add(session_id)
+        try:
+            self.reputation.record(phone_number, result, answered=answered)
+        except Exception as exc:
+            logger.warning("Failed to record reputation of %s: %s", phone_number, exc)
+
     def _within_call_window(self) -> bool:
         # Panel already enforces schedule; always allow here.
         return True
@@ -217,43 +510,76 @@ class Dialer:
             self.daily_counter = 0
             self.daily_marker = today
             self.attempt_timestamps.clear()
-
-    async def _can_start_call(self) -> bool:
-        # Global guard: only proceed if some line is available
-        line = self._available_line()
-        return line is not None
+        if self.lines.roll_day(today):
+            self._wake()
+        if self.pacer is not None and datetime.now().hour != self._pacing_hour:
+            # Line limits lean on the hour-of-day answer rate.
+            self._pacing_hour = datetime.now().hour
+            self.lines.refresh()
+            self._wake()
 
     def _prune_attempts(self) -> None:
         cutoff = datetime.utcnow() - timedelta(minutes=1)
         while self.attempt_timestamps and self.attempt_timestamps[0] < cutoff:
             self.attempt_timestamps.popleft()
 
-    def _prune_line_attempts(self, stats: dict) -> None:
-        cutoff = datetime.utcnow() - timedelta(minutes=1)
-        attempts: Deque[datetime] = stats.get("attempts", deque())
-        while attempts and attempts[0] < cutoff:
-            attempts.popleft()
-        # reset daily if date changed
-        today = date.today()
-        if stats.get("daily_marker") != today:
-            stats["daily_marker"] = today
-            stats["daily"] = 0
+    def _next_contact(self) -> Optional[ContactItem]:
+        # Enqueue already screens numbers; this catches contacts queued before the plan
+        # (or a stricter one) was in force, so nothing invalid reaches _originate.
+        while True:
+            contact = self.contacts.pop()
+            if contact is None or self.numbering is None or self.numbering.normalize(contact.phone_number):
+                return contact
+            self.numbering.check(contact.phone_number)
+            logger.info("Dropping queued number %s: outside the numbering plan", contact.phone_number)
+            task = asyncio.create_task(self._report_skipped([contact], "invalid_number"))
+            self._reports.add(task)
+            task.add_done_callback(self._reports.discard)
 
-    async def _next_contact(self) -> Optional[ContactItem]:
-        async with self.lock:
-            if not self.contacts:
-                return None
-            return self.contacts.popleft()
+    def _screen(self, items: Iterable[ContactItem]) -> tuple[List[ContactItem], List[ContactItem]]:
+        """Split `items` into (dialable, invalid) by the numbering plan."""
+        items = list(items)
+        if self.numbering is None:
+            return items, []
+        valid: List[ContactItem] = []
+        invalid: List[ContactItem] = []
+        for item in items:
+            normalized, reason = self.numbering.check(item.phone_number)
+            if normalized is None:
+                logger.debug("Rejected number %s (%s)", item.phone_number, reason)
+                invalid.append(item)
+            else:
+                valid.append(item)
+        return valid, invalid
 
-    async def _originate(self, contact: ContactItem) -> None:
-        try:
+    def _claim_line(self, line: str, trunk: Optional[str] = None) -> Optional[LineLease]:
+        """
+        Lease the line (and trunk slot) against all of their limits before any await, so
+        the slot is held while the originate request is in flight. Without `trunk`
+        (operator legs) only the primary trunk's pacing bucket is charged.
+        """
+        lease = self.leases.acquire(line, OUTBOUND if trunk is not None else OPERATOR, trunk)
+        if lease is None:
+            return None
+        self.throttle.take(trunk if trunk is not None else self.trunks.primary)
+        self._record_attempt()
+        self.dial_rate.observe()
+        return lease
+
+    async def _originate(self, contact: ContactItem, lease: Optional[LineLease] = None) -> None:
+        """Originate `contact` on the line/trunk `lease` holds (see _claim_line)."""
+        if lease is None:
             line = self._available_line()
-            if not line:
+            # Direct callers skip the run loop's pacing wait, as before multi-trunk routing.
+            trunk = self.trunks.select(lambda _trunk: 0.0)[0] if line else None
+            lease = self._claim_line(line, trunk) if line and trunk else None
+            if lease is None:
                 logger.info("No available outbound line for contact %s; requeueing", contact.phone_number)
-                async with self.lock:
-                    self.contacts.append(contact)
-                await asyncio.sleep(1)
+                self.contacts.requeue(contact)
                 return
+        line, trunk = lease.line, lease.trunk
+        session_id: Optional[str] = None
+        try:
             attempted_at = datetime.utcnow()
             contact.attempted_at = attempted_at
             metadata = {"attempted_at": attempted_at.isoformat()}
@@ -261,13 +587,35 @@ class Dialer:
                 metadata["number_id"] = contact.number_id
             if contact.batch_id:
                 metadata["batch_id"] = contact.batch_id
-            metadata["outbound_line"] = line
             session = await self.session_manager.create_outbound_session(
                 contact_number=contact.phone_number,
                 metadata=metadata,
+                line=line,
             )
-            endpoint = self._build_endpoint(contact, line)
-            app_args = f"outbound,{session.session_id}"
+            session_id = session.session_id
+            # Track the call before originating: ARI may deliver its events (and the
+            # session may complete) before originate_call returns.
+            lease.bind(session_id)
+            self._trunk_unscored.add(session_id)
+            prefix, carrier = self.carriers.match(contact.phone_number)
+            line_state = self.lines.get(line)
+            same_carrier = carrier is not None and line_state is not None and line_state.carrier == carrier
+            self.affinity.on_dialed(session_id, prefix, same_carrier)
+            call = {
+                "sid": session_id,
+                "line": line,
+                "at": attempted_at.isoformat(),
+                **contact.to_record(),
+            }
+            self.in_flight[session_id] = call
+            if self.pacer is not None:
+                state = self.lines.get(line)
+                overdial = state is not None and state.total_active > self.settings.dialer.max_concurrent_calls
+                self.pacer.on_originated(session_id, line, overdial=overdial)
+            self._journal("attempt", line=line, ts=_epoch(attempted_at))
+            self._journal("call", **call)
+            endpoint = self._build_endpoint(contact, trunk)
+            app_args = f"outbound,{session_id}"
             # Originate returns channel info including protocol_id for early failure tracking
             channel_info = await self.ari_client.originate_call(
                 endpoint=endpoint,
@@ -279,32 +627,149 @@ class Dialer:
             if channel_info:
                 protocol_id = channel_info.get("id") or channel_info.get("protocol_id")
                 if protocol_id:
-                    await self.session_manager.register_protocol_id(session.session_id, protocol_id)
-            self._schedule_timeout_watch(session.session_id)
-            async with self.lock:
-                stats = self.line_stats.get(line)
-                if stats:
-                    stats["active"] += 1
-                    stats["attempts"].append(datetime.utcnow())
-                    stats["daily"] += 1
-                    stats["last_originated_ts"] = time.monotonic()
-                if not hasattr(self, "session_line"):
-                    self.session_line = {}
-                self.session_line[session.session_id] = line
-            self._record_attempt()
+                    await self.session_manager.register_protocol_id(session_id, protocol_id)
+            self._schedule_timeout_watch(session_id)
             logger.info(
-                "Origination requested for %s (session %s) via line %s", contact.phone_number, session.session_id, line
+                "Origination requested for %s (session %s) via line %s trunk %s",
+                contact.phone_number,
+                session_id,
+                line,
+                trunk,
             )
         except Exception as exc:
             logger.exception("Failed to originate call to %s: %s", contact.phone_number, exc)
+            self.trunks.record_outcome(trunk, ORIGINATE_FAILED)
+            self._release_failed_origination(session_id, lease)
+
+    def _release_failed_origination(self, session_id: Optional[str], lease: LineLease) -> None:
+        # The rate tokens stay spent: the attempt may have reached the trunk.
+        # A lease already released means the session's cleanup got there first.
+        if lease.release() and session_id is not None:
+            self._trunk_unscored.discard(session_id)
+            if self.pacer is not None:
+                self.pacer.discard(session_id)
+            self.affinity.discard(session_id)
+            if self.in_flight.pop(session_id, None) is not None:
+                self._journal("call_end", sid=session_id)
+        self._wake()
+
+    async def reserve_line(self, timeout: float, session_id: Optional[str] = None) -> Optional[LineLease]:
+        """
+        Lease a line for an operator/mobile leg, ahead of queued contacts; bound to
+        `session_id`, it is released when the session is cleaned up at the latest.
+        Queue originations hold off while a reservation is pending; the wait is
+        woken by the same signals as the run loop instead of polling.
+        """
+        self.operator_priority_requests += 1
+        try:
+            deadline = time.monotonic() + timeout
+            while True:
+                signal = self._arm_wakeup()
+                line = self._available_line()
+                pace = self.throttle.ready_in(self.trunks.primary) if line else 0.0
+                if line and pace <= 0:
+                    lease = self._claim_line(line)
+                    if lease is None:
+                        return None
+                    if session_id is not None:
+                        lease.bind(session_id)
+                    self._journal("attempt", line=line, ts=_epoch(datetime.utcnow()))
+                    return lease
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                opens_in = pace if line else self.lines.next_eligible_in()
+                await self._wait_for_wakeup(signal, remaining if opens_in is None else min(opens_in, remaining))
+        finally:
+            self.operator_priority_requests = max(0, self.operator_priority_requests - 1)
+            # Queue originations were held for us; let the loop resume.
+            self._wake()
+
+    async def release_line(self, lease: Optional[LineLease]) -> None:
+        if lease is None:
+            return
+        async with self.lock:
+            released = lease.release()
+        if released:
+            self._wake()
+
+    # Lease reconciliation ---------------------------------------------------
+    def _schedule_reconcile(self) -> None:
+        interval = self.settings.dialer.lease_reconcile_interval
+        if interval > 0 and self._running:
+            self._reconcile_timer = self.timers.call_later(interval, self._reconcile_periodically)
+
+    async def _reconcile_periodically(self) -> None:
+        try:
+            await self.reconcile_leases()
+        except Exception as exc:
+            logger.warning("Line lease reconciliation failed: %s", exc)
+        finally:
+            self._schedule_reconcile()
+
+    async def reconcile_leases(self) -> Dict[str, int]:
+        """
+        Check line leases against live ARI channels and fix drift:
+        - a lease whose session is gone (or that never got one) was leaked: release it;
+        - a session none of whose channels is live on two passes in a row lost its
+          hangup events: finish it, which releases its leases through cleanup;
+        - line counters that disagree with the live leases are overwritten.
+        Leases younger than the missed-call watchdog are left alone.
+        """
+        try:
+            channels = await self.ari_client.list_channels()
+        except Exception as exc:
+            logger.warning("Lease reconciliation skipped; failed to list channels: %s", exc)
+            return {}
+        live = {key for channel in channels for key in (channel.get("id"), channel.get("protocol_id")) if key}
+        grace = self.settings.dialer.origination_timeout + 15
+        now = time.monotonic()
+        leaked = orphaned = 0
+        suspects: set[int] = set()
+        for lease in self.leases:
+            if lease.released or now - lease.acquired_at < grace:
+                continue
+            session_id = lease.session_id
+            if session_id is None or session_id not in self.session_manager.sessions:
+                logger.warning("Releasing leaked %r", lease)
+                leaked += self.leases.release(lease)
+                continue
+            ids = self.session_manager.channel_ids(session_id)
+            if not ids or ids & live:
+                continue
+            if lease.id not in self._suspect_leases:
+                suspects.add(lease.id)
+                continue
+            logger.warning("Session %s holds %r with no live channel; finishing it", session_id, lease)
+            orphaned += await self.session_manager.finish_orphaned(session_id, live)
+            if not lease.released:
+                leaked += self.leases.release(lease)
+        self._suspect_leases = suspects
+        drifted = 0
+        for line, (active, answered, inbound) in self.leases.expected_counts().items():
+            state = self.lines.get(line)
+            before = (state.active, state.answered, state.inbound_active) if state else None
+            if self.lines.resync(line, active, answered, inbound):
+                drifted += 1
+                logger.warning(
+                    "Line %s counters drifted from its leases: (active, answered, inbound) %s -> %s",
+                    line,
+                    before,
+                    (active, answered, inbound),
+                )
+        result = {"leaked": leaked, "orphaned": orphaned, "drifted": drifted}
+        if leaked or orphaned or drifted:
+            self.lease_repairs = {key: self.lease_repairs.get(key, 0) + value for key, value in result.items()}
+            self._wake()
+        return result
 
     def _record_attempt(self) -> None:
         self.attempt_timestamps.append(datetime.utcnow())
         self.daily_counter += 1
 
-    def _build_endpoint(self, contact: ContactItem, line: str) -> str:
-        trunk = self.settings.dialer.outbound_trunk
-        customer_digits = self._normalize_number(contact.phone_number) or contact.phone_number
+    def _build_endpoint(self, contact: ContactItem, trunk: str) -> str:
+        normalized = self.numbering.normalize(contact.phone_number) if self.numbering else None
+        customer_digits = normalized or self._normalize_number(contact.phone_number) or contact.phone_number
         dial_str = customer_digits
         return f"PJSIP/{dial_str}@{trunk}"
 
@@ -324,37 +789,56 @@ class Dialer:
         digits = "".join(ch for ch in number if ch.isdigit())
         return digits or None
 
-    def _line_active_total(self, stats: dict) -> int:
-        return stats.get("active", 0) + stats.get("inbound_active", 0)
-
     def _available_line(self) -> Optional[str]:
-        now = datetime.utcnow()
-        now_mono = time.monotonic()
-        best = None
-        best_load = None
-        for line, stats in self.line_stats.items():
-            if not line:
-                continue
-            self._prune_line_attempts(stats)
-            if self.waiting_inbound.get(line, 0) > 0:
-                # Hold outbound when inbound callers are waiting for this line.
-                continue
-            last_ts = stats.get("last_originated_ts", 0.0)
-            if last_ts and now_mono - last_ts < 1.0:
-                # Enforce per-line per-second cap of 1.
-                continue
-            total_active = self._line_active_total(stats)
-            if total_active >= self.settings.dialer.max_concurrent_calls:
-                continue
-            if len(stats["attempts"]) >= self.settings.dialer.max_calls_per_minute:
-                continue
-            if stats["daily"] >= self.settings.dialer.max_calls_per_day:
-                continue
-            load = (total_active, len(stats["attempts"]), stats["daily"])
-            if best_load is None or load < best_load:
-                best = line
-                best_load = load
-        return best
+        return self.lines.select()
+
+    def _line_for(self, contact: ContactItem, fallback: str) -> str:
+        """A ready line on the destination's carrier if one exists, else `fallback`."""
+        carrier = self.carriers.carrier_of(contact.phone_number)
+        if carrier is None:
+            return fallback
+        line = self.lines.select(carrier) or fallback
+        if line != fallback and not self._may_overdial(line):
+            return fallback
+        return line
+
+    def _line_limit(self, state: LineState) -> int:
+        return self.pacer.line_limit(state.line, self.settings.dialer.max_concurrent_calls)
+
+    def _may_overdial(self, line: str) -> bool:
+        """Within MAX_CONCURRENT_CALLS always; beyond it only while free STT/LLM slots cover the expected answers."""
+        state = self.lines.get(line)
+        if self.pacer is None or state is None or state.total_active < self.settings.dialer.max_concurrent_calls:
+            return True
+        return self.pacer.may_overdial(line)
+
+    def pacing_stats(self) -> Dict[str, Any]:
+        stats = {
+            **self.throttle.stats(),
+            "queued": len(self.contacts),
+            "duplicates": self.contacts.duplicates,
+            "reissued": self.contacts.reissued,
+            "retries": self.retries.stats(),
+            "trunks": self.trunks.stats(),
+            "line_health": self.line_health.stats(),
+            "leases": {**self.leases.stats(), "repairs": dict(self.lease_repairs)},
+            "prefixes": self.affinity.stats(),
+            "numbering": self.numbering_stats(),
+            "reputation": self.reputation.stats(),
+            "dial_rate": round(self.dial_rate.rate(), 2),
+            "panel_latency": self.panel_latency.snapshot(),
+        }
+        if self.pacer is not None:
+            stats["predictive"] = self.pacer.stats()
+        return stats
+
+    def numbering_stats(self) -> Optional[Dict[str, Any]]:
+        if self.numbering is None:
+            return None
+        stats = self.numbering.stats()
+        # Each rejected number would have held a line until the missed-call watchdog fired.
+        stats["line_seconds_saved"] = stats["rejected"] * (self.settings.dialer.origination_timeout + 15)
+        return stats
 
     async def _handle_failure_threshold(
         self,
@@ -405,12 +889,10 @@ class Dialer:
     def _schedule_timeout_watch(self, session_id: str) -> None:
         # If no events arrive (no answer/hangup), mark as missed after origination timeout + buffer.
         timeout = self.settings.dialer.origination_timeout + 15
-        task = asyncio.create_task(self._mark_missed_if_no_events(session_id, timeout))
-        self.timeout_tasks[session_id] = task
+        self.timeout_timers[session_id] = self.timers.call_later(timeout, self._mark_missed_if_no_events, session_id)
 
-    async def _mark_missed_if_no_events(self, session_id: str, delay: int) -> None:
+    async def _mark_missed_if_no_events(self, session_id: str) -> None:
         try:
-            await asyncio.sleep(delay)
             session = await self.session_manager.get_session(session_id)
             if not session:
                 return
@@ -429,21 +911,52 @@ class Dialer:
             await self.session_manager._cleanup_session(session)  # type: ignore[attr-defined]
             logger.warning("Marked session %s as missed due to timeout/no events", session_id)
         finally:
-            self.timeout_tasks.pop(session_id, None)
+            self.timeout_timers.pop(session_id, None)
 
-    async def _maybe_refill_from_panel(self) -> None:
-        if not self.panel_client:
+    def _prefetch_horizon(self) -> float:
+        # Leave room for a few slow panel round trips before the queue runs dry.
+        return max(self.settings.dialer.prefetch_seconds, 3 * self.panel_latency.last)
+
+    def _below_low_watermark(self) -> bool:
+        """Queue would drain within the prefetch horizon at the measured dial rate."""
+        if not self._panel_allowed or self._panel_exhausted:
+            return False
+        return len(self.contacts) < self.dial_rate.rate() * self._prefetch_horizon()
+
+    def _prefetch_size(self) -> int:
+        # Double buffer: enough for the horizon being dialed now plus the next one.
+        wanted = math.ceil(self.dial_rate.rate() * self._prefetch_horizon() * 2) - len(self.contacts)
+        size = max(wanted, min(self.settings.dialer.batch_size, self._available_capacity()))
+        return min(size, self.settings.dialer.max_batch_size)
+
+    def _maybe_prefetch(self) -> None:
+        """
+        Start a background panel fetch when the periodic poll is due, or early when the
+        queue drops below the low watermark. Never awaits, so panel latency does not
+        hold up dialing.
+        """
+        if not self.panel_client or self._prefetch_task is not None:
             return
-        now = datetime.utcnow()
-        if now < self.next_panel_poll:
+        if datetime.utcnow() < self.next_panel_poll and not self._below_low_watermark():
             return
-
-        capacity = await self._available_capacity()
-        if capacity <= 0:
+        size = self._prefetch_size()
+        if size <= 0:
             return
+        self._prefetch_task = asyncio.create_task(self._fetch_panel_batch(size))
+        self._prefetch_task.add_done_callback(self._prefetch_done)
+
+    def _prefetch_done(self, task: asyncio.Task) -> None:
+        self._prefetch_task = None
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("Panel prefetch failed: %s", task.exception())
+            self.next_panel_poll = datetime.utcnow() + timedelta(seconds=self.settings.dialer.default_retry)
+        self._wake()
 
-        size = min(self.settings.dialer.batch_size, capacity)
+    async def _fetch_panel_batch(self, size: int) -> None:
+        started = time.monotonic()
         batch: NextBatchResponse = await self.panel_client.get_next_batch(size=size)
+        self.panel_latency.observe(time.monotonic() - started)
+        now = datetime.utcnow()
         # Refresh operator roster from panel active_agents if configured.
         if self.settings.operator.use_panel_agents and batch.agents:
             handler = self.session_manager.scenario_handler
@@ -457,6 +970,7 @@ class Dialer:
             self.paused_by_failures = False
             self.failure_streak = 0
             self.paused_reason = ""
+        self._panel_allowed = batch.call_allowed
         if not batch.call_allowed:
             retry = batch.retry_after_seconds or self.settings.dialer.default_retry
             self.next_panel_poll = now + timedelta(seconds=retry)
@@ -464,35 +978,181 @@ class Dialer:
             return
 
         self.next_panel_poll = now + timedelta(seconds=60)
+        # An empty batch means the panel has nothing more for now: wait for the periodic poll.
+        self._panel_exhausted = not batch.numbers
         if batch.numbers:
             await self._queue_panel_numbers(batch.numbers, batch.batch_id)
 
     async def _queue_panel_numbers(self, numbers: List[PanelNumber], batch_id: Optional[str]) -> None:
-        items = [ContactItem(phone_number=n.phone_number, number_id=n.id, batch_id=batch_id) for n in numbers]
-        async with self.lock:
-            self.contacts.extend(items)
-        logger.info("Queued %d contacts from panel batch %s", len(items), batch_id)
-
-    async def _available_capacity(self) -> int:
-        available_slots = 0
-        outbound_active_total = 0
-        for line, stats in self.line_stats.items():
-            if not line:
-                continue
-            self._prune_line_attempts(stats)
-            if self.waiting_inbound.get(line, 0) > 0:
-                continue
-            total_active = self._line_active_total(stats)
-            remaining_concurrency = self.settings.dialer.max_concurrent_calls - total_active
-            remaining_per_minute = self.settings.dialer.max_calls_per_minute - len(stats["attempts"])
-            remaining_daily = self.settings.dialer.max_calls_per_day - stats["daily"]
-            line_slots = min(remaining_concurrency, remaining_per_minute, remaining_daily)
-            if line_slots > 0:
-                available_slots += line_slots
-            outbound_active_total += stats["active"]
+        items, invalid = self._screen(
+            ContactItem(phone_number=n.phone_number, number_id=n.id, batch_id=batch_id, priority=n.priority)
+            for n in numbers
+        )
+        accepted, duplicates, unreachable = self._enqueue(items)
+        self._wake()
+        logger.info(
+            "Queued %d contacts from panel batch %s (%d duplicate(s), %d invalid, %d recently unreachable skipped)",
+            len(accepted),
+            batch_id,
+            len(duplicates),
+            len(invalid),
+            len(unreachable),
+        )
+        # The copy already queued or dialed today carries the result; close out other number_ids for it.
+        await asyncio.gather(
+            self._report_skipped(duplicates, "duplicate"),
+            self._report_skipped(invalid, "invalid_number"),
+            self._report_skipped(unreachable, "recently_unreachable"),
+        )
+
+    def _enqueue(self, items: List[ContactItem]) -> tuple[List[ContactItem], List[ContactItem], List[ContactItem]]:
+        """
+        Queue `items`, holding back numbers with a bad recent reputation: deferred ones
+        get a not-before time, skipped ones are not queued. Returns (accepted,
+        duplicates, skipped).
+        """
+        ready: List[ContactItem] = []
+        deferred: List[tuple[ContactItem, float]] = []
+        skipped: List[ContactItem] = []
+        for item in items:
+            try:
+                verdict, not_before = self.reputation.verdict(item.phone_number)
+            except Exception as exc:
+                logger.warning("Reputation lookup failed for %s: %s", item.phone_number, exc)
+                verdict, not_before = None, 0.0
+            if verdict == SKIP:
+                skipped.append(item)
+            elif verdict == DEFER:
+                deferred.append((item, not_before))
+            else:
+                ready.append(item)
+        accepted, duplicates = self.contacts.push(ready)
+        for item, not_before in deferred:
+            queued, duplicate = self.contacts.push([item], not_before=not_before)
+            accepted.extend(queued)
+            duplicates.extend(duplicate)
+        return accepted, duplicates, skipped
+
+    async def _report_skipped(self, items: List[ContactItem], reason: str) -> None:
+        """Report numbers that will not be dialed as FAILED/`reason`, all at once."""
+        if not self.panel_client:
+            return
+        now = datetime.utcnow()
+        reports = [
+            self.panel_client.report_result(
+                number_id=item.number_id,
+                phone_number=item.phone_number,
+                status="FAILED",
+                reason=reason,
+                attempted_at=now,
+                batch_id=item.batch_id,
+            )
+            for item in items
+            if item.number_id is not None
+        ]
+        for outcome in await asyncio.gather(*reports, return_exceptions=True):
+            if isinstance(outcome, Exception):
+                logger.warning("Failed to report %s number to panel: %s", reason, outcome)
+
+    def _available_capacity(self) -> int:
+        available_slots, outbound_active_total = self.lines.capacity()
 
         # Optional global outbound cap: only apply if >0.
         if self.settings.dialer.max_concurrent_outbound_calls > 0:
             remaining_outbound = self.settings.dialer.max_concurrent_outbound_calls - outbound_active_total
             available_slots = min(available_slots, max(0, remaining_outbound))
         return max(0, available_slots)
+
+    # Crash-recovery journal ------------------------------------------------
+    def attach_journal(self, journal: Journal) -> None:
+        self.journal = journal
+
+    def _journal(self, kind: str, **data: Any) -> None:
+        if self.journal is not None:
+            self.journal.append(kind, **data)
+
+    def journal_snapshot(self) -> List[Dict[str, Any]]:
+        """Current dialer state as journal records (used for compaction)."""
+        records: List[Dict[str, Any]] = [{"k": "line", **self.lines.export_line(state)} for state in self.lines]
+        records.append(
+            {
+                "k": "global",
+                "daily": self.daily_counter,
+                "day": self.daily_marker.isoformat(),
+                "attempts": [_epoch(ts) for ts in self.attempt_timestamps],
+            }
+        )
+        records.extend({"k": "call", **call} for call in self.in_flight.values())
+        return records
+
+    def restore_from_journal(self, records: List[Dict[str, Any]]) -> None:
+        """
+        Rebuild today's per-line/global counters and the list of calls that were in
+        flight when the engine stopped. The contact queue persists on its own.
+        """
+        calls: Dict[str, Dict[str, Any]] = {}
+        today = date.today()
+        minute_ago = datetime.utcnow() - timedelta(minutes=1)
+        for record in records:
+            kind = record.get("k")
+            if kind == "attempt":
+                ts = record["ts"]
+                if date.fromtimestamp(ts) != today:
+                    continue
+                attempted = datetime.utcfromtimestamp(ts)
+                self.lines.record_attempt(record.get("line"), ts)
+                self.daily_counter += 1
+                if attempted >= minute_ago:
+                    self.attempt_timestamps.append(attempted)
+            elif kind == "line":
+                self.lines.restore_line(record)
+            elif kind == "global":
+                if record.get("day") == today.isoformat():
+                    self.daily_counter = record["daily"]
+                    self.attempt_timestamps = deque(
+                        t for t in map(datetime.utcfromtimestamp, record["attempts"]) if t >= minute_ago
+                    )
+            elif kind == "call":
+                calls[record["sid"]] = {key: value for key, value in record.items() if key != "k"}
+            elif kind == "call_end":
+                calls.pop(record.get("sid"), None)
+        self.interrupted_calls = calls
+        logger.info(
+            "Dialer restored from journal: %d queued contact(s), %d call(s) in flight, daily=%d",
+            len(self.contacts),
+            len(calls),
+            self.daily_counter,
+        )
+
+    async def settle_interrupted_calls(self, live_session_ids: Iterable[str]) -> int:
+        """
+        Calls that were in flight at shutdown: keep tracking the ones the session store
+        brought back; report the rest to the panel so their numbers are not left hanging
+        (they are not re-dialed: they already left the queue).
+        """
+        live = set(live_session_ids)
+        settled = 0
+        for session_id, call in self.interrupted_calls.items():
+            if session_id in live:
+                self.in_flight[session_id] = call
+                continue
+            self._journal("call_end", sid=session_id)
+            settled += 1
+            if not self.panel_client or (call.get("id") is None and not call.get("p")):
+                continue
+            try:
+                attempted_at = datetime.fromisoformat(call["at"])
+            except Exception:
+                attempted_at = datetime.utcnow()
+            await self.panel_client.report_result(
+                number_id=call.get("id"),
+                phone_number=call.get("p"),
+                status="FAILED",
+                reason="engine_restart",
+                attempted_at=attempted_at,
+                batch_id=call.get("b"),
+            )
+        self.interrupted_calls = {}
+        if settled:
+            logger.warning("Reported %d call(s) interrupted by the restart to the panel", settled)
+        return settled
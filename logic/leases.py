@@ -0,0 +1,174 @@
+import itertools
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from logic.line_scheduler import LineScheduler
+from logic.trunks import TrunkRouter
+
+
+# What a lease holds the line for.
+OUTBOUND = "outbound"  # queue call (customer leg)
+OPERATOR = "operator"  # operator mobile leg placed on one of our lines
+INBOUND = "inbound"
+
+
+class LineLease:
+    """
+    One call's hold on a line (and, for queue calls, a trunk slot). Created only by
+    `LeaseRegistry.acquire`, after every limit admitted it; `release()` gives the
+    capacity back exactly once, however many cleanup paths call it.
+    """
+
+    __slots__ = ("registry", "id", "line", "kind", "trunk", "session_id", "answered", "acquired_at", "released")
+
+    def __init__(self, registry: "LeaseRegistry", lease_id: int, line: str, kind: str, trunk: Optional[str], at: float):
+        self.registry = registry
+        self.id = lease_id
+        self.line = line
+        self.kind = kind
+        self.trunk = trunk
+        self.session_id: Optional[str] = None
+        self.answered = False
+        self.acquired_at = at
+        self.released = False
+
+    def bind(self, session_id: str) -> None:
+        """Tie the lease to a session; the session's cleanup then releases it."""
+        self.registry.bind(self, session_id)
+
+    def release(self) -> bool:
+        """Give the capacity back; False if it was already released."""
+        return self.registry.release(self)
+
+    def __repr__(self) -> str:
+        return f"LineLease({self.kind} {self.line} session={self.session_id} released={self.released})"
+
+
+class LeaseRegistry:
+    """
+    Owns every change to line (and trunk) occupancy, so a slot is only ever taken
+    through `acquire` and given back through `LineLease.release`.
+
+    Leases are indexed by session and kind; `release_session` frees everything a
+    session still holds, which SessionManager._cleanup_session guarantees to reach.
+    `expected_counts` recomputes what the line counters should be from the live
+    leases, for the reconciler to compare against the scheduler.
+    """
+
+    def __init__(self, lines: LineScheduler, trunks: TrunkRouter, clock: Callable[[], float] = time.monotonic):
+        self.lines = lines
+        self.trunks = trunks
+        self.clock = clock
+        self.leases: Dict[int, LineLease] = {}
+        self.by_session: Dict[str, Dict[str, LineLease]] = {}
+        self._ids = itertools.count(1)
+        self.acquired = 0
+        self.released = 0
+
+    def __len__(self) -> int:
+        return len(self.leases)
+
+    def __iter__(self):
+        return iter(list(self.leases.values()))
+
+    def acquire(
+        self,
+        line: str,
+        kind: str,
+        trunk: Optional[str] = None,
+        session_id: Optional[str] = None,
+        restored: bool = False,
+        answered: bool = False,
+    ) -> Optional[LineLease]:
+        """
+        Reserve `line` for one call. New outbound/operator calls are checked and counted
+        against every line limit in one step (LineScheduler.take), so a caller that
+        skipped the run loop's checks still cannot push a line past them; inbound and
+        restored calls are already up and are only counted. None if the line refused.
+        """
+        if kind == INBOUND:
+            self.lines.add_active(line, inbound=True)
+        elif restored:
+            self.lines.add_active(line, answered=answered)
+        elif not self.lines.take(line):
+            return None
+        if trunk is not None:
+            self.trunks.take(trunk)
+        lease = LineLease(self, next(self._ids), line, kind, trunk, self.clock())
+        lease.answered = answered
+        self.leases[lease.id] = lease
+        self.acquired += 1
+        if session_id is not None:
+            self.bind(lease, session_id)
+        return lease
+
+    def bind(self, lease: LineLease, session_id: str) -> None:
+        if lease.released:
+            return
+        lease.session_id = session_id
+        held = self.by_session.setdefault(session_id, {})
+        previous = held.get(lease.kind)
+        if previous is not None and previous is not lease:
+            # A session holds one lease per kind; a new reservation supersedes the old one.
+            self.release(previous)
+            held = self.by_session.setdefault(session_id, {})
+        held[lease.kind] = lease
+
+    def get(self, session_id: str, kind: str = OUTBOUND) -> Optional[LineLease]:
+        return self.by_session.get(session_id, {}).get(kind)
+
+    def mark_answered(self, lease: LineLease) -> None:
+        if lease.released or lease.answered:
+            return
+        lease.answered = True
+        self.lines.mark_answered(lease.line)
+
+    def release(self, lease: LineLease) -> bool:
+        if lease.released:
+            return False
+        lease.released = True
+        self.leases.pop(lease.id, None)
+        if lease.session_id is not None:
+            held = self.by_session.get(lease.session_id)
+            if held is not None and held.get(lease.kind) is lease:
+                del held[lease.kind]
+                if not held:
+                    del self.by_session[lease.session_id]
+        if lease.kind == INBOUND:
+            self.lines.release(lease.line, inbound=True)
+        else:
+            self.lines.release(lease.line, answered=lease.answered)
+        self.trunks.release(lease.trunk)
+        self.released += 1
+        return True
+
+    def release_session(self, session_id: str, kind: Optional[str] = None) -> int:
+        """Release what `session_id` holds (of `kind`, or everything); returns how many."""
+        held = self.by_session.get(session_id)
+        if not held:
+            return 0
+        if kind is None:
+            leases = list(held.values())
+        else:
+            leases = [held[kind]] if kind in held else []
+        return sum(self.release(lease) for lease in leases)
+
+    def expected_counts(self) -> Dict[str, Tuple[int, int, int]]:
+        """Per line: (outbound active, answered, inbound active) implied by the live leases."""
+        counts: Dict[str, List[int]] = {state.line: [0, 0, 0] for state in self.lines}
+        for lease in self.leases.values():
+            count = counts.get(lease.line)
+            if count is None:
+                continue
+            if lease.kind == INBOUND:
+                count[2] += 1
+            else:
+                count[0] += 1
+                count[1] += lease.answered
+        return {line: (count[0], count[1], count[2]) for line, count in counts.items()}
+
+    def stats(self) -> Dict[str, Any]:
+        kinds: Dict[str, int] = {}
+        for lease in self.leases.values():
+            kinds[lease.kind] = kinds.get(lease.kind, 0) + 1
+        return {"held": len(self.leases), "by_kind": kinds, "acquired": self.acquired, "released": self.released}
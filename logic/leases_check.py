@@ -0,0 +1,103 @@
+"""
+Check that line leases cannot take a line past its limits, whoever asks: every
+`LeaseRegistry.acquire` below skips the dialer's run-loop checks, as operator
+reservations and direct originations do.
+
+Usage:
+    python -m logic.leases_check
+
+Exits non-zero if any check fails.
+"""
+import sys
+from typing import Dict, List
+
+from logic.leases import INBOUND, OPERATOR, OUTBOUND, LeaseRegistry
+from logic.line_scheduler import NS_PER_SECOND, LineScheduler
+from logic.trunks import TrunkRouter
+
+
+LINE = "02191000001"
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 10 * NS_PER_SECOND
+
+    def __call__(self) -> int:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += int(seconds * NS_PER_SECOND)
+
+
+class LeasesCheck:
+    def __init__(self) -> None:
+        self.failures: List[str] = []
+
+    def check(self, ok: bool, what: str) -> None:
+        if not ok:
+            self.failures.append(what)
+        print(f"  [{'ok' if ok else 'FAIL'}] {what}")
+
+    def registry(self, max_concurrent: int = 2, per_minute: int = 600, per_day: int = 100):
+        clock = Clock()
+        lines = LineScheduler([LINE], max_concurrent=max_concurrent, per_minute=per_minute, per_day=per_day, clock=clock)
+        return LeaseRegistry(lines, TrunkRouter({"trunk": 1.0}, {})), lines.lines[LINE], clock
+
+    def counters(self, state) -> Dict[str, int]:
+        return {"active": state.active, "daily": state.daily, "tat": state.per_minute.tat}
+
+    def refused(self, registry: LeaseRegistry, state, what: str, kind: str = OUTBOUND) -> None:
+        before = self.counters(state)
+        lease = registry.acquire(LINE, kind, "trunk" if kind == OUTBOUND else None)
+        self.check(lease is None and self.counters(state) == before, f"{what}: acquire refused, nothing counted")
+
+    def run(self) -> None:
+        # Concurrency: a saturated line refuses both queue calls and operator legs.
+        registry, state, clock = self.registry(max_concurrent=2)
+        held = []
+        for _ in range(2):
+            held.append(registry.acquire(LINE, OUTBOUND, "trunk"))
+            clock.advance(1)
+        self.check(all(held) and state.active == 2, "two calls fit under MAX_CONCURRENT_CALLS=2")
+        self.refused(registry, state, "line at its concurrency cap")
+        self.refused(registry, state, "operator leg on a saturated line", kind=OPERATOR)
+        held[0].release()
+        self.check(registry.acquire(LINE, OPERATOR) is not None, "a released slot can be leased again")
+
+        # Inbound calls share the cap.
+        registry, state, clock = self.registry(max_concurrent=1)
+        registry.acquire(LINE, INBOUND)
+        self.refused(registry, state, "line full with an inbound call")
+
+        # Per-second bucket: back-to-back originations on one line.
+        registry, state, clock = self.registry()
+        registry.acquire(LINE, OUTBOUND, "trunk")
+        self.refused(registry, state, "second origination within the same second")
+        clock.advance(1)
+        self.check(registry.acquire(LINE, OUTBOUND, "trunk") is not None, "origination allowed once the second passed")
+
+        # Daily quota.
+        registry, state, clock = self.registry(max_concurrent=10, per_day=1)
+        registry.acquire(LINE, OUTBOUND, "trunk").release()
+        clock.advance(60)
+        self.refused(registry, state, "line at its daily quota")
+
+        # Quarantine and waiting inbound callers.
+        registry, state, clock = self.registry()
+        registry.lines.hold(LINE)
+        self.refused(registry, state, "quarantined line")
+        registry.lines.reinstate(LINE)
+        registry.lines.set_waiting(LINE, +1)
+        self.refused(registry, state, "line with an inbound caller waiting")
+
+
+def main() -> None:
+    check = LeasesCheck()
+    check.run()
+    print(f"{len(check.failures)} failure(s)")
+    sys.exit(1 if check.failures else 0)
+
+
+if __name__ == "__main__":
+    main()
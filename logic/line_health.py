@@ -0,0 +1,147 @@
+import time
+from collections import Counter, deque
+from typing import Any, Callable, Deque, Dict, Iterable, Optional
+
+
+# Causes a blocked caller id gets back from the carrier on every attempt: call rejected (21),
+# no circuit (34), temporary failure (41), switching congestion (42).
+LINE_FAILURE_CAUSES = frozenset({"21", "34", "41", "42"})
+
+# What LineHealth.record asks the dialer to do with the line.
+QUARANTINE = "quarantine"
+RECOVERED = "recovered"
+
+
+class LineRecord:
+    __slots__ = ("line", "causes", "histogram", "failures", "strikes", "cooldown", "quarantined", "probing", "quarantines")
+
+    def __init__(self, line: str, window: int):
+        self.line = line
+        # Last `window` outcomes (hangup cause, "answered" or "none") and their histogram.
+        self.causes: Deque[str] = deque(maxlen=window)
+        self.histogram: Counter = Counter()
+        self.failures = 0
+        # Consecutive quarantines without a successful probe; doubles the cooldown each time.
+        self.strikes = 0
+        self.cooldown = 0.0
+        self.quarantined = False
+        # Cooldown over: the line carries one probe call at a time until one gets through.
+        self.probing = False
+        self.quarantines = 0
+
+    def add(self, cause: str, failed: bool) -> None:
+        if len(self.causes) == self.causes.maxlen:
+            old = self.causes[0]
+            self.histogram[old] -= 1
+            if not self.histogram[old]:
+                del self.histogram[old]
+            self.failures -= old in LINE_FAILURE_CAUSES
+        self.causes.append(cause)
+        self.histogram[cause] += 1
+        self.failures += failed
+
+    def reset(self) -> None:
+        self.causes.clear()
+        self.histogram.clear()
+        self.failures = 0
+
+    @property
+    def failure_ratio(self) -> float:
+        return self.failures / len(self.causes) if self.causes else 0.0
+
+
+class LineHealth:
+    """
+    Rolling hangup-cause histograms per outbound line, used to take a line out of
+    rotation when the carrier starts rejecting its caller id.
+
+    A line whose last `window` calls (at least `min_calls`) failed with one of
+    LINE_FAILURE_CAUSES at `threshold` or more is quarantined for `cooldown` seconds.
+    When the cooldown ends it carries one probe call at a time: a probe that gets
+    through (answered, or any other cause) puts it back in full rotation, a failed
+    probe quarantines it again for twice as long, up to `max_cooldown`.
+
+    At most `max_fraction` of the lines are out at once: when most lines fail alike
+    the trouble is upstream (trunk, carrier) and quarantining them would only hide it.
+    """
+
+    def __init__(
+        self,
+        lines: Iterable[str],
+        window: int = 20,
+        threshold: float = 0.6,
+        min_calls: int = 5,
+        cooldown: float = 60.0,
+        max_cooldown: float = 3600.0,
+        max_fraction: float = 0.5,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.records: Dict[str, LineRecord] = {line: LineRecord(line, window) for line in lines}
+        self.threshold = threshold
+        self.min_calls = min(min_calls, window)
+        self.cooldown = cooldown
+        self.max_cooldown = max(max_cooldown, cooldown)
+        self.max_fraction = max_fraction
+        self.clock = clock
+        self.suppressed = 0
+
+    def is_line_failure(self, cause: Optional[str], answered: bool) -> bool:
+        return not answered and cause is not None and str(cause) in LINE_FAILURE_CAUSES
+
+    def record(self, line: Optional[str], cause: Optional[str], answered: bool) -> Optional[str]:
+        """Fold one call outcome in; returns QUARANTINE or RECOVERED when the line's state changes."""
+        record = self.records.get(line or "")
+        if record is None or record.quarantined:
+            return None
+        failed = self.is_line_failure(cause, answered)
+        record.add("answered" if answered else str(cause or "none"), failed)
+        if record.probing:
+            if not failed:
+                record.probing = False
+                record.strikes = 0
+                record.reset()
+                return RECOVERED
+            return self._quarantine(record)
+        if (
+            self.threshold > 0
+            and len(record.causes) >= self.min_calls
+            and record.failure_ratio >= self.threshold
+        ):
+            if self._out_of_rotation() + 1 > self.max_fraction * len(self.records):
+                self.suppressed += 1
+                return None
+            return self._quarantine(record)
+        return None
+
+    def _quarantine(self, record: LineRecord) -> str:
+        record.cooldown = min(self.cooldown * 2 ** record.strikes, self.max_cooldown)
+        record.strikes += 1
+        record.quarantines += 1
+        record.quarantined = True
+        record.probing = False
+        record.reset()
+        return QUARANTINE
+
+    def cooldown_over(self, line: str) -> None:
+        """The line's hold ended: it is now on probe calls."""
+        record = self.records.get(line)
+        if record is not None and record.quarantined:
+            record.quarantined = False
+            record.probing = True
+
+    def _out_of_rotation(self) -> int:
+        return sum(record.quarantined or record.probing for record in self.records.values())
+
+    def stats(self) -> Dict[str, Any]:
+        lines: Dict[str, Any] = {}
+        for record in self.records.values():
+            if not record.causes and not record.quarantines:
+                continue
+            lines[record.line] = {
+                "state": "quarantined" if record.quarantined else "probing" if record.probing else "ok",
+                "failure_ratio": round(record.failure_ratio, 2),
+                "causes": dict(record.histogram),
+                "quarantines": record.quarantines,
+                "cooldown": record.cooldown if record.quarantined else None,
+            }
+        return {"out_of_rotation": self._out_of_rotation(), "suppressed": self.suppressed, "lines": lines}
@@ -0,0 +1,482 @@
+import heapq
+import itertools
+import time
+from datetime import date
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+NS_PER_SECOND = 1_000_000_000
+
+
+class TokenBucket:
+    """
+    `capacity` tokens per `period_ns`, refilled evenly (one token every period/capacity),
+    of which at most `burst` can be spent back to back.
+
+    Kept in virtual-scheduling form: the only state is `tat`, the time (monotonic ns)
+    at which the bucket would be full again, so checking, taking and computing the exact
+    time of the next free token are all O(1) integer arithmetic.
+    """
+
+    __slots__ = ("capacity", "interval_ns", "burst_ns", "tat")
+
+    def __init__(self, capacity: int, period_ns: int, burst: Optional[int] = None):
+        self.capacity = max(int(capacity), 1)
+        self.interval_ns = -(-int(period_ns) // self.capacity)
+        burst = self.capacity if burst is None else min(max(int(burst), 1), self.capacity)
+        self.burst_ns = self.interval_ns * (burst - 1)
+        self.tat = 0
+
+    def ready_at(self, now: int) -> int:
+        """Earliest time (>= now) at which a token is available."""
+        return max(now, self.tat - self.burst_ns)
+
+    def take(self, now: int) -> None:
+        self.tat = max(self.tat, now) + self.interval_ns
+
+    def available(self, now: int) -> int:
+        used = -(-(self.tat - now) // self.interval_ns) if self.tat > now else 0
+        return max(self.capacity - used, 0)
+
+
+class LineState:
+    """Counters and rate buckets for one outbound line (caller id)."""
+
+    __slots__ = (
+        "line",
+        "active",
+        "answered",
+        "inbound_active",
+        "waiting",
+        "limit",
+        "per_second",
+        "per_minute",
+        "daily",
+        "version",
+        "carrier",
+        "held",
+        "probing",
+    )
+
+    def __init__(self, line: str, per_minute: int, limit: int, carrier: Optional[str] = None):
+        self.line = line
+        self.carrier = carrier
+        # Outbound calls on the line (ringing or answered), and how many of them answered.
+        self.active = 0
+        self.answered = 0
+        self.inbound_active = 0
+        # Inbound callers queued for this line; outbound is held while any are waiting.
+        self.waiting = 0
+        # Calls the line may have in flight: MAX_CONCURRENT_CALLS, or more when paced predictively.
+        self.limit = limit
+        self.per_second = TokenBucket(1, NS_PER_SECOND)
+        # No burst: a refilling bucket with burst N would admit up to 2N-1 calls in some
+        # 60s window, while evenly spaced calls never exceed N in any window.
+        self.per_minute = TokenBucket(per_minute, 60 * NS_PER_SECOND, burst=1)
+        self.daily = 0
+        # Quarantined by line health (no outbound), or back on one probe call at a time.
+        self.held = False
+        self.probing = False
+        # Bumped on every change; heap entries carrying an older version are stale.
+        self.version = 0
+
+    @property
+    def total_active(self) -> int:
+        return self.active + self.inbound_active
+
+    @property
+    def occupied(self) -> int:
+        """Calls actually talking on the line (answered outbound + inbound)."""
+        return self.answered + self.inbound_active
+
+
+# (load key, seq, version, line) / (eligible at ns, seq, version, line)
+_ReadyEntry = Tuple[Tuple[int, int, int], int, int, str]
+_BlockedEntry = Tuple[int, int, int, str]
+
+
+class LineScheduler:
+    """
+    Picks the least-loaded outbound line that may originate now.
+
+    Each line has token buckets for the per-second (1/s) and per-minute limits plus a
+    calendar-day quota. Lines that are eligible sit in a `ready` heap ordered by load
+    (active calls, minute bucket fill, calls today); lines held back only by a rate
+    bucket sit in a `blocked` heap ordered by the exact time they become eligible.
+    Lines at their concurrency or daily limit, with inbound callers waiting, or held
+    by line-health quarantine (a probing line: while its one probe call is up) are in
+    neither heap until an event changes them.
+
+    With `limit_for` (predictive pacing) a line may have more calls ringing than
+    `max_concurrent`, up to the limit it returns; the limit is re-evaluated whenever
+    the line changes (or on `refresh`), and answered calls still never start beyond
+    `max_concurrent`. Every mutation bumps the line's version
+    and pushes one fresh entry, so stale entries are skipped lazily and selection is
+    O(log lines) amortized.
+
+    Lines tagged with a carrier are also kept in a per-carrier ready heap, so
+    `select(carrier)` finds the least-loaded ready line of that carrier just as cheaply.
+    """
+
+    def __init__(
+        self,
+        lines: Iterable[str],
+        max_concurrent: int,
+        per_minute: int,
+        per_day: int,
+        clock: Callable[[], int] = time.monotonic_ns,
+        limit_for: Optional[Callable[[LineState], int]] = None,
+        carriers: Optional[Dict[str, str]] = None,
+    ):
+        self.max_concurrent = max_concurrent
+        self.limit_for = limit_for
+        self.per_minute = per_minute
+        self.per_day = per_day
+        self.clock = clock
+        self.day: date = date.today()
+        carriers = carriers or {}
+        self.lines: Dict[str, LineState] = {
+            line: LineState(line, per_minute, max_concurrent, carriers.get(line)) for line in lines
+        }
+        self._ready: List[_ReadyEntry] = []
+        self._ready_by_carrier: Dict[str, List[_ReadyEntry]] = {carrier: [] for carrier in carriers.values()}
+        self._blocked: List[_BlockedEntry] = []
+        self._seq = itertools.count()
+        self.selections = 0
+        self.refresh()
+
+    # Mapping-style access -------------------------------------------------
+    def __contains__(self, line: object) -> bool:
+        return line in self.lines
+
+    def __iter__(self) -> Iterator[LineState]:
+        return iter(self.lines.values())
+
+    def __len__(self) -> int:
+        return len(self.lines)
+
+    def get(self, line: Optional[str]) -> Optional[LineState]:
+        return self.lines.get(line) if line else None
+
+    # Heap maintenance -----------------------------------------------------
+    def _eligible_at(self, state: LineState, now: int) -> Optional[int]:
+        """ns timestamp the line may originate at, or None if only an event can unblock it."""
+        if state.waiting > 0 or state.total_active >= state.limit or state.occupied >= self.max_concurrent:
+            return None
+        if state.held or (state.probing and state.active > 0):
+            return None
+        if state.daily >= self.per_day or self.per_minute <= 0:
+            return None
+        return max(state.per_second.ready_at(now), state.per_minute.ready_at(now))
+
+    def _place(self, state: LineState, now: int) -> None:
+        at = self._eligible_at(state, now)
+        if at is None:
+            return
+        if at <= now:
+            key = (state.total_active, state.per_minute.tat, state.daily)
+            entry = (key, next(self._seq), state.version, state.line)
+            heapq.heappush(self._ready, entry)
+            if state.carrier is not None:
+                heapq.heappush(self._ready_by_carrier[state.carrier], entry)
+        else:
+            heapq.heappush(self._blocked, (at, next(self._seq), state.version, state.line))
+        if len(self._ready) + len(self._blocked) > 4 * len(self.lines) + 64:
+            self._compact()
+
+    def _current(self, heap: List[Any]) -> List[Any]:
+        return [e for e in heap if self.lines[e[3]].version == e[2]]
+
+    def _compact(self) -> None:
+        # Drop stale entries so heaps stay O(lines) under churn.
+        self._ready = self._current(self._ready)
+        self._blocked = self._current(self._blocked)
+        heapq.heapify(self._ready)
+        heapq.heapify(self._blocked)
+        for carrier, heap in self._ready_by_carrier.items():
+            heap = self._ready_by_carrier[carrier] = self._current(heap)
+            heapq.heapify(heap)
+
+    def touch(self, state: LineState) -> None:
+        """Re-rank a line after any change to its counters."""
+        state.version += 1
+        if self.limit_for is not None:
+            state.limit = self.limit_for(state)
+        self._place(state, self.clock())
+
+    def refresh(self) -> None:
+        """Re-evaluate every line (start-up, day/hour rollover)."""
+        for state in self.lines.values():
+            self.touch(state)
+
+    def _promote(self, now: int) -> None:
+        # Re-read self._blocked each pass: _place may compact (replace) the heaps.
+        while self._blocked and self._blocked[0][0] <= now:
+            _, _, version, line = heapq.heappop(self._blocked)
+            state = self.lines[line]
+            if state.version == version:
+                self._place(state, now)
+
+    # Selection ------------------------------------------------------------
+    def select(self, carrier: Optional[str] = None) -> Optional[str]:
+        """
+        Least-loaded line that may originate now (not reserved; see `take`); with
+        `carrier`, the least-loaded ready line of that carrier if there is one.
+        """
+        self.selections += 1
+        self._promote(self.clock())
+        if carrier is not None and carrier in self._ready_by_carrier:
+            line = self._top(self._ready_by_carrier[carrier])
+            if line is not None:
+                return line
+        return self._top(self._ready)
+
+    def _top(self, ready: List[_ReadyEntry]) -> Optional[str]:
+        while ready:
+            _, _, version, line = ready[0]
+            if self.lines[line].version == version:
+                # State is unchanged since the entry was pushed and time only makes a
+                # line more eligible, so a current entry is still valid.
+                return line
+            heapq.heappop(ready)
+        return None
+
+    def next_eligible_in(self) -> Optional[float]:
+        """
+        Seconds until some line becomes eligible: 0 if one already is, None if every
+        line is held by something only an event can clear (concurrency, waiting
+        inbound, daily quota).
+        """
+        if self.select() is not None:
+            return 0.0
+        blocked = self._blocked
+        while blocked:
+            at, _, version, line = blocked[0]
+            if self.lines[line].version == version:
+                return max(at - self.clock(), 0) / NS_PER_SECOND
+            heapq.heappop(blocked)
+        return None
+
+    # Mutations ------------------------------------------------------------
+    def take(self, line: str) -> bool:
+        """
+        Count an outbound origination on `line` against all of its limits, if they admit
+        one now (concurrency, waiting inbound, quarantine, daily quota, rate buckets);
+        False, with nothing counted, if they do not.
+        """
+        state = self.lines.get(line)
+        if state is None:
+            return False
+        now = self.clock()
+        at = self._eligible_at(state, now)
+        if at is None or at > now:
+            return False
+        state.active += 1
+        state.daily += 1
+        state.per_second.take(now)
+        state.per_minute.take(now)
+        self.touch(state)
+        return True
+
+    def release(self, line: Optional[str], inbound: bool = False, answered: bool = False) -> None:
+        state = self.get(line)
+        if state is None:
+            return
+        if inbound:
+            state.inbound_active = max(state.inbound_active - 1, 0)
+        else:
+            state.active = max(state.active - 1, 0)
+            if answered:
+                state.answered = max(state.answered - 1, 0)
+        self.touch(state)
+
+    def mark_answered(self, line: Optional[str]) -> None:
+        state = self.get(line)
+        if state is None:
+            return
+        state.answered = min(state.answered + 1, state.active)
+        self.touch(state)
+
+    def add_active(self, line: str, inbound: bool = False, answered: bool = False) -> None:
+        """Count a call that is already up (inbound, or restored) without touching rate limits."""
+        state = self.lines.get(line)
+        if state is None:
+            return
+        if inbound:
+            state.inbound_active += 1
+        else:
+            state.active += 1
+            if answered:
+                state.answered += 1
+        self.touch(state)
+
+    def has_room(self, line: str) -> bool:
+        """Whether an inbound call can be served on the line now."""
+        state = self.lines.get(line)
+        if state is None:
+            return True
+        # Paced predictively, ringing outbound calls beyond the cap must not starve inbound.
+        busy = state.occupied if self.limit_for is not None else state.total_active
+        return busy < self.max_concurrent
+
+    def set_waiting(self, line: str, delta: int) -> int:
+        """Adjust the waiting-inbound count of a line and return the new value."""
+        state = self.lines.get(line)
+        if state is None:
+            return 0
+        state.waiting = max(state.waiting + delta, 0)
+        self.touch(state)
+        return state.waiting
+
+    def resync(self, line: str, active: int, answered: int, inbound_active: int) -> bool:
+        """Overwrite a line's call counters (reconciliation); True if they had drifted."""
+        state = self.lines.get(line)
+        if state is None or (state.active, state.answered, state.inbound_active) == (active, answered, inbound_active):
+            return False
+        state.active, state.answered, state.inbound_active = active, answered, inbound_active
+        self.touch(state)
+        return True
+
+    def hold(self, line: str) -> None:
+        """Take a line out of outbound rotation (quarantine); inbound calls are unaffected."""
+        self._set_quarantine(line, held=True, probing=False)
+
+    def probe(self, line: str) -> None:
+        """Let a held line originate again, one call at a time."""
+        self._set_quarantine(line, held=False, probing=True)
+
+    def reinstate(self, line: str) -> None:
+        self._set_quarantine(line, held=False, probing=False)
+
+    def _set_quarantine(self, line: str, held: bool, probing: bool) -> None:
+        state = self.lines.get(line)
+        if state is None:
+            return
+        state.held = held
+        state.probing = probing
+        self.touch(state)
+
+    def roll_day(self, today: Optional[date] = None) -> bool:
+        """Reset daily quotas at the first call on a new calendar day."""
+        today = today or date.today()
+        if today == self.day:
+            return False
+        self.day = today
+        for state in self.lines.values():
+            state.daily = 0
+            self.touch(state)
+        return True
+
+    # Persistence ----------------------------------------------------------
+    # Monotonic time does not survive a restart, so bucket state is saved as epoch seconds.
+    def _wall_offset(self) -> float:
+        return time.time() - self.clock() / NS_PER_SECOND
+
+    def export_line(self, state: LineState) -> Dict[str, Any]:
+        offset = self._wall_offset()
+        return {
+            "line": state.line,
+            "daily": state.daily,
+            "day": self.day.isoformat(),
+            "tat": [b.tat / NS_PER_SECOND + offset if b.tat else 0.0 for b in (state.per_second, state.per_minute)],
+        }
+
+    def restore_line(self, record: Dict[str, Any]) -> None:
+        state = self.get(record.get("line"))
+        if state is None or record.get("day") != self.day.isoformat():
+            return
+        state.daily = record.get("daily", 0)
+        offset = self._wall_offset()
+        for bucket, tat in zip((state.per_second, state.per_minute), record.get("tat") or ()):
+            bucket.tat = int((tat - offset) * NS_PER_SECOND) if tat else 0
+        self.touch(state)
+
+    def record_attempt(self, line: Optional[str], at: float) -> None:
+        """Replay a past origination (epoch seconds) into the line's limits."""
+        state = self.get(line)
+        if state is None:
+            return
+        at_ns = int((at - self._wall_offset()) * NS_PER_SECOND)
+        state.daily += 1
+        state.per_second.take(at_ns)
+        state.per_minute.take(at_ns)
+        self.touch(state)
+
+    # Reporting ------------------------------------------------------------
+    def capacity(self) -> Tuple[int, int]:
+        """(originations the lines could start right now, outbound calls active)."""
+        now = self.clock()
+        slots = 0
+        outbound_active = 0
+        for state in self.lines.values():
+            outbound_active += state.active
+            if state.waiting > 0 or state.held:
+                continue
+            line_slots = min(
+                1 - state.active if state.probing else state.limit,
+                state.limit - state.total_active,
+                self.max_concurrent - state.occupied,
+                state.per_minute.available(now) if self.per_minute > 0 else 0,
+                self.per_day - state.daily,
+            )
+            if line_slots > 0:
+                slots += line_slots
+        return slots, outbound_active
+
+
+class OriginationThrottle:
+    """
+    Engine-wide pacing in front of every originate: a global bucket
+    (MAX_ORIGINATIONS_PER_SECOND) plus optional per-trunk buckets. With the default
+    burst of 1 originations leave evenly spaced, 1/rate apart, instead of all free
+    lines firing in the same instant (which carriers answer with congestion, cause 34/38).
+    """
+
+    def __init__(
+        self,
+        per_second: float,
+        per_trunk: Optional[Dict[str, float]] = None,
+        burst: int = 1,
+        clock: Callable[[], int] = time.monotonic_ns,
+    ):
+        self.clock = clock
+        self.bucket = self._bucket(per_second, burst)
+        self.trunks: Dict[str, TokenBucket] = {}
+        for trunk, rate in (per_trunk or {}).items():
+            bucket = self._bucket(rate, burst)
+            if bucket is not None:
+                self.trunks[trunk] = bucket
+        self.taken = 0
+        self.paced = 0
+
+    @staticmethod
+    def _bucket(rate: float, burst: int) -> Optional[TokenBucket]:
+        if rate <= 0:
+            return None
+        burst = max(int(burst), 1)
+        # `rate` tokens/s expressed as `burst` tokens per burst/rate seconds.
+        return TokenBucket(burst, int(burst * NS_PER_SECOND / rate), burst=burst)
+
+    def _buckets(self, trunk: Optional[str]) -> Iterator[TokenBucket]:
+        if self.bucket is not None:
+            yield self.bucket
+        trunk_bucket = self.trunks.get(trunk) if trunk else None
+        if trunk_bucket is not None:
+            yield trunk_bucket
+
+    def ready_in(self, trunk: Optional[str] = None) -> float:
+        """Seconds until an origination on `trunk` may start (0 if it may start now)."""
+        now = self.clock()
+        at = max((bucket.ready_at(now) for bucket in self._buckets(trunk)), default=now)
+        if at > now:
+            self.paced += 1
+        return (at - now) / NS_PER_SECOND
+
+    def take(self, trunk: Optional[str] = None) -> None:
+        now = self.clock()
+        for bucket in self._buckets(trunk):
+            bucket.take(now)
+        self.taken += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {"originations": self.taken, "paced": self.paced}
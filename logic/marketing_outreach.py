@@ -12,9 +12,11 @@ import httpx
 
 from config.settings import Settings
 from core.ari_client import AriClient
+from core.timers import TimerService
 from integrations.panel.client import PanelClient
 from llm.client import GapGPTClient
 from logic.base import BaseScenario
+from logic.leases import OPERATOR
 from sessions.session import CallLeg, LegDirection, LegState, Session
 from sessions.session_manager import SessionManager
 from stt_tts.vira_stt import STTResult, ViraSTTClient
@@ -40,6 +42,7 @@ class MarketingScenario(BaseScenario):
         stt_client: ViraSTTClient,
         session_manager: SessionManager,
         panel_client: Optional[PanelClient] = None,
+        timers: Optional[TimerService] = None,
     ):
         self.settings = settings
         self.ari_client = ari_client
@@ -47,6 +50,7 @@ class MarketingScenario(BaseScenario):
         self.stt_client = stt_client
         self.session_manager = session_manager
         self.panel_client = panel_client
+        self.timers = timers or TimerService()
         self.dialer = None
         # Agent mobiles (optional): round-robin, skip busy
         self.agent_mobiles = [m for m in settings.operator.mobile_numbers if m]
@@ -170,42 +174,21 @@ class MarketingScenario(BaseScenario):
                 return mobile
         return None
 
-    async def _reserve_outbound_line(self) -> Optional[str]:
+    async def _reserve_outbound_line(self, session: Session) -> Optional[str]:
         """
-        Reuse dialer line selection and counters for operator/mobile legs.
-        While we look for a free line, pause queue-originations to prioritize the operator leg.
+        Lease a dialer line for the session's operator/mobile leg (released with the
+        session at the latest). The dialer holds queue-originations while the
+        reservation is pending.
         """
         if not self.dialer:
             return None
-        # Signal the dialer loop to pause queue-originations while we try to grab a line.
-        self.dialer.operator_priority_requests += 1
-        try:
-            deadline = time.monotonic() + max(self.settings.operator.timeout, 5)
-            while time.monotonic() < deadline:
-                line = self.dialer._available_line()  # reuse dialer logic
-                if line:
-                    async with self.dialer.lock:
-                        stats = self.dialer.line_stats.get(line)
-                        if stats is None:
-                            return None
-                        stats["active"] += 1
-                        stats["attempts"].append(datetime.utcnow())
-                        stats["daily"] += 1
-                        stats["last_originated_ts"] = time.monotonic()
-                    self.dialer._record_attempt()
-                    return line
-                await asyncio.sleep(0.05)
-            return None
-        finally:
-            self.dialer.operator_priority_requests = max(0, self.dialer.operator_priority_requests - 1)
+        lease = await self.dialer.reserve_line(max(self.settings.operator.timeout, 5), session_id=session.session_id)
+        return lease.line if lease else None
 
-    async def _release_outbound_line(self, line: Optional[str]) -> None:
-        if not line or not self.dialer:
+    async def _release_outbound_line(self, session: Session) -> None:
+        if not self.dialer:
             return
-        async with self.dialer.lock:
-            stats = self.dialer.line_stats.get(line)
-            if stats:
-                stats["active"] = max(stats.get("active", 0) - 1, 0)
+        await self.dialer.release_line(self.dialer.leases.get(session.session_id, OPERATOR))
 
     async def on_outbound_channel_created(self, session: Session) -> None:
         logger.debug("Outbound channel ready for session %s", session.session_id)
@@ -220,13 +203,13 @@ class MarketingScenario(BaseScenario):
         if leg.direction == LegDirection.OPERATOR:
             async with session.lock:
                 session.result = session.result or "connected_to_operator"
-                session.metadata["operator_connected"] = "1"
+                session.state.operator_connected = True
             await self._stop_onhold_playbacks(session)
             logger.info("Operator leg answered for session %s", session.session_id)
             return
 
         async with session.lock:
-            session.metadata["answered_at"] = str(time.time())
+            session.state.answered_at = time.time()
         logger.info("Call answered for session %s (customer)", session.session_id)
         await self._play_prompt(session, "hello")
 
@@ -249,9 +232,9 @@ class MarketingScenario(BaseScenario):
             if self.settings.scenario.transfer_to_operator:
                 # Agrad scenario: connect to operator
                 await self._play_onhold(session)
-                # Small delay so "yes" finishes cleanly before ringing operator
-                await asyncio.sleep(0.5)
-                await self._connect_to_operator(session)
+                # Small delay so "yes" finishes cleanly before ringing operator (without holding
+                # this call's event worker).
+                self.timers.call_later(0.5, self._connect_to_operator, session)
             else:
                 # Salehi scenario: customer said yes, mark as connected (successful) and end call
                 await self._set_result(session, "connected_to_operator", force=True, report=True)
@@ -266,14 +249,14 @@ class MarketingScenario(BaseScenario):
         elif prompt_key == "onhold":
             operator_connected = False
             async with session.lock:
-                operator_connected = session.metadata.get("operator_connected") == "1"
+                operator_connected = session.state.operator_connected
             if not operator_connected:
                 await self._play_onhold(session)
         elif prompt_key == "repeat":
             # After repeating the question, capture the response again.
             phase = "interest"
             async with session.lock:
-                phase = session.metadata.get("recording_phase") or "interest"
+                phase = session.state.recording_phase or "interest"
             on_yes, on_no = self._callbacks_for_phase(phase)
             await self._capture_response(session, phase=phase, on_yes=on_yes, on_no=on_no)
         elif prompt_key == "goodby":
@@ -294,7 +277,7 @@ class MarketingScenario(BaseScenario):
                 return
             await self._stop_onhold_playbacks(session)
             async with session.lock:
-                yes_intent = session.metadata.get("intent_yes") == "1"
+                yes_intent = session.state.intent_yes
             # Check if operator origination already set failed:operator_failed
             current_result = session.result
             if current_result and current_result.startswith("failed:operator"):
@@ -309,10 +292,10 @@ class MarketingScenario(BaseScenario):
         # Customer leg failed/busy/unanswered => classify based on reason and cause codes
         reason_l = reason.lower() if reason else ""
 
-        # Check session metadata for hangup cause and dialstatus
+        # Check session state for hangup cause and dialstatus
         # NOTE: Cannot capture early causes - ARI doesn't expose SIP Reason headers from 183 messages
-        hangup_cause = session.metadata.get("hangup_cause")
-        dialstatus = session.metadata.get("dialstatus", "")
+        hangup_cause = session.state.hangup_cause
+        dialstatus = session.state.dialstatus or ""
 
         # Classify based on SIP cause codes
         # Cause 16, 31, 32: Normal call clearing (customer answered then hung up)
@@ -359,13 +342,13 @@ class MarketingScenario(BaseScenario):
         operator_call_started = False
         cause = None
         async with session.lock:
-            session.metadata["hungup"] = "1"
-            operator_connected = session.metadata.get("operator_connected") == "1"
-            yes_intent = session.metadata.get("intent_yes") == "1"
-            no_intent = session.metadata.get("intent_no") == "1"
-            app_hangup = session.metadata.get("app_hangup") == "1"
-            operator_call_started = session.metadata.get("operator_call_started") == "1"
-            cause = session.metadata.get("hangup_cause")
+            session.state.hungup = True
+            operator_connected = session.state.operator_connected
+            yes_intent = session.state.intent_yes
+            no_intent = session.state.intent_no
+            app_hangup = session.state.app_hangup
+            operator_call_started = session.state.operator_call_started
+            cause = session.state.hangup_cause
         if operator_connected:
             return
         # If customer hung up while we were still trying to reach an operator, immediately stop that leg.
@@ -395,7 +378,7 @@ class MarketingScenario(BaseScenario):
                 cause_result = "banned"
         else:
             # Detect self-cancelled initial INVITE (Request Terminated) via cause_txt or SIP 487/486/500 signals.
-            cause_txt = session.metadata.get("hangup_cause_txt", "") if session.metadata else ""
+            cause_txt = session.state.hangup_cause_txt or ""
             if cause_txt and "Request Terminated" in cause_txt:
                 cause_result = "missed"
             elif cause_txt and "Busy" in cause_txt:
@@ -429,9 +412,7 @@ class MarketingScenario(BaseScenario):
             operator_mobile = session.metadata.get("operator_mobile")
         if operator_mobile:
             self.agent_busy.discard(operator_mobile)
-        line_used = session.metadata.get("operator_outbound_line")
-        if line_used:
-            await self._release_outbound_line(line_used)
+        await self._release_outbound_line(session)
         logger.info("Call finished session=%s result=%s", session.session_id, result)
         await self._report_result(session)
         if self.dialer:
@@ -440,7 +421,7 @@ class MarketingScenario(BaseScenario):
     # Prompt handling -----------------------------------------------------
     async def _play_prompt(self, session: Session, prompt_key: str) -> None:
         async with session.lock:
-            if session.metadata.get("hungup") == "1":
+            if session.state.hungup:
                 return
         media = self.prompt_media[prompt_key]
         channel_id = self._customer_channel_id(session)
@@ -494,16 +475,12 @@ class MarketingScenario(BaseScenario):
 
         recording_name = f"{phase}-{session.session_id}"
         async with session.lock:
-            session.metadata["recording_phase"] = phase
-            session.metadata["recording_name"] = recording_name
+            session.state.recording_phase = phase
+            session.state.recording_name = recording_name
         logger.info("Recording %s response for session %s", phase, session.session_id)
         async with session.lock:
-            if session.metadata.get("hungup") == "1":
+            if session.state.hungup:
                 return
-            # track unknown attempts per phase
-            unknown_key = f"unknown_{phase}_count"
-            if unknown_key not in session.metadata:
-                session.metadata[unknown_key] = "0"
         try:
             if session.bridge and session.bridge.bridge_id:
                 await self.ari_client.record_bridge(
@@ -526,15 +503,15 @@ class MarketingScenario(BaseScenario):
 
     async def on_recording_finished(self, session: Session, recording_name: str) -> None:
         async with session.lock:
-            phase = session.metadata.get("recording_phase")
-            if not phase or session.metadata.get("recording_name") != recording_name:
+            phase = session.state.recording_phase
+            if not phase or session.state.recording_name != recording_name:
                 return
             if recording_name in session.processed_recordings:
                 return
             session.processed_recordings.add(recording_name)
-            alo_key = f"alo_played_{phase}"
-            alo_needed = session.metadata.get(alo_key) != "1"
-            session.metadata[alo_key] = "1"
+            alo_needed = phase not in session.state.alo_played
+            if alo_needed:
+                session.state.alo_played += (phase,)
         on_yes, on_no = self._callbacks_for_phase(phase)
         if alo_needed:
             await self._play_prompt(session, "alo")
@@ -544,13 +521,13 @@ class MarketingScenario(BaseScenario):
 
     async def on_recording_failed(self, session: Session, recording_name: str, cause: str) -> None:
         async with session.lock:
-            phase = session.metadata.get("recording_phase")
-            if not phase or session.metadata.get("recording_name") != recording_name:
+            phase = session.state.recording_phase
+            if not phase or session.state.recording_name != recording_name:
                 return
             if recording_name in session.processed_recordings:
                 return
             session.processed_recordings.add(recording_name)
-            if session.metadata.get("hungup") == "1":
+            if session.state.hungup:
                 return
         on_yes, on_no = self._callbacks_for_phase(phase)
         logger.warning(
@@ -580,7 +557,7 @@ class MarketingScenario(BaseScenario):
                 audio_bytes, hotwords=self.stt_hotwords
             )
             async with session.lock:
-                if session.metadata.get("hungup") == "1":
+                if session.state.hungup:
                     return
             transcript = stt_result.text.strip()
             logger.info(
@@ -827,22 +804,22 @@ class MarketingScenario(BaseScenario):
 
     async def _handle_yes(self, session: Session) -> None:
         async with session.lock:
-            if session.metadata.get("hungup") == "1":
+            if session.state.hungup:
                 return
         # If customer leg is already gone, skip operator flow.
         if not self._customer_channel_id(session):
             logger.debug("Skipping yes handling; customer channel missing for session %s", session.session_id)
             return
         async with session.lock:
-            session.metadata["intent_yes"] = "1"
-            session.metadata["yes_at"] = str(time.time())
+            session.state.intent_yes = True
+            session.state.yes_at = time.time()
         # Play "yes" acknowledgment prompt
         # The on_playback_finished handler will complete the call flow when done
         await self._play_prompt(session, "yes")
 
     async def _handle_no(self, session: Session) -> None:
         async with session.lock:
-            session.metadata["intent_no"] = "1"
+            session.state.intent_no = True
         await self._set_result(session, "not_interested", force=True, report=True)
         await self._play_prompt(session, "goodby")
 
@@ -855,7 +832,7 @@ class MarketingScenario(BaseScenario):
         reason: str,
     ) -> None:
         async with session.lock:
-            if session.metadata.get("hungup") == "1":
+            if session.state.hungup:
                 return
             # If we already have a result set (e.g., hangup), do not override to failed.
             if session.result and session.result not in {"user_didnt_answer", "missed"}:
@@ -887,16 +864,16 @@ class MarketingScenario(BaseScenario):
     # Operator bridge -----------------------------------------------------
     async def _connect_to_operator(self, session: Session) -> None:
         async with session.lock:
-            if session.metadata.get("hungup") == "1":
+            if session.state.hungup:
                 logger.debug("Skip operator connect; session %s already hung up", session.session_id)
                 return
-            if session.metadata.get("operator_call_started") == "1":
+            if session.state.operator_call_started:
                 logger.debug("Operator call already started for session %s; skipping", session.session_id)
                 return
             if self._is_inbound_only(session):
                 logger.debug("Inbound-only session %s; skipping operator connect", session.session_id)
                 return
-            session.metadata["operator_call_started"] = "1"
+            session.state.operator_call_started = True
             session.metadata.pop("operator_tried", None)
         customer_channel = self._customer_channel_id(session)
         if not customer_channel:
@@ -912,7 +889,7 @@ class MarketingScenario(BaseScenario):
             if not operator_mobile:
                 logger.warning("No available operator mobiles to connect session %s", session.session_id)
                 return
-            outbound_line = await self._reserve_outbound_line()
+            outbound_line = await self._reserve_outbound_line(session)
             if not outbound_line:
                 logger.warning("No available outbound line to reach operator mobile for session %s", session.session_id)
                 return
@@ -933,7 +910,7 @@ class MarketingScenario(BaseScenario):
                 caller_id = self.dialer._caller_id_for_line(outbound_line)
             else:
                 caller_id = self.settings.operator.caller_id
-            if session.metadata.get("hungup") == "1":
+            if session.state.hungup:
                 logger.debug("Skip operator connect; session %s already hung up", session.session_id)
                 return
         logger.info("Connecting session %s to operator endpoint %s", session.session_id, endpoint)
@@ -954,7 +931,7 @@ class MarketingScenario(BaseScenario):
                     session.metadata.pop("operator_outbound_line", None)
             logger.exception("Operator originate failed for session %s: %s", session.session_id, exc)
             if outbound_line:
-                await self._release_outbound_line(outbound_line)
+                await self._release_outbound_line(session)
             await self._play_prompt(session, "goodby")
 
     async def _retry_operator_mobile(self, session: Session, reason: str) -> bool:
@@ -967,7 +944,7 @@ class MarketingScenario(BaseScenario):
             self.agent_busy.discard(current_mobile)
             tried.add(current_mobile)
         if outbound_line:
-            await self._release_outbound_line(outbound_line)
+            await self._release_outbound_line(session)
         next_mobile = self._next_available_agent()
         while next_mobile and next_mobile in tried:
             next_mobile = self._next_available_agent()
@@ -976,7 +953,7 @@ class MarketingScenario(BaseScenario):
             await self._set_result(session, "disconnected", force=True, report=True)
             await self._hangup(session)
             return False
-        outbound_line = await self._reserve_outbound_line()
+        outbound_line = await self._reserve_outbound_line(session)
         if not outbound_line:
             logger.warning("Operator retry: no outbound line for session %s", session.session_id)
             await self._set_result(session, "disconnected", force=True, report=True)
@@ -1003,7 +980,7 @@ class MarketingScenario(BaseScenario):
             return True
         except Exception as exc:
             logger.exception("Operator retry failed for session %s: %s", session.session_id, exc)
-            await self._release_outbound_line(outbound_line)
+            await self._release_outbound_line(session)
             return False
 
     async def _play_processing(self, session: Session) -> None:
@@ -1060,7 +1037,7 @@ class MarketingScenario(BaseScenario):
         if not channel_id:
             return
         async with session.lock:
-            session.metadata["app_hangup"] = "1"
+            session.state.app_hangup = True
         try:
             await self.ari_client.hangup_channel(channel_id)
         except Exception as exc:
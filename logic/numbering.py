@@ -0,0 +1,79 @@
+import re
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from logic.contact_queue import dedup_key
+
+
+# Provincial area codes (national format without the trunk 0); subscriber numbers are 8 digits.
+AREA_CODES = (
+    "11", "13", "17", "21", "23", "24", "25", "26", "28", "31", "34", "35", "38", "41", "44", "45",
+    "51", "54", "56", "58", "61", "66", "71", "74", "76", "77", "81", "83", "84", "86", "87",
+)
+# Mobile ranges (09xx) with no operator behind them; NUMBERING_UNALLOCATED_PREFIXES replaces this.
+UNALLOCATED_PREFIXES = (
+    "0906", "0907", "0908", "0909",
+    "0923", "0924", "0925", "0926", "0927", "0928", "0929",
+    "0940", "0942", "0943", "0944", "0945", "0946", "0947", "0948", "0949",
+    "0995", "0996", "0997",
+)
+
+# Rejection reasons (reported in stats; the panel gets "invalid_number").
+EMPTY = "empty"
+LENGTH = "length"
+PREFIX = "prefix"
+UNALLOCATED = "unallocated"
+
+
+class NumberingPlan:
+    """
+    Validates and normalizes destination numbers against the Iranian numbering plan
+    before they take a line: 11 digits in national format, either a mobile 09xx
+    number outside the unallocated ranges or a landline behind a known area code
+    (subscriber numbers never start with 0 or 1).
+
+    The whole plan is compiled into one anchored regex, so a check is a normalization
+    pass plus a single match; the reason for a rejection is only worked out on the
+    (rare) failing path.
+    """
+
+    def __init__(self, area_codes: Iterable[str] = AREA_CODES, unallocated: Iterable[str] = UNALLOCATED_PREFIXES):
+        self.area_codes = frozenset(area_codes)
+        self.unallocated = tuple(prefix for prefix in unallocated if prefix.startswith("09"))
+        blocked = "|".join(re.escape(prefix[1:]) for prefix in self.unallocated)
+        mobile = f"(?!{blocked})9\\d{{9}}" if blocked else "9\\d{9}"
+        areas = "|".join(sorted(self.area_codes))
+        self.pattern = re.compile(f"0(?:{mobile}|(?:{areas})[2-9]\\d{{7}})")
+        self.checked = 0
+        self.rejected: Dict[str, int] = {}
+
+    def check(self, number: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+        """(number in national format, None) if dialable, else (None, rejection reason)."""
+        self.checked += 1
+        normalized = dedup_key(number) if number else ""
+        if self.pattern.fullmatch(normalized):
+            return normalized, None
+        reason = self._reason(normalized)
+        self.rejected[reason] = self.rejected.get(reason, 0) + 1
+        return None, reason
+
+    def normalize(self, number: str) -> Optional[str]:
+        """National format if `number` is dialable (no counters touched), else None."""
+        normalized = dedup_key(number)
+        return normalized if self.pattern.fullmatch(normalized) else None
+
+    def _reason(self, normalized: str) -> str:
+        if not normalized.isdigit():
+            # No digits at all (dedup_key then keeps the raw text).
+            return EMPTY
+        if len(normalized) != 11:
+            return LENGTH
+        if normalized.startswith(self.unallocated):
+            return UNALLOCATED
+        return PREFIX
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "checked": self.checked,
+            "rejected": sum(self.rejected.values()),
+            "reasons": dict(self.rejected),
+        }
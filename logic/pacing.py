@@ -0,0 +1,157 @@
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+
+class OutcomeWindow:
+    """Rolling window of the last `size` call outcomes: answered or not, and ring time."""
+
+    __slots__ = ("size", "outcomes", "answered", "ring_total", "ring_count")
+
+    def __init__(self, size: int):
+        self.size = size
+        self.outcomes: Deque[Tuple[bool, float]] = deque()
+        self.answered = 0
+        # Ring time is only meaningful for answered calls (unanswered ones ring until timeout).
+        self.ring_total = 0.0
+        self.ring_count = 0
+
+    def add(self, answered: bool, ring_seconds: float) -> None:
+        self.outcomes.append((answered, ring_seconds))
+        self._count(answered, ring_seconds, 1)
+        if len(self.outcomes) > self.size:
+            self._count(*self.outcomes.popleft(), -1)
+
+    def _count(self, answered: bool, ring_seconds: float, sign: int) -> None:
+        if answered:
+            self.answered += sign
+            self.ring_total += sign * ring_seconds
+            self.ring_count += sign
+
+    def __len__(self) -> int:
+        return len(self.outcomes)
+
+    def rate(self, prior: float, weight: float) -> float:
+        """Answer rate shrunk toward `prior` (worth `weight` samples) while the window is small."""
+        return (self.answered + prior * weight) / (len(self.outcomes) + weight)
+
+    def avg_ring(self) -> Optional[float]:
+        return self.ring_total / self.ring_count if self.ring_count else None
+
+
+class PredictivePacer:
+    """
+    Estimates answer probability per line and per hour of day and turns it into how
+    many calls a line may have in flight, so that answered calls fill about
+    `target` of MAX_CONCURRENT_CALLS instead of lines idling while attempts ring out.
+
+    Over-dialing is bounded two ways: a line never exceeds `max_ratio` x its
+    concurrency cap, and calls beyond the cap are only started while the answers
+    expected from everything still ringing fit in the free STT/LLM slots (an answered
+    call nobody can serve is an abandon).
+    """
+
+    # Prior answer rate before any outcome is seen, and how many samples it is worth.
+    PRIOR_RATE = 0.5
+    PRIOR_WEIGHT = 10.0
+
+    def __init__(
+        self,
+        target: float = 0.85,
+        max_ratio: float = 3.0,
+        window: int = 200,
+        ai_slots: int = 0,
+        busy_calls: Optional[Callable[[], int]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.target = target
+        self.max_ratio = max(max_ratio, 1.0)
+        self.window = window
+        self.ai_slots = ai_slots
+        self.busy_calls = busy_calls or (lambda: 0)
+        self.clock = clock
+        self.by_line: Dict[str, OutcomeWindow] = {}
+        self.by_hour: List[OutcomeWindow] = [OutcomeWindow(window) for _ in range(24)]
+        # session_id -> (line, hour, answer probability at dial time, dialed at)
+        self.ringing: Dict[str, Tuple[str, int, float, float]] = {}
+        # Sum of answer probabilities over calls still ringing.
+        self.expected_answers = 0.0
+        self.overdialed = 0
+        self.held_for_slots = 0
+
+    # Estimates ------------------------------------------------------------
+    def _line_window(self, line: str) -> OutcomeWindow:
+        window = self.by_line.get(line)
+        if window is None:
+            window = self.by_line[line] = OutcomeWindow(self.window)
+        return window
+
+    def answer_rate(self, line: str, hour: Optional[int] = None) -> float:
+        """Line estimate, using this hour's estimate across all lines as its prior."""
+        hour = datetime.now().hour if hour is None else hour
+        hourly = self.by_hour[hour].rate(self.PRIOR_RATE, self.PRIOR_WEIGHT)
+        return self._line_window(line).rate(hourly, self.PRIOR_WEIGHT)
+
+    def line_limit(self, line: str, max_concurrent: int) -> int:
+        """Calls (ringing + answered) a line may have so answered ones fill `target` of its cap."""
+        rate = max(self.answer_rate(line), 0.01)
+        wanted = int(max_concurrent * self.target / rate)
+        return max(max_concurrent, min(wanted, int(max_concurrent * self.max_ratio)))
+
+    def free_slots(self) -> int:
+        # Every answered call may hold an STT and an LLM slot at the same time.
+        return self.ai_slots - self.busy_calls()
+
+    def may_overdial(self, line: str) -> bool:
+        """Whether one more call beyond the line's concurrency cap keeps abandon risk bounded."""
+        if self.expected_answers + self.answer_rate(line) <= self.free_slots():
+            return True
+        self.held_for_slots += 1
+        return False
+
+    # Call lifecycle -------------------------------------------------------
+    def on_originated(self, session_id: str, line: str, overdial: bool = False) -> None:
+        hour = datetime.now().hour
+        probability = self.answer_rate(line, hour)
+        self.ringing[session_id] = (line, hour, probability, self.clock())
+        self.expected_answers += probability
+        if overdial:
+            self.overdialed += 1
+
+    def on_answered(self, session_id: str) -> Optional[str]:
+        return self._settle(session_id, answered=True)
+
+    def on_finished(self, session_id: str) -> Optional[str]:
+        """Call ended without an answer being reported (no-op if it was answered)."""
+        return self._settle(session_id, answered=False)
+
+    def discard(self, session_id: str) -> None:
+        """Forget a call that never reached the carrier (not an answer-rate sample)."""
+        entry = self.ringing.pop(session_id, None)
+        if entry is not None:
+            self.expected_answers = max(self.expected_answers - entry[2], 0.0)
+
+    def _settle(self, session_id: str, answered: bool) -> Optional[str]:
+        entry = self.ringing.pop(session_id, None)
+        if entry is None:
+            return None
+        line, hour, probability, dialed_at = entry
+        self.expected_answers = max(self.expected_answers - probability, 0.0)
+        ring_seconds = self.clock() - dialed_at
+        self._line_window(line).add(answered, ring_seconds)
+        self.by_hour[hour].add(answered, ring_seconds)
+        return line
+
+    def stats(self) -> Dict[str, Any]:
+        hour = self.by_hour[datetime.now().hour]
+        avg_ring = hour.avg_ring()
+        return {
+            "ringing": len(self.ringing),
+            "expected_answers": round(self.expected_answers, 2),
+            "free_ai_slots": self.free_slots(),
+            "hour_answer_rate": round(hour.rate(self.PRIOR_RATE, self.PRIOR_WEIGHT), 3),
+            "hour_avg_ring_s": round(avg_ring, 1) if avg_ring is not None else None,
+            "overdialed": self.overdialed,
+            "held_for_slots": self.held_for_slots,
+        }
@@ -0,0 +1,153 @@
+import logging
+import math
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from logic.contact_queue import dedup_key
+
+
+logger = logging.getLogger(__name__)
+
+# Results that say the subscriber could not be reached at all (cause 0/1/3/18-22/27/38 -> power_off;
+# see MarketingScenario.on_call_failed). "banned" (21/34/41/42, congestion) is the carrier rejecting
+# our line, not the number, and is left to LineHealth.
+DEAD_RESULTS = frozenset({"power_off"})
+
+# Verdicts for a number about to be queued.
+DIAL = "dial"
+DEFER = "defer"
+SKIP = "skip"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS reputation (
+    phone TEXT PRIMARY KEY,
+    score REAL NOT NULL,
+    updated REAL NOT NULL,
+    result TEXT
+);
+CREATE INDEX IF NOT EXISTS reputation_updated ON reputation (updated);
+"""
+
+
+class ReputationCache:
+    """
+    Recent dead-number outcomes per subscriber (by `dedup_key`), kept in SQLite so
+    they outlive the panel batch and the engine.
+
+    Each failure adds 1 to a number's score, which halves every `half_life` seconds;
+    an answered call clears it. A number whose decayed score reaches `defer_score` is
+    queued with a not-before time (when the score will have decayed below it again),
+    one at `skip_score` is not queued at all (0 disables either).
+
+    The cache is bounded: entries untouched for `ttl` seconds are evicted, and past
+    `max_entries` the least recently updated ones go first. Both walk the `updated`
+    index, at most once per EVICT_EVERY writes.
+    """
+
+    EVICT_EVERY = 1000
+
+    def __init__(
+        self,
+        path: str = "",
+        half_life: float = 86400.0,
+        ttl: float = 30 * 86400.0,
+        max_entries: int = 1_000_000,
+        defer_score: float = 2.0,
+        skip_score: float = 4.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.path = path or ":memory:"
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self.half_life = half_life
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.defer_score = defer_score
+        self.skip_score = skip_score
+        self.clock = clock
+        self.db = sqlite3.connect(self.path, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(_SCHEMA)
+        self._writes = 0
+        self.lookups = 0
+        self.hits = 0
+        self.deferred = 0
+        self.skipped = 0
+        self.evicted = 0
+        self._evict()
+
+    def close(self) -> None:
+        self.db.close()
+
+    def _decayed(self, score: float, updated: float, now: float) -> float:
+        return score * 0.5 ** (max(now - updated, 0.0) / self.half_life)
+
+    def score(self, number: str) -> float:
+        row = self.db.execute("SELECT score, updated FROM reputation WHERE phone = ?", (dedup_key(number),)).fetchone()
+        return self._decayed(row[0], row[1], self.clock()) if row else 0.0
+
+    def verdict(self, number: str) -> Tuple[str, float]:
+        """(DIAL, 0), (DEFER, epoch seconds when it may be dialed) or (SKIP, 0) for `number`."""
+        self.lookups += 1
+        row = self.db.execute("SELECT score, updated FROM reputation WHERE phone = ?", (dedup_key(number),)).fetchone()
+        if row is None:
+            return DIAL, 0.0
+        self.hits += 1
+        now = self.clock()
+        score = self._decayed(row[0], row[1], now)
+        if self.skip_score and score >= self.skip_score:
+            self.skipped += 1
+            return SKIP, 0.0
+        if self.defer_score and score >= self.defer_score:
+            self.deferred += 1
+            # Time for the score to decay back below defer_score.
+            return DEFER, now + self.half_life * math.log2(score / self.defer_score)
+        return DIAL, 0.0
+
+    def record(self, number: str, result: Optional[str], answered: bool = False) -> None:
+        """Fold a call outcome in: dead results raise the score, an answered call clears it."""
+        key = dedup_key(number)
+        if answered:
+            self.db.execute("DELETE FROM reputation WHERE phone = ?", (key,))
+            return
+        if result not in DEAD_RESULTS:
+            return
+        now = self.clock()
+        row = self.db.execute("SELECT score, updated FROM reputation WHERE phone = ?", (key,)).fetchone()
+        score = (self._decayed(row[0], row[1], now) if row else 0.0) + 1.0
+        self.db.execute(
+            "INSERT INTO reputation (phone, score, updated, result) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (phone) DO UPDATE SET score = excluded.score, updated = excluded.updated, result = excluded.result",
+            (key, score, now, result),
+        )
+        self._writes += 1
+        if self._writes >= self.EVICT_EVERY:
+            self._evict()
+
+    def _evict(self) -> None:
+        self._writes = 0
+        try:
+            expired = self.db.execute("DELETE FROM reputation WHERE updated < ?", (self.clock() - self.ttl,)).rowcount
+            excess = self.db.execute("SELECT COUNT(*) FROM reputation").fetchone()[0] - self.max_entries
+            if excess > 0:
+                expired += self.db.execute(
+                    "DELETE FROM reputation WHERE phone IN "
+                    "(SELECT phone FROM reputation ORDER BY updated LIMIT ?)",
+                    (excess,),
+                ).rowcount
+            self.evicted += expired
+        except sqlite3.Error as exc:
+            logger.warning("Reputation cache eviction failed: %s", exc)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "lookups": self.lookups,
+            "hit_rate": round(self.hits / self.lookups, 3) if self.lookups else None,
+            "skip_rate": round(self.skipped / self.lookups, 3) if self.lookups else None,
+            "deferred": self.deferred,
+            "skipped": self.skipped,
+            "evicted": self.evicted,
+        }
@@ -0,0 +1,55 @@
+from datetime import datetime, time, timedelta
+from typing import Callable, Dict, Optional
+
+from config.settings import RetryPolicy
+
+
+def _in_window(moment: time, start: time, end: time) -> bool:
+    if start <= end:
+        return start <= moment <= end
+    # Window spans midnight (e.g. 22:00-02:00).
+    return moment >= start or moment <= end
+
+
+class RetryScheduler:
+    """
+    Decides whether (and when) a call result earns a local retry, per RETRY_POLICIES.
+
+    A retry is due `delay` seconds after the attempt; if that falls outside the
+    policy's time-of-day window it moves to the next window opening. The dialer puts
+    the contact back in the contact queue with that not-before time, so the queue's
+    next-eligible index is what feeds due retries to the dial loop (no panel poll).
+    """
+
+    def __init__(self, policies: Dict[str, RetryPolicy], now: Callable[[], datetime] = datetime.now):
+        self.policies = policies
+        self.now = now
+        self.scheduled: Dict[str, int] = {}
+        self.exhausted: Dict[str, int] = {}
+
+    def __bool__(self) -> bool:
+        return bool(self.policies)
+
+    def next_attempt_at(self, result: Optional[str], attempt: int) -> Optional[datetime]:
+        """Local time of the next attempt after `attempt` ended with `result`, or None."""
+        policy = self.policies.get(result or "")
+        if policy is None:
+            return None
+        if attempt >= policy.max_attempts:
+            self.exhausted[result] = self.exhausted.get(result, 0) + 1
+            return None
+        due = self.now() + timedelta(seconds=policy.delay)
+        if policy.window_start is not None and policy.window_end is not None:
+            due = self._into_window(due, policy.window_start, policy.window_end)
+        self.scheduled[result] = self.scheduled.get(result, 0) + 1
+        return due
+
+    @staticmethod
+    def _into_window(due: datetime, start: time, end: time) -> datetime:
+        if _in_window(due.time(), start, end):
+            return due
+        opening = due.replace(hour=start.hour, minute=start.minute, second=0, microsecond=0)
+        return opening if opening > due else opening + timedelta(days=1)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {"scheduled": dict(self.scheduled), "exhausted": dict(self.exhausted)}
@@ -0,0 +1,151 @@
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterable, Optional, Tuple
+
+from utils.metrics import RateMeter
+
+
+# Hangup causes that point at the carrier rather than the customer: no circuit (34),
+# network out of order (38), temporary failure (41), switching congestion (42).
+CONGESTION_CAUSES = frozenset({"34", "38", "41", "42"})
+# Other causes the trunk is answerable for (facility/interworking/protocol errors).
+TRUNK_FAILURE_CAUSES = CONGESTION_CAUSES | {"27", "29", "31", "47", "58", "63", "79", "88", "102", "111", "127"}
+# Originate request rejected before a channel existed.
+ORIGINATE_FAILED = "originate_failed"
+
+
+class TrunkState:
+    __slots__ = (
+        "name", "weight", "max_concurrent", "active", "current", "outcomes",
+        "failures_recent", "congestion_recent", "originations", "failures", "congestion", "rate",
+    )
+
+    def __init__(self, name: str, weight: float, max_concurrent: int, window: int):
+        self.name = name
+        self.weight = weight
+        self.max_concurrent = max_concurrent  # 0 = unlimited
+        self.active = 0
+        # Smooth weighted round-robin credit.
+        self.current = 0.0
+        # Last `window` outcomes as (trunk failure, congestion) pairs.
+        self.outcomes: Deque[Tuple[bool, bool]] = deque(maxlen=window)
+        self.failures_recent = 0
+        self.congestion_recent = 0
+        self.originations = 0
+        self.failures = 0
+        self.congestion = 0
+        self.rate = RateMeter(60.0)
+
+    @property
+    def health(self) -> float:
+        """1.0 when healthy; drops with the recent share of congestion and other trunk failures."""
+        if not self.outcomes:
+            return 1.0
+        count = len(self.outcomes)
+        score = 1.0 - self.congestion_recent / count - 0.5 * (self.failures_recent - self.congestion_recent) / count
+        return max(score, TrunkRouter.HEALTH_FLOOR)
+
+    def has_room(self) -> bool:
+        return not self.max_concurrent or self.active < self.max_concurrent
+
+    def record(self, failed: bool, congested: bool) -> None:
+        if len(self.outcomes) == self.outcomes.maxlen:
+            old_failed, old_congested = self.outcomes[0]
+            self.failures_recent -= old_failed
+            self.congestion_recent -= old_congested
+        self.outcomes.append((failed, congested))
+        self.failures_recent += failed
+        self.congestion_recent += congested
+        self.failures += failed
+        self.congestion += congested
+
+
+class TrunkRouter:
+    """
+    Spreads outbound calls over OUTBOUND_TRUNKS by smooth weighted round-robin, where
+    a trunk's effective weight is its configured weight times its health.
+
+    Health comes from the last `window` call outcomes on the trunk: carrier-side
+    causes (34/38/41/42) count fully, other trunk failures half, customer outcomes
+    (busy, no answer, normal clearing) not at all. A carrier that starts rejecting in
+    bulk sinks toward HEALTH_FLOOR and its traffic shifts to the other trunks; the
+    floor keeps a trickle of calls on it, so it recovers once its calls go through.
+
+    A trunk is skipped while at its TRUNK_MAX_CONCURRENT calls or while its
+    origination bucket (OriginationThrottle) is not ready.
+    """
+
+    HEALTH_FLOOR = 0.05
+
+    def __init__(self, weights: Dict[str, float], max_concurrent: Dict[str, float], window: int = 50):
+        self.trunks: Dict[str, TrunkState] = {
+            name: TrunkState(name, weight, int(max_concurrent.get(name, 0)), window)
+            for name, weight in weights.items()
+            if weight > 0
+        }
+        # Operator legs and anything not routed per call use the first trunk.
+        self.primary = next(iter(self.trunks))
+
+    def __iter__(self) -> Iterable[TrunkState]:
+        return iter(self.trunks.values())
+
+    def select(self, ready_in: Callable[[str], float]) -> Tuple[Optional[str], Optional[float]]:
+        """
+        (trunk to use, 0) or (None, seconds until a trunk's bucket refills); the wait is
+        None when every trunk is at its concurrency cap (a finishing call frees one).
+        """
+        best: Optional[TrunkState] = None
+        best_credit = 0.0
+        wait: Optional[float] = None
+        for trunk in self.trunks.values():
+            if not trunk.has_room():
+                continue
+            pace = ready_in(trunk.name)
+            if pace > 0:
+                wait = pace if wait is None else min(wait, pace)
+                continue
+            credit = trunk.current + trunk.weight * trunk.health
+            if best is None or credit > best_credit:
+                best, best_credit = trunk, credit
+        if best is None:
+            return None, wait
+        return best.name, 0.0
+
+    def take(self, name: str) -> None:
+        """Count a call on `name` and advance the round-robin credits."""
+        total = 0.0
+        for trunk in self.trunks.values():
+            if trunk.has_room():
+                effective = trunk.weight * trunk.health
+                trunk.current += effective
+                total += effective
+        chosen = self.trunks[name]
+        chosen.current -= total
+        chosen.active += 1
+        chosen.originations += 1
+        chosen.rate.observe()
+
+    def release(self, name: Optional[str]) -> None:
+        trunk = self.trunks.get(name or "")
+        if trunk is not None and trunk.active > 0:
+            trunk.active -= 1
+
+    def record_outcome(self, name: Optional[str], cause: Optional[str], answered: bool = False) -> None:
+        trunk = self.trunks.get(name or "")
+        if trunk is None:
+            return
+        cause = str(cause) if cause is not None else ""
+        failed = not answered and (cause in TRUNK_FAILURE_CAUSES or cause == ORIGINATE_FAILED)
+        trunk.record(failed, failed and cause in CONGESTION_CAUSES)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            trunk.name: {
+                "active": trunk.active,
+                "originations": trunk.originations,
+                "per_second": round(trunk.rate.rate(), 2),
+                "failures": trunk.failures,
+                "congestion": trunk.congestion,
+                "health": round(trunk.health, 2),
+            }
+            for trunk in self.trunks.values()
+        }
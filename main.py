@@ -7,13 +7,17 @@ from pathlib import Path
 from config import get_settings
 from core.ari_client import AriClient
 from core.ari_ws import AriWebSocketClient
+from core.event_capture import build_recorder
+from core.timers import TimerService
 from llm.client import GapGPTClient
 from logic.dialer import Dialer
 from logic.marketing_outreach import MarketingScenario
 from integrations.panel.client import PanelClient
 from sessions.session_manager import SessionManager
+from sessions.store import build_session_store
 from stt_tts.vira_stt import ViraSTTClient
 from stt_tts.vira_tts import ViraTTSClient
+from utils.journal import Journal
 from utils.audio_sync import ensure_audio_assets
 
 ALLOWED_LOG_PREFIXES = (
@@ -104,19 +108,94 @@ async def async_main() -> None:
             max_connections=settings.concurrency.http_max_connections,
             default_retry=settings.dialer.default_retry,
         )
+    timers = TimerService()
     session_manager = SessionManager(
         ari_client,
         None,
         allowed_inbound_numbers=settings.dialer.outbound_numbers,
         max_inbound_calls=settings.dialer.max_concurrent_inbound_calls,
     )  # placeholder to allow scenario access
-    scenario = MarketingScenario(settings, ari_client, llm_client, stt_client, session_manager, panel_client)
+    scenario = MarketingScenario(
+        settings, ari_client, llm_client, stt_client, session_manager, panel_client, timers=timers
+    )
     session_manager.scenario_handler = scenario
-    dialer = Dialer(settings, ari_client, session_manager, panel_client=panel_client)
+    dialer = Dialer(settings, ari_client, session_manager, panel_client=panel_client, timers=timers)
     session_manager.attach_dialer(dialer)
     scenario.attach_dialer(dialer)
 
-    ws_client = AriWebSocketClient(settings.ari, session_manager.handle_event)
+    session_store = build_session_store(
+        settings.store.backend,
+        url=settings.store.url,
+        engine_id=settings.store.engine_id,
+        ttl=settings.store.ttl,
+        owner_ttl=settings.store.owner_ttl,
+    )
+    journal: Journal | None = None
+    if settings.journal.path:
+        journal = Journal(
+            settings.journal.path,
+            fsync_interval=settings.journal.fsync_interval,
+            compact_every=settings.journal.compact_every,
+            snapshot=lambda: dialer.journal_snapshot() + (panel_client.journal_snapshot() if panel_client else []),
+        )
+        records = journal.load()
+        dialer.restore_from_journal(records)
+        if panel_client:
+            panel_client.restore_from_journal(records)
+
+    restored_sessions = 0
+    if session_store:
+        session_manager.attach_store(session_store, flush_interval=settings.store.flush_interval)
+        restored_sessions = await session_manager.restore_from_store()
+        logger.info("Session store: %s (engine_id=%s)", settings.store.backend, session_store.engine_id)
+
+    if journal:
+        dialer.attach_journal(journal)
+        if panel_client:
+            panel_client.journal = journal
+        await dialer.settle_interrupted_calls(session_manager.sessions)
+        # Start from a compact snapshot of the restored state.
+        await journal.compact()
+        journal.start()
+
+    ws_client = AriWebSocketClient(
+        settings.ari,
+        session_manager.handle_event,
+        routing_key=session_manager.routing_key,
+        workers=settings.concurrency.event_workers,
+        max_pending=settings.concurrency.event_queue_max,
+        high_watermark=settings.concurrency.event_queue_high,
+        low_watermark=settings.concurrency.event_queue_low,
+        ws_max_queue=settings.concurrency.ws_max_queue,
+        allowed_event_types=SessionManager.HANDLED_EVENT_TYPES if settings.ari.event_filter else None,
+        recorder=build_recorder(settings.ari.capture_path),
+    )
+    session_manager.attach_dispatcher(ws_client.dispatcher)
+    ws_client.dispatcher.add_saturation_listener(dialer.set_engine_saturated)
+    ws_client.dispatcher.add_stats_provider("session_manager", session_manager.lock_stats)
+    ws_client.dispatcher.add_stats_provider("dialer", dialer.pacing_stats)
+    ws_client.dispatcher.add_stats_provider("timers", timers.stats)
+
+    if settings.ari.event_filter:
+        async def _register_event_filter(_reconnected: bool) -> None:
+            # The application is (re)created on subscribe, so apply the filter on every connect.
+            try:
+                await ari_client.set_event_filter(sorted(SessionManager.HANDLED_EVENT_TYPES))
+                logger.info("Registered ARI event filter for %d event types", len(SessionManager.HANDLED_EVENT_TYPES))
+            except Exception as exc:
+                logger.warning("Failed to register ARI event filter (continuing unfiltered): %s", exc)
+
+        ws_client.add_connect_listener(_register_event_filter)
+
+    async def _resync_after_reconnect(reconnected: bool) -> None:
+        # Events may have been lost while disconnected (or while we were down, for
+        # sessions restored from the store); rebuild state from ARI.
+        nonlocal restored_sessions
+        if reconnected or restored_sessions:
+            restored_sessions = 0
+            await session_manager.reconcile_with_ari()
+
+    ws_client.add_connect_listener(_resync_after_reconnect)
 
     stop_event = asyncio.Event()
     loop = asyncio.get_running_loop()
@@ -128,15 +207,22 @@ async def async_main() -> None:
             pass
 
     logger.info("Starting ARI WebSocket listener and dialer")
-    tasks = [
-        asyncio.create_task(ws_client.run()),
-        asyncio.create_task(dialer.run(stop_event)),
-    ]
+    dialer_task = asyncio.create_task(dialer.run(stop_event))
+    tasks = [asyncio.create_task(ws_client.run()), dialer_task]
     try:
         await stop_event.wait()
     finally:
         await ws_client.stop()
         await dialer.stop()
+        # The run loop's finally drains in-flight originations and panel reports, which still
+        # write to the contact queue, reputation cache, journal and session store.
+        await asyncio.gather(dialer_task, return_exceptions=True)
+        await session_manager.close_store()
+        if journal:
+            await journal.close()
+        await timers.close()
+        dialer.contacts.close()
+        dialer.reputation.close()
         for task in tasks:
             task.cancel()
         await asyncio.gather(*tasks, return_exceptions=True)
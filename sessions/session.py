@@ -1,7 +1,7 @@
 import asyncio
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Dict, List, Optional, Set
+from typing import Dict, List, Optional, Set, Tuple
 
 
 class LegDirection(str, Enum):
@@ -26,7 +26,7 @@ class SessionStatus(str, Enum):
     FAILED = "failed"
 
 
-@dataclass
+@dataclass(slots=True)
 class CallLeg:
     channel_id: str
     direction: LegDirection
@@ -35,14 +35,43 @@ class CallLeg:
     variables: Dict[str, str] = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(slots=True)
 class BridgeInfo:
     bridge_id: str
     bridge_type: str = "mixing"
     channels: List[str] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
+class SessionState:
+    """
+    Typed per-call state read on every event (flags, timestamps, causes, phase).
+    Replaces the "1"/str(time.time()) strings formerly kept in Session.metadata.
+    """
+
+    line: Optional[str] = None
+    answered_at: float = 0.0
+    yes_at: float = 0.0
+    intent_yes: bool = False
+    intent_no: bool = False
+    hungup: bool = False
+    hungup_by: Optional[str] = None
+    app_hangup: bool = False
+    hangup_cause: Optional[str] = None
+    hangup_cause_txt: Optional[str] = None
+    dialstatus: Optional[str] = None
+    pre_stasis_failure: bool = False
+    operator_connected: bool = False
+    operator_call_started: bool = False
+    inbound_waiting: bool = False
+    cleanup_done: bool = False
+    finished_reported: bool = False
+    recording_phase: Optional[str] = None
+    recording_name: Optional[str] = None
+    alo_played: Tuple[str, ...] = ()
+
+
+@dataclass(slots=True)
 class Session:
     session_id: str
     bridge: Optional[BridgeInfo] = None
@@ -50,12 +79,21 @@ class Session:
     outbound_leg: Optional[CallLeg] = None
     operator_leg: Optional[CallLeg] = None
     status: SessionStatus = SessionStatus.INITIATING
+    state: SessionState = field(default_factory=SessionState)
+    # Free-form, rarely touched data (panel ids, operator routing, SIP headers).
     metadata: Dict[str, str] = field(default_factory=dict)
     playbacks: Dict[str, str] = field(default_factory=dict)
     responses: List[Dict[str, str]] = field(default_factory=list)
     result: Optional[str] = None
     processed_recordings: Set[str] = field(default_factory=set)
-    lock: asyncio.Lock = field(default_factory=asyncio.Lock, repr=False, compare=False)
+    _lock: Optional[asyncio.Lock] = field(default=None, init=False, repr=False, compare=False)
+
+    @property
+    def lock(self) -> asyncio.Lock:
+        # Created on first use: sessions that fail before Stasis never need one.
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
 
     def add_channel(self, channel_id: str) -> None:
         if not self.bridge:
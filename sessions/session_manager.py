@@ -3,11 +3,13 @@ import logging
 import time
 import uuid
 from collections import deque
+from dataclasses import dataclass, field
 from logging.handlers import RotatingFileHandler
 from pathlib import Path
-from typing import Deque, Dict, Optional, Tuple
+from typing import Any, Collection, Deque, Dict, List, Optional, Set, Tuple
 
 from core.ari_client import AriClient
+from core.event_dispatcher import default_routing_key
 from sessions.session import (
     BridgeInfo,
     CallLeg,
@@ -16,16 +18,49 @@ from sessions.session import (
     Session,
     SessionStatus,
 )
+from sessions.store import SessionStore, session_from_record, session_to_record
+from utils.locks import ShardedLock
 
 
 logger = logging.getLogger(__name__)
 
+# Field routing_key adds to an event: its dispatcher key, computed on the WebSocket reader.
+ROUTE_KEY = "_route_key"
+
+
+@dataclass
+class OwnedKeys:
+    """
+    Reverse index of the lookup keys a session owns, so cleanup touches only its own entries.
+    """
+
+    channels: Set[str] = field(default_factory=set)
+    playbacks: Set[str] = field(default_factory=set)
+    recordings: Set[str] = field(default_factory=set)
+    protocol_ids: Set[str] = field(default_factory=set)
+
 
 class SessionManager:
     """
     Manages sessions, bridges, and routing of ARI events into scenario logic.
     """
 
+    # Event types routed by handle_event; used for the ARI event filter and WS fast path.
+    HANDLED_EVENT_TYPES = frozenset(
+        {
+            "StasisStart",
+            "StasisEnd",
+            "ChannelStateChange",
+            "ChannelHangupRequest",
+            "ChannelDestroyed",
+            "PlaybackStarted",
+            "PlaybackFinished",
+            "RecordingFinished",
+            "RecordingFailed",
+            "Dial",
+        }
+    )
+
     def __init__(
         self,
         ari_client: AriClient,
@@ -41,7 +76,15 @@ class SessionManager:
         self.recording_to_session: Dict[str, str] = {}
         # Track pre-Stasis channels by protocol_id (for early failure detection)
         self.protocol_id_to_session: Dict[str, str] = {}
-        self.lock = asyncio.Lock()
+        # session_id -> keys it owns in the four maps above (O(1) cleanup per session).
+        self.owned_keys: Dict[str, OwnedKeys] = {}
+        # channel_id -> session id from its StasisStart args, recorded by routing_key on the
+        # WebSocket reader before the handler links the channel (see routing_key).
+        self.channel_routes: Dict[str, str] = {}
+        # Index lookups and single-step updates run without a lock: they never await, so
+        # they are atomic on the event loop. Only multi-step mutations that span an await
+        # take a per-line shard.
+        self.line_locks = ShardedLock(16, name="line")
         # Inbound is allowed for all; we keep the set for mapping/priority.
         self.inbound_lines = [self._normalize_number(n) for n in (allowed_inbound_numbers or []) if n]
         self.allowed_inbound_numbers = {norm for norm in self.inbound_lines if norm}
@@ -50,7 +93,19 @@ class SessionManager:
         self.userdrop_logger = logging.getLogger("sessions.userdrop")
         self._ensure_hangup_log_handler()
         self.dialer = None
+        # The WebSocket client's EventDispatcher; events synthesized here go through it
+        # so they are ordered with the call's real events.
+        self.dispatcher = None
         self.waiting_inbound: Dict[str, Deque[Tuple[str, str]]] = {}
+        # Optional shared session store (write-behind: handlers only mark sessions dirty).
+        self.store: Optional[SessionStore] = None
+        self._store_dirty: Set[str] = set()
+        self._store_deleted: Dict[str, List[str]] = {}
+        self._store_task: Optional[asyncio.Task] = None
+        # channel_id -> monotonic time before which we won't ask the store about it again
+        # (channels of other engines' live calls, of calls we just finished, and ones the
+        # store has no session for)
+        self._store_skip: Dict[str, float] = {}
 
     def _ensure_hangup_log_handler(self) -> None:
         # Add a dedicated rolling log for hangup tracing if not already present.
@@ -74,43 +129,142 @@ class SessionManager:
         self.userdrop_logger.addHandler(user_handler)
 
     async def create_outbound_session(
-        self, contact_number: str, metadata: Optional[Dict[str, str]] = None
+        self, contact_number: str, metadata: Optional[Dict[str, str]] = None, line: Optional[str] = None
     ) -> Session:
         session_id = str(uuid.uuid4())
         session = Session(session_id=session_id, metadata={"contact_number": contact_number})
         if metadata:
             session.metadata.update(metadata)
-        async with self.lock:
-            self.sessions[session_id] = session
+        session.state.line = line
+        self.sessions[session_id] = session
+        if self.store is not None:
+            self._store_dirty.add(session_id)
+            # Claimed before the originate, so engines sharing the ARI app leave its StasisStart to us.
+            try:
+                await self.store.claim(session_id)
+            except Exception as exc:
+                logger.warning("Session store claim for %s failed: %s", session_id, exc)
         logger.info("Created outbound session %s for %s", session_id, contact_number)
         return session
 
     async def get_session(self, session_id: str) -> Optional[Session]:
-        async with self.lock:
-            return self.sessions.get(session_id)
+        return self.sessions.get(session_id)
+
+    def _owned(self, session_id: str) -> OwnedKeys:
+        if self.store is not None:
+            self._store_dirty.add(session_id)
+        owned = self.owned_keys.get(session_id)
+        if owned is None:
+            owned = self.owned_keys[session_id] = OwnedKeys()
+        return owned
+
+    def _link_channel(self, session_id: str, channel_id: str) -> None:
+        self.channel_to_session[channel_id] = session_id
+        self._owned(session_id).channels.add(channel_id)
+
+    def _link_protocol_id(self, session_id: str, protocol_id: str) -> None:
+        self.protocol_id_to_session[protocol_id] = session_id
+        self._owned(session_id).protocol_ids.add(protocol_id)
+
+    def _link_playback(self, session_id: str, playback_id: str) -> None:
+        self.playback_to_session[playback_id] = session_id
+        self._owned(session_id).playbacks.add(playback_id)
+
+    def _link_recording(self, session_id: str, recording_name: str) -> None:
+        self.recording_to_session[recording_name] = session_id
+        self._owned(session_id).recordings.add(recording_name)
+
+    def _unlink_session(self, session_id: str) -> None:
+        owned = self.owned_keys.pop(session_id, None)
+        if self.store is not None:
+            self._store_dirty.discard(session_id)
+            self._store_deleted[session_id] = list(owned.channels) if owned else []
+            # Trailing events (ChannelDestroyed...) must not re-adopt the finished call
+            # from the store before the delete is flushed.
+            skip_until = time.monotonic() + self.store.owner_ttl
+            for channel_id in self._store_deleted[session_id]:
+                self._store_skip[channel_id] = skip_until
+        if not owned:
+            return
+        for channel_id in owned.channels:
+            if self.channel_routes.get(channel_id) == session_id:
+                del self.channel_routes[channel_id]
+        for mapping, keys in (
+            (self.channel_to_session, owned.channels),
+            (self.playback_to_session, owned.playbacks),
+            (self.recording_to_session, owned.recordings),
+            (self.protocol_id_to_session, owned.protocol_ids),
+        ):
+            for key in keys:
+                # A key may have been re-linked to another session since; leave that one alone.
+                if mapping.get(key) == session_id:
+                    del mapping[key]
 
     async def _index_channel(self, session_id: str, channel_id: str) -> None:
-        async with self.lock:
-            self.channel_to_session[channel_id] = session_id
+        self._link_channel(session_id, channel_id)
 
     async def register_protocol_id(self, session_id: str, protocol_id: str) -> None:
         """Register protocol_id for early failure detection before channel enters Stasis."""
-        async with self.lock:
-            self.protocol_id_to_session[protocol_id] = session_id
+        self._link_protocol_id(session_id, protocol_id)
         logger.debug("Registered protocol_id=%s for session=%s", protocol_id, session_id)
 
     async def _get_session_by_channel(self, channel_id: str) -> Optional[Session]:
-        async with self.lock:
-            session_id = self.channel_to_session.get(channel_id)
-            if session_id:
-                return self.sessions.get(session_id)
+        session_id = self.channel_to_session.get(channel_id)
+        if session_id:
+            return self.sessions.get(session_id)
         return None
 
+    def routing_key(self, event: dict) -> Optional[str]:
+        """
+        Ordering key for the event dispatcher: the owning session, so the customer and
+        operator legs of a call are handled in order on one worker. A StasisStart carries
+        its session id in args; it is recorded against the channel here, before the
+        handler links the channel, so the channel's later events get the same key.
+        Channels of unknown calls fall back to the channel id (an inbound session's id).
+        Pure dict reads/writes so it can run synchronously on the WebSocket reader. The key
+        is kept on the event (ROUTE_KEY) for handle_event, which must not recompute it:
+        by then the handler may have dropped the channel's route.
+        """
+        key = self._route(event)
+        event[ROUTE_KEY] = key
+        return key
+
+    def _route(self, event: dict) -> Optional[str]:
+        event_type = event.get("type")
+        channel = event.get("channel") or {}
+        channel_id = channel.get("id")
+        args = event.get("args") or []
+        if event_type == "StasisStart" and channel_id and len(args) >= 2 and args[0] in {"outbound", "operator"}:
+            self.channel_routes[channel_id] = args[1]
+            return args[1]
+        recording_name = (event.get("recording") or {}).get("name")
+        if recording_name and recording_name in self.recording_to_session:
+            return self.recording_to_session[recording_name]
+        playback_id = (event.get("playback") or {}).get("id")
+        if playback_id and playback_id in self.playback_to_session:
+            return self.playback_to_session[playback_id]
+        key = default_routing_key(event)
+        if not key:
+            return None
+        session_id = self.channel_routes.get(key) or self.channel_to_session.get(key)
+        if not session_id and channel.get("protocol_id"):
+            # Pre-Stasis failure of an outbound leg, known only by its SIP call id.
+            session_id = self.protocol_id_to_session.get(channel["protocol_id"])
+        if event_type == "ChannelDestroyed":
+            # A channel's last event.
+            self.channel_routes.pop(key, None)
+        return session_id or key
+
     async def handle_event(self, event: dict) -> None:
         event_type = event.get("type")
         if not event_type:
             return
 
+        if self.store is not None and event_type != "StasisStart":
+            channel_id = (event.get("channel") or {}).get("id")
+            if channel_id and channel_id not in self.channel_to_session:
+                await self._take_over_from_store(channel_id)
+
         if event_type == "StasisStart":
             await self._handle_stasis_start(event)
         elif event_type == "ChannelStateChange":
@@ -137,6 +291,13 @@ class SessionManager:
         else:
             logger.debug("Unhandled event type: %s", event_type)
 
+        if self.store is not None:
+            # Events that bypassed the dispatcher carry no key; their channel still maps.
+            key = event.get(ROUTE_KEY) or default_routing_key(event)
+            session_id = key if key in self.sessions else self.channel_to_session.get(key) if key else None
+            if session_id and session_id in self.sessions:
+                self._store_dirty.add(session_id)
+
     async def _ensure_bridge(self, session: Session) -> None:
         async with session.lock:
             if session.bridge:
@@ -154,14 +315,16 @@ class SessionManager:
         channel_state = channel.get("state")
         args = event.get("args", [])
         direction = self._detect_direction(args)
+        if not await self._claim_session(args[1] if direction != LegDirection.INBOUND and len(args) >= 2 else channel_id):
+            logger.debug("StasisStart for channel %s belongs to another engine; ignoring", channel_id)
+            return
 
         if direction == LegDirection.OUTBOUND and len(args) >= 2:
             session_id = args[1]
             session = await self.get_session(session_id)
             if not session:
                 session = Session(session_id=session_id)
-                async with self.lock:
-                    self.sessions[session_id] = session
+                self.sessions[session_id] = session
             async with session.lock:
                 session.outbound_leg = CallLeg(
                     channel_id=channel_id,
@@ -251,12 +414,11 @@ class SessionManager:
                 called_num = channel.get("connected", {}).get("number") or channel.get("dialplan", {}).get("exten")
                 divert_header = None
                 if inbound_line:
-                    session.metadata["inbound_line"] = inbound_line
+                    session.state.line = inbound_line
                 if waiting_for_slot:
-                    session.metadata["inbound_waiting"] = "1"
+                    session.state.inbound_waiting = True
                 caller_num = session.metadata.get("caller_number")
-            async with self.lock:
-                self.sessions[session_id] = session
+            self.sessions[session_id] = session
             await self._update_contact_number(session, caller_num)
             await self._index_channel(session_id, channel_id)
             await self._ensure_bridge(session)
@@ -293,6 +455,8 @@ class SessionManager:
                 if leg.direction == LegDirection.OPERATOR:
                     session.result = session.result or "failed:operator_failed"
 
+        if channel_state == "Up" and leg.direction == LegDirection.OUTBOUND and self.dialer:
+            await self.dialer.on_call_answered(session.session_id)
         if channel_state == "Up" and self.scenario_handler:
             await self.scenario_handler.on_call_answered(session, leg)
         elif channel_state in {"Busy", "Failed"} and self.scenario_handler:
@@ -326,19 +490,18 @@ class SessionManager:
 
         # If not found and we have protocol_id, try to find via protocol_id mapping
         if not session and protocol_id:
-            async with self.lock:
-                session_id = self.protocol_id_to_session.get(protocol_id)
+            session_id = self.protocol_id_to_session.get(protocol_id)
             if session_id:
                 session = await self.get_session(session_id)
                 if session:
                     logger.info("Matched pre-Stasis hangup via protocol_id=%s to session=%s cause=%s",
                                protocol_id, session_id, cause)
-                    # Store the cause in metadata if not already present
+                    # Store the cause on the session if not already present
                     async with session.lock:
-                        if not session.metadata.get("hangup_cause"):
-                            session.metadata["hangup_cause"] = str(cause) if cause else None
-                        if not session.metadata.get("hangup_cause_txt"):
-                            session.metadata["hangup_cause_txt"] = cause_txt
+                        if not session.state.hangup_cause:
+                            session.state.hangup_cause = str(cause) if cause else None
+                        if not session.state.hangup_cause_txt:
+                            session.state.hangup_cause_txt = cause_txt
 
         if not session:
             return
@@ -348,11 +511,11 @@ class SessionManager:
                 leg.state = LegState.HUNGUP
             session.status = SessionStatus.COMPLETED
             if cause:
-                session.metadata["hangup_cause"] = str(cause)
+                session.state.hangup_cause = str(cause)
             if cause_txt:
-                session.metadata["hangup_cause_txt"] = cause_txt
+                session.state.hangup_cause_txt = cause_txt
             if leg:
-                session.metadata["hungup_by"] = leg.direction.value
+                session.state.hungup_by = leg.direction.value
         self.hangup_logger.info(
             "Hangup session=%s contact=%s channel=%s leg=%s cause=%s cause_txt=%s result=%s",
             session.session_id,
@@ -363,11 +526,16 @@ class SessionManager:
             cause_txt,
             session.result,
         )
+        if self.dialer and (leg is None or leg.direction == LegDirection.OUTBOUND):
+            # Pre-Stasis hangups (matched by protocol_id) have no leg yet: also the customer leg.
+            await self.dialer.on_call_hangup(
+                session.session_id, session.state.hangup_cause, bool(session.state.answered_at)
+            )
         # Detailed timing for customer leg hangups (user drops / disconnects).
         if leg and leg.direction == LegDirection.OUTBOUND:
             now = time.time()
-            answered_at = float(session.metadata.get("answered_at", "0") or 0)
-            yes_at = float(session.metadata.get("yes_at", "0") or 0)
+            answered_at = session.state.answered_at
+            yes_at = session.state.yes_at
             t_answer_to_hang = now - answered_at if answered_at else None
             t_yes_to_hang = now - yes_at if yes_at else None
             self.userdrop_logger.info(
@@ -381,7 +549,7 @@ class SessionManager:
                 f"{t_yes_to_hang:.3f}" if t_yes_to_hang is not None else "na",
             )
         # Check if this was a pre-Stasis failure or has failure cause codes
-        pre_stasis_failure = session.metadata.get("pre_stasis_failure") == "1"
+        pre_stasis_failure = session.state.pre_stasis_failure
         busy_like = {"17", "18", "19", "20", "21", "34", "41", "42", "38"}  # Added 38 (Network out of order)
 
         # If we have a clear failure cause (busy/congest/power-off/banned), notify scenario before hangup finish.
@@ -392,7 +560,7 @@ class SessionManager:
         ):
             try:
                 # Use dialstatus if available for more accurate failure reason
-                dialstatus = session.metadata.get("dialstatus", "")
+                dialstatus = session.state.dialstatus or ""
                 reason = cause_txt or (str(cause) if cause is not None else None) or dialstatus
                 await self.scenario_handler.on_call_failed(session, reason=reason)
             except Exception as exc:  # best-effort; don't block cleanup
@@ -433,11 +601,10 @@ class SessionManager:
         channel = event.get("channel", {})
         channel_id = channel.get("id")
         if playback_id and channel_id:
-            async with self.lock:
-                if playback_id not in self.playback_to_session:
-                    session_id = self.channel_to_session.get(channel_id)
-                    if session_id:
-                        self.playback_to_session[playback_id] = session_id
+            if playback_id not in self.playback_to_session:
+                session_id = self.channel_to_session.get(channel_id)
+                if session_id:
+                    self._link_playback(session_id, playback_id)
 
     async def _handle_dial_event(self, event: dict) -> None:
         """
@@ -459,13 +626,12 @@ class SessionManager:
             phone_number = dialstring.split("@")[0]
 
             # Search through active sessions for matching contact_number
-            async with self.lock:
-                for sid, session in self.sessions.items():
-                    contact_num = session.metadata.get("contact_number", "")
-                    # Match phone number (handle potential formatting differences)
-                    if contact_num and phone_number in contact_num:
-                        session_id = sid
-                        break
+            for sid, session in self.sessions.items():
+                contact_num = session.metadata.get("contact_number", "")
+                # Match phone number (handle potential formatting differences)
+                if contact_num and phone_number in contact_num:
+                    session_id = sid
+                    break
 
         if not session_id:
             logger.debug("Dial event without matching session: dialstring=%s phone=%s",
@@ -474,11 +640,9 @@ class SessionManager:
 
         # Also register the peer channel's protocol_id and id for hangup tracking
         if peer_protocol_id:
-            async with self.lock:
-                self.protocol_id_to_session[peer_protocol_id] = session_id
+            self._link_protocol_id(session_id, peer_protocol_id)
         if peer_id:
-            async with self.lock:
-                self.channel_to_session[peer_id] = session_id
+            self._link_channel(session_id, peer_id)
 
         # NOTE: We cannot capture early cause codes from PROGRESS events because
         # ARI does not expose the SIP Reason header (cause=1,17,20,etc) in Dial events.
@@ -498,14 +662,14 @@ class SessionManager:
                 logger.info("Pre-Stasis dial failure: session=%s dialstatus=%s cause=%s peer_id=%s",
                            session_id, dialstatus, reason, peer_id)
 
-                # Store failure info in session metadata
+                # Store failure info on the session
                 async with session.lock:
-                    session.metadata["pre_stasis_failure"] = "1"
-                    session.metadata["dialstatus"] = dialstatus
+                    session.state.pre_stasis_failure = True
+                    session.state.dialstatus = dialstatus
                     if cause:
-                        session.metadata["hangup_cause"] = str(cause)
+                        session.state.hangup_cause = str(cause)
                     if cause_txt:
-                        session.metadata["hangup_cause_txt"] = cause_txt
+                        session.state.hangup_cause_txt = cause_txt
 
                 # Notify scenario handler immediately on NOANSWER or BUSY
                 if self.scenario_handler and dialstatus in {"BUSY", "NOANSWER"}:
@@ -527,15 +691,15 @@ class SessionManager:
     async def _cleanup_session(self, session: Session) -> None:
         # Prevent duplicate cleanup
         async with session.lock:
-            if session.metadata.get("cleanup_done") == "1":
+            if session.state.cleanup_done:
                 return
-            session.metadata["cleanup_done"] = "1"
+            session.state.cleanup_done = True
 
         report = False
         if self.scenario_handler:
             async with session.lock:
-                if session.metadata.get("finished_reported") != "1":
-                    session.metadata["finished_reported"] = "1"
+                if not session.state.finished_reported:
+                    session.state.finished_reported = True
                     report = True
         if report:
             try:
@@ -543,80 +707,198 @@ class SessionManager:
             except Exception as exc:
                 logger.exception("Error reporting call finished for session %s: %s", session.session_id, exc)
 
-        # Proactively hang up any remaining legs before cleaning.
-        tasks = []
-        for leg in (session.inbound_leg, session.outbound_leg, session.operator_leg):
-            if leg and leg.channel_id and leg.state not in {LegState.HUNGUP, LegState.FAILED}:
-                tasks.append(self.ari_client.hangup_channel(leg.channel_id))
-        if tasks:
-            await asyncio.gather(*tasks, return_exceptions=True)
-
-        async with self.lock:
-            for channel_id, session_id in list(self.channel_to_session.items()):
-                if session_id == session.session_id:
-                    del self.channel_to_session[channel_id]
-            for playback_id, session_id in list(self.playback_to_session.items()):
-                if session_id == session.session_id:
-                    del self.playback_to_session[playback_id]
-            for recording_name, session_id in list(self.recording_to_session.items()):
-                if session_id == session.session_id:
-                    del self.recording_to_session[recording_name]
-            for protocol_id, session_id in list(self.protocol_id_to_session.items()):
-                if session_id == session.session_id:
-                    del self.protocol_id_to_session[protocol_id]
+        try:
+            # Proactively hang up any remaining legs before cleaning.
+            tasks = []
+            for leg in (session.inbound_leg, session.outbound_leg, session.operator_leg):
+                if leg and leg.channel_id and leg.state not in {LegState.HUNGUP, LegState.FAILED}:
+                    tasks.append(self.ari_client.hangup_channel(leg.channel_id))
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+            self._unlink_session(session.session_id)
             self.sessions.pop(session.session_id, None)
 
-        # If this session was waiting for capacity, clear its marker.
-        waiting_line = await self._remove_from_waiting(session.session_id)
-        if waiting_line and self.dialer:
-            await self.dialer.cancel_waiting_inbound(waiting_line)
+            # If this session was waiting for capacity, clear its marker.
+            waiting_line = await self._remove_from_waiting(session.session_id)
+            if waiting_line and self.dialer:
+                await self.dialer.cancel_waiting_inbound(waiting_line)
 
-        if session.bridge:
+            if session.bridge:
+                try:
+                    await self.ari_client.delete_bridge(session.bridge.bridge_id)
+                except Exception as exc:
+                    msg = (
+                        "Failed to delete bridge %s for session %s: %s",
+                        session.bridge.bridge_id,
+                        session.session_id,
+                        exc,
+                    )
+                    if "404" in str(exc):
+                        logger.debug(*msg)
+                    else:
+                        logger.warning(*msg)
+        finally:
+            # Whatever failed above, the session's line leases are given back.
+            if self.dialer:
+                try:
+                    await self.dialer.on_session_completed(session.session_id)
+                except Exception as exc:
+                    logger.warning(
+                        "Failed to notify dialer of session cleanup for %s: %s",
+                        session.session_id,
+                        exc,
+                    )
+        if session.state.line:
+            await self._try_start_waiting_inbound(session.state.line)
+        logger.info("Cleaned session %s", session.session_id)
+
+    async def reconcile_with_ari(self) -> int:
+        """
+        Resync in-memory sessions with live ARI channels/bridges after events may have been
+        missed (WebSocket reconnect). Sessions whose customer leg no longer exists are finished
+        and cleaned up right away so their line capacity is released; live Stasis channels of a
+        known session that never got their StasisStart are re-adopted; stray session bridges
+        are deleted. Returns the number of sessions finished.
+        """
+        try:
+            channels = await self.ari_client.list_channels()
+            bridges = await self.ari_client.list_bridges()
+        except Exception as exc:
+            logger.warning("ARI resync skipped; failed to list channels/bridges: %s", exc)
+            return 0
+        live_channels = {c.get("id"): c for c in channels if c.get("id")}
+        app_name = getattr(self.ari_client, "app_name", "")
+        # Routes of channels whose ChannelDestroyed was lost in the gap.
+        for channel_id in [ch for ch in self.channel_routes if ch not in live_channels]:
+            del self.channel_routes[channel_id]
+
+        # Re-adopt our Stasis channels whose StasisStart was lost in the gap. The dispatcher
+        # handles them later, so their sessions are not judged by their legs below.
+        readopted: Set[str] = set()
+        for channel_id, channel in live_channels.items():
+            if channel_id in self.channel_to_session:
+                continue
+            dialplan = channel.get("dialplan") or {}
+            if dialplan.get("app_name") != "Stasis":
+                continue
+            parts = (dialplan.get("app_data") or "").split(",")
+            if not parts or parts[0] != app_name or len(parts) < 3:
+                continue
+            args = parts[1:]
+            if args[0] not in {"outbound", "operator"}:
+                continue
+            if args[1] in self.sessions:
+                logger.info("ARI resync: re-adopting channel %s for session %s", channel_id, args[1])
+                readopted.add(args[1])
+                await self._submit_event({"type": "StasisStart", "channel": channel, "args": args})
+            else:
+                logger.info("ARI resync: hanging up orphan %s channel %s (session %s gone)", args[0], channel_id, args[1])
+                try:
+                    await self.ari_client.hangup_channel(channel_id)
+                except Exception as exc:
+                    logger.debug("Failed to hangup orphan channel %s: %s", channel_id, exc)
+
+        finished = 0
+        for session in list(self.sessions.values()):
+            if session.session_id in readopted:
+                continue
+            customer_leg = session.outbound_leg or session.inbound_leg
+            if customer_leg:
+                alive = customer_leg.channel_id in live_channels
+            else:
+                owned = self.owned_keys.get(session.session_id)
+                tracked = (owned.channels | owned.protocol_ids) if owned else set()
+                if not tracked:
+                    # Origination still in flight; nothing to compare yet.
+                    continue
+                alive = any(cid in live_channels for cid in tracked)
+            if alive:
+                continue
+            await self._finish_orphaned_session(session, live_channels)
+            finished += 1
+
+        stale_bridges = 0
+        for bridge in bridges:
+            name = bridge.get("name") or ""
+            if not name.startswith("session-") or name[len("session-"):] in self.sessions:
+                continue
+            stale_bridges += 1
             try:
-                await self.ari_client.delete_bridge(session.bridge.bridge_id)
+                await self.ari_client.delete_bridge(bridge.get("id"))
             except Exception as exc:
-                msg = (
-                    "Failed to delete bridge %s for session %s: %s",
-                    session.bridge.bridge_id,
-                    session.session_id,
-                    exc,
-                )
-                if "404" in str(exc):
-                    logger.debug(*msg)
-                else:
-                    logger.warning(*msg)
-        if self.dialer:
+                logger.debug("Failed to delete stale bridge %s: %s", bridge.get("id"), exc)
+        logger.info(
+            "ARI resync complete: live_channels=%d sessions=%d finished=%d stale_bridges=%d",
+            len(live_channels),
+            len(self.sessions),
+            finished,
+            stale_bridges,
+        )
+        return finished
+
+    def channel_ids(self, session_id: str) -> Set[str]:
+        """Channel and protocol ids ARI may list for the session's legs (empty before origination)."""
+        owned = self.owned_keys.get(session_id)
+        ids = (owned.channels | owned.protocol_ids) if owned else set()
+        session = self.sessions.get(session_id)
+        if session is not None:
+            for leg in (session.inbound_leg, session.outbound_leg, session.operator_leg):
+                if leg and leg.channel_id:
+                    ids.add(leg.channel_id)
+        return ids
+
+    async def finish_orphaned(self, session_id: str, live_channels: Set[str]) -> bool:
+        """Finish a session none of whose channels is live any more (lease reconciler)."""
+        session = self.sessions.get(session_id)
+        if session is None:
+            return False
+        await self._finish_orphaned_session(session, live_channels)
+        return True
+
+    async def _finish_orphaned_session(self, session: Session, live_channels: Collection[str]) -> None:
+        answered = False
+        async with session.lock:
+            for leg in (session.inbound_leg, session.outbound_leg, session.operator_leg):
+                if leg and leg.channel_id not in live_channels:
+                    leg.state = LegState.HUNGUP
+            answered = session.status == SessionStatus.ACTIVE or bool(session.state.answered_at)
+            session.status = SessionStatus.COMPLETED
+            if not answered and session.result is None:
+                # Never answered before the channel vanished: same outcome as the no-event timeout.
+                session.result = "missed"
+        logger.warning(
+            "ARI resync: session %s has no live customer channel; finishing (answered=%s result=%s)",
+            session.session_id,
+            answered,
+            session.result,
+        )
+        if answered and self.scenario_handler:
             try:
-                await self.dialer.on_session_completed(session.session_id)
+                await self.scenario_handler.on_call_hangup(session)
             except Exception as exc:
-                logger.debug(
-                    "Failed to notify dialer of session cleanup for %s: %s",
-                    session.session_id,
-                    exc,
-                )
-        inbound_line = session.metadata.get("inbound_line") or session.metadata.get("outbound_line")
-        if inbound_line:
-            await self._try_start_waiting_inbound(inbound_line)
-        logger.info("Cleaned session %s", session.session_id)
+                logger.debug("on_call_hangup during resync failed for %s: %s", session.session_id, exc)
+        await self._cleanup_session(session)
+
+    def lock_stats(self) -> Dict[str, object]:
+        return {"line_locks": self.line_locks.stats(), "sessions": len(self.sessions)}
 
     async def active_sessions_count(self) -> int:
-        async with self.lock:
-            return len(self.sessions)
+        return len(self.sessions)
 
     async def inbound_active_count(self) -> int:
         """
         Count inbound sessions that are still ringing or active.
         Used to share concurrency limits with outbound calls.
         """
-        async with self.lock:
-            sessions = list(self.sessions.values())
+        sessions = list(self.sessions.values())
         active_states = {SessionStatus.RINGING, SessionStatus.ACTIVE}
         return sum(
             1
             for s in sessions
             if s.inbound_leg is not None
             and s.status in active_states
-            and s.metadata.get("inbound_waiting") != "1"
+            and not s.state.inbound_waiting
         )
 
     def _detect_direction(self, args: list) -> LegDirection:
@@ -628,12 +910,183 @@ class SessionManager:
             return LegDirection.OPERATOR
         return LegDirection.INBOUND
 
+    # Session store -------------------------------------------------------
+    def attach_store(self, store: SessionStore, flush_interval: float = 0.5) -> None:
+        """
+        Persist sessions and channel indexes to a shared store. Writes are batched every
+        `flush_interval` seconds so event handlers never wait on the store.
+        """
+        self.store = store
+        self._store_dirty.update(self.sessions)
+        self._store_task = asyncio.create_task(self._store_loop(flush_interval))
+
+    async def close_store(self) -> None:
+        if self.store is None:
+            return
+        if self._store_task:
+            self._store_task.cancel()
+            await asyncio.gather(self._store_task, return_exceptions=True)
+        try:
+            await self.flush_store()
+        except Exception as exc:
+            logger.warning("Final session store flush failed: %s", exc)
+        await self.store.close()
+
+    def _store_record(self, session: Session) -> Tuple[Dict[str, Any], List[str]]:
+        owned = self.owned_keys.get(session.session_id) or OwnedKeys()
+        keys = {
+            "channels": sorted(owned.channels),
+            "playbacks": sorted(owned.playbacks),
+            "recordings": sorted(owned.recordings),
+            "protocol_ids": sorted(owned.protocol_ids),
+        }
+        return session_to_record(session, keys), keys["channels"]
+
+    async def flush_store(self) -> None:
+        if self.store is None or not (self._store_dirty or self._store_deleted):
+            return
+        dirty, self._store_dirty = self._store_dirty, set()
+        deleted, self._store_deleted = self._store_deleted, {}
+        upserts = {
+            sid: self._store_record(self.sessions[sid]) for sid in dirty if sid in self.sessions
+        }
+        try:
+            await self.store.write(upserts, deleted)
+        except Exception:
+            # Keep the changes for the next attempt (newer marks win).
+            self._store_dirty.update(sid for sid in dirty if sid in self.sessions)
+            for sid, channels in deleted.items():
+                self._store_deleted.setdefault(sid, channels)
+            raise
+
+    async def _store_loop(self, interval: float) -> None:
+        last_renew = time.monotonic()
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.flush_store()
+                if time.monotonic() - last_renew >= self.store.owner_ttl / 3:
+                    await self.store.renew(list(self.sessions))
+                    last_renew = time.monotonic()
+            except Exception as exc:
+                logger.warning("Session store sync failed: %s", exc)
+
+    async def restore_from_store(self) -> int:
+        """
+        Load the calls this engine owned before a restart. Run reconcile_with_ari()
+        afterwards to finish the ones whose channels no longer exist.
+        """
+        if self.store is None:
+            return 0
+        try:
+            records = await self.store.load_owned()
+        except Exception as exc:
+            logger.warning("Could not restore sessions from store: %s", exc)
+            return 0
+        restored = 0
+        for record in records:
+            if record.get("session_id") in self.sessions:
+                continue
+            try:
+                await self._adopt_record(record)
+                restored += 1
+            except Exception as exc:
+                logger.warning("Skipping unreadable stored session %s: %s", record.get("session_id"), exc)
+        if restored:
+            logger.info("Restored %d in-flight session(s) from the session store", restored)
+        return restored
+
+    async def _adopt_record(self, record: Dict[str, Any]) -> Session:
+        session = session_from_record(record)
+        session_id = session.session_id
+        keys = record.get("keys") or {}
+        self.sessions[session_id] = session
+        for channel_id in keys.get("channels") or ():
+            self._link_channel(session_id, channel_id)
+        for playback_id in keys.get("playbacks") or ():
+            self._link_playback(session_id, playback_id)
+        for recording_name in keys.get("recordings") or ():
+            self._link_recording(session_id, recording_name)
+        for protocol_id in keys.get("protocol_ids") or ():
+            self._link_protocol_id(session_id, protocol_id)
+        if self.dialer and not session.state.inbound_waiting:
+            await self.dialer.adopt_session(
+                session_id,
+                session.state.line,
+                inbound=session.inbound_leg is not None,
+                answered=bool(session.state.answered_at),
+            )
+        elif session.state.inbound_waiting and session.state.line and session.inbound_leg:
+            await self._queue_waiting_inbound(session.state.line, session_id, session.inbound_leg.channel_id)
+        return session
+
+    async def _claim_session(self, session_id: Optional[str]) -> bool:
+        """
+        Store mode: a call this engine does not know yet is only handled once it holds the
+        session's claim (adopting the stored record, if any). False when another engine
+        owns it; with the store unreachable the call is handled here.
+        """
+        if self.store is None or not session_id or session_id in self.sessions:
+            return True
+        try:
+            if not await self.store.claim(session_id):
+                return False
+            record = await self.store.load(session_id)
+        except Exception as exc:
+            logger.warning("Session store claim for %s failed; handling the call here: %s", session_id, exc)
+            return True
+        if record and session_id not in self.sessions:
+            await self._adopt_record(record)
+        return True
+
+    async def _take_over_from_store(self, channel_id: str) -> None:
+        """
+        An event arrived for a channel we don't know: if it belongs to a session whose
+        owner stopped renewing its claim, adopt that session.
+        """
+        now = time.monotonic()
+        if self._store_skip.get(channel_id, 0.0) > now:
+            return
+        if len(self._store_skip) > 10000:
+            self._store_skip = {ch: until for ch, until in self._store_skip.items() if until > now}
+        try:
+            session_id = await self.store.lookup_channel(channel_id)
+            if not session_id:
+                # Not in the store (yet): don't ask again for every event on this channel.
+                self._store_skip[channel_id] = now + self.store.owner_ttl
+                return
+            if session_id in self.sessions:
+                return
+            if not await self.store.claim(session_id):
+                self._store_skip[channel_id] = now + self.store.owner_ttl
+                return
+            record = await self.store.load(session_id)
+        except Exception as exc:
+            logger.debug("Session store lookup for channel %s failed: %s", channel_id, exc)
+            return
+        if record and session_id not in self.sessions:
+            await self._adopt_record(record)
+            logger.warning("Took over session %s (channel %s) from a stale owner", session_id, channel_id)
+
     def attach_dialer(self, dialer) -> None:
         """
         Provide dialer access so inbound calls can share per-line concurrency with outbound.
         """
         self.dialer = dialer
 
+    def attach_dispatcher(self, dispatcher) -> None:
+        """
+        Route synthesized events (StasisStarts re-adopted after a reconnect) through the
+        event dispatcher, on the same worker as the session's other events.
+        """
+        self.dispatcher = dispatcher
+
+    async def _submit_event(self, event: dict) -> None:
+        if self.dispatcher is not None:
+            await self.dispatcher.submit(event)
+        else:
+            await self.handle_event(event)
+
     def _detect_inbound_line(self, channel: dict) -> Optional[str]:
         """
         Attempt to map an inbound channel to a configured line number.
@@ -679,9 +1132,8 @@ class SessionManager:
                     session.metadata["p_asserted_identity"] = pai
 
     async def _queue_waiting_inbound(self, line: str, session_id: str, channel_id: str) -> None:
-        async with self.lock:
-            queue = self.waiting_inbound.setdefault(line, deque())
-            queue.append((session_id, channel_id))
+        queue = self.waiting_inbound.setdefault(line, deque())
+        queue.append((session_id, channel_id))
 
     async def _get_header(self, channel_id: str, name: str) -> Optional[str]:
         """
@@ -692,36 +1144,36 @@ class SessionManager:
         )
 
     async def _remove_from_waiting(self, session_id: str) -> Optional[str]:
-        async with self.lock:
-            for line, queue in list(self.waiting_inbound.items()):
-                for sid, ch_id in list(queue):
-                    if sid == session_id:
-                        try:
-                            queue.remove((sid, ch_id))
-                        except ValueError:
-                            pass
-                        if not queue:
-                            del self.waiting_inbound[line]
-                        return line
+        for line, queue in list(self.waiting_inbound.items()):
+            for sid, ch_id in list(queue):
+                if sid == session_id:
+                    try:
+                        queue.remove((sid, ch_id))
+                    except ValueError:
+                        pass
+                    if not queue:
+                        del self.waiting_inbound[line]
+                    return line
         return None
 
     async def _try_start_waiting_inbound(self, line: str) -> None:
         if not self.dialer:
             return
         while True:
-            async with self.lock:
+            # Peek, promote and pop must happen as one step per line: two cleanups on the
+            # same line would otherwise both promote the same waiting caller.
+            async with self.line_locks.for_key(line):
                 queue = self.waiting_inbound.get(line)
                 item: Optional[Tuple[str, str]] = queue[0] if queue else None
-            if not item:
-                return
-            session_id, channel_id = item
-            promoted = await self.dialer.try_register_waiting_inbound(session_id, line)
-            if not promoted:
-                # Still full; keep waiting.
-                return
-            async with self.lock:
+                if not item:
+                    return
+                session_id, channel_id = item
+                promoted = await self.dialer.try_register_waiting_inbound(session_id, line)
+                if not promoted:
+                    # Still full; keep waiting.
+                    return
                 queue = self.waiting_inbound.get(line)
-                if queue and queue and queue[0][0] == session_id:
+                if queue and queue[0][0] == session_id:
                     queue.popleft()
                     if not queue:
                         del self.waiting_inbound[line]
@@ -731,7 +1183,7 @@ class SessionManager:
                 await self.dialer.on_session_completed(session_id)
                 continue
             async with session.lock:
-                session.metadata.pop("inbound_waiting", None)
+                session.state.inbound_waiting = False
                 session.status = SessionStatus.RINGING
             await self._accept_inbound(session, channel_id, None)
             return
@@ -816,29 +1268,27 @@ class SessionManager:
             async with session.lock:
                 leg.state = LegState.ANSWERED
                 session.status = SessionStatus.ACTIVE
+            if leg.direction == LegDirection.OUTBOUND and self.dialer:
+                await self.dialer.on_call_answered(session.session_id)
             if self.scenario_handler:
                 await self.scenario_handler.on_call_answered(session, leg)
 
     async def register_playback(self, session_id: str, playback_id: str) -> None:
-        async with self.lock:
-            self.playback_to_session[playback_id] = session_id
+        self._link_playback(session_id, playback_id)
 
     async def _get_session_by_playback(self, playback_id: str) -> Optional[Session]:
-        async with self.lock:
-            session_id = self.playback_to_session.get(playback_id)
-            if session_id:
-                return self.sessions.get(session_id)
+        session_id = self.playback_to_session.get(playback_id)
+        if session_id:
+            return self.sessions.get(session_id)
         return None
 
     async def register_recording(self, session_id: str, recording_name: str) -> None:
-        async with self.lock:
-            self.recording_to_session[recording_name] = session_id
+        self._link_recording(session_id, recording_name)
 
     async def _get_session_by_recording(self, recording_name: str) -> Optional[Session]:
-        async with self.lock:
-            session_id = self.recording_to_session.get(recording_name)
-            if session_id:
-                return self.sessions.get(session_id)
+        session_id = self.recording_to_session.get(recording_name)
+        if session_id:
+            return self.sessions.get(session_id)
         return None
 
     async def _handle_recording_finished(self, event: dict) -> None:
@@ -0,0 +1,363 @@
+import json
+import logging
+from abc import ABC, abstractmethod
+import socket
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from sessions.session import (
+    BridgeInfo,
+    CallLeg,
+    LegDirection,
+    LegState,
+    Session,
+    SessionState,
+    SessionStatus,
+)
+from utils.resp import RespClient, RespError
+
+
+logger = logging.getLogger(__name__)
+
+# upserts: session_id -> (record, channel ids it owns); deletes: session_id -> channel ids
+Upserts = Dict[str, Tuple[Dict[str, Any], List[str]]]
+Deletes = Dict[str, List[str]]
+
+
+def _leg_to_record(leg: Optional[CallLeg]) -> Optional[Dict[str, Any]]:
+    if leg is None:
+        return None
+    return {
+        "channel_id": leg.channel_id,
+        "direction": leg.direction.value,
+        "endpoint": leg.endpoint,
+        "state": leg.state.value,
+        "variables": leg.variables,
+    }
+
+
+def _leg_from_record(data: Optional[Dict[str, Any]]) -> Optional[CallLeg]:
+    if not data:
+        return None
+    return CallLeg(
+        channel_id=data["channel_id"],
+        direction=LegDirection(data["direction"]),
+        endpoint=data.get("endpoint", ""),
+        state=LegState(data.get("state", LegState.CREATED.value)),
+        variables=data.get("variables") or {},
+    )
+
+
+def session_to_record(session: Session, keys: Optional[Dict[str, List[str]]] = None) -> Dict[str, Any]:
+    """
+    JSON-safe snapshot of a session. `keys` carries the playback/recording/protocol ids
+    the session owns so a restoring process can rebuild its lookup indexes.
+    """
+    bridge = session.bridge
+    return {
+        "session_id": session.session_id,
+        "status": session.status.value,
+        "bridge": (
+            {"bridge_id": bridge.bridge_id, "bridge_type": bridge.bridge_type, "channels": bridge.channels}
+            if bridge
+            else None
+        ),
+        "inbound_leg": _leg_to_record(session.inbound_leg),
+        "outbound_leg": _leg_to_record(session.outbound_leg),
+        "operator_leg": _leg_to_record(session.operator_leg),
+        "state": {name: getattr(session.state, name) for name in SessionState.__slots__},
+        "metadata": session.metadata,
+        "playbacks": session.playbacks,
+        "responses": session.responses,
+        "result": session.result,
+        "processed_recordings": sorted(session.processed_recordings),
+        "keys": keys or {},
+    }
+
+
+def session_from_record(data: Dict[str, Any]) -> Session:
+    bridge_data = data.get("bridge")
+    state = SessionState()
+    for name, value in (data.get("state") or {}).items():
+        if name in SessionState.__slots__:
+            setattr(state, name, tuple(value) if name == "alo_played" else value)
+    return Session(
+        session_id=data["session_id"],
+        bridge=BridgeInfo(**bridge_data) if bridge_data else None,
+        inbound_leg=_leg_from_record(data.get("inbound_leg")),
+        outbound_leg=_leg_from_record(data.get("outbound_leg")),
+        operator_leg=_leg_from_record(data.get("operator_leg")),
+        status=SessionStatus(data.get("status", SessionStatus.INITIATING.value)),
+        state=state,
+        metadata=data.get("metadata") or {},
+        playbacks=data.get("playbacks") or {},
+        responses=data.get("responses") or [],
+        result=data.get("result"),
+        processed_recordings=set(data.get("processed_recordings") or ()),
+    )
+
+
+class SessionStore(ABC):
+    """
+    Shared storage for in-flight sessions and the channel -> session index.
+
+    Each session is owned by one engine (`engine_id`). Ownership is a short-lived claim
+    the owner keeps renewing; when an engine dies its claims expire and another engine
+    (or the same one after a restart) can take the calls over. Writes and renewals
+    only touch sessions this engine still owns, so an engine that lost a claim (a
+    pause, a network blip) cannot overwrite the new owner's state.
+    """
+
+    def __init__(self, engine_id: str, ttl: int = 3600, owner_ttl: int = 30):
+        self.engine_id = engine_id
+        self.ttl = ttl
+        self.owner_ttl = owner_ttl
+
+    @abstractmethod
+    async def write(self, upserts: Upserts, deletes: Deletes) -> None:
+        """
+        Persist new/changed sessions (claiming unowned ones for this engine) and drop
+        finished ones; sessions another engine owns are left alone.
+        """
+
+    @abstractmethod
+    async def renew(self, session_ids: List[str]) -> None:
+        """Extend this engine's claims on live sessions (ones it still holds)."""
+
+    @abstractmethod
+    async def claim(self, session_id: str) -> bool:
+        """Take ownership if nobody holds it (or we already do)."""
+
+    @abstractmethod
+    async def lookup_channel(self, channel_id: str) -> Optional[str]:
+        """Session id the channel belongs to, if any."""
+
+    @abstractmethod
+    async def load(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Stored record of a session, if any."""
+
+    @abstractmethod
+    async def load_owned(self) -> List[Dict[str, Any]]:
+        """Sessions this engine owned (or that were left unowned) when it last ran."""
+
+    async def close(self) -> None:
+        return None
+
+    def _log_lost(self, session_ids: List[str]) -> None:
+        if session_ids:
+            logger.warning(
+                "Session store: not writing %d session(s) now owned by another engine: %s",
+                len(session_ids),
+                ", ".join(sorted(session_ids)[:5]),
+            )
+
+
+class InMemorySessionStore(SessionStore):
+    """
+    Process-local store. Keeps serialized copies, so several SessionManagers in one
+    process (replays, local experiments) can share and hand over calls.
+    """
+
+    def __init__(self, engine_id: str, ttl: int = 3600, owner_ttl: int = 30):
+        super().__init__(engine_id, ttl, owner_ttl)
+        self.records: Dict[str, str] = {}
+        self.channels: Dict[str, str] = {}
+        # session_id -> (engine_id, expires_at)
+        self.owners: Dict[str, Tuple[str, float]] = {}
+
+    def _owner(self, session_id: str) -> Optional[str]:
+        owner = self.owners.get(session_id)
+        if owner and owner[1] > time.monotonic():
+            return owner[0]
+        return None
+
+    async def write(self, upserts: Upserts, deletes: Deletes) -> None:
+        expires = time.monotonic() + self.owner_ttl
+        lost: List[str] = []
+        for session_id, (record, channels) in upserts.items():
+            if self._owner(session_id) not in (None, self.engine_id):
+                lost.append(session_id)
+                continue
+            self.records[session_id] = json.dumps(record, ensure_ascii=False)
+            self.owners[session_id] = (self.engine_id, expires)
+            for channel_id in channels:
+                self.channels[channel_id] = session_id
+        for session_id, channels in deletes.items():
+            if self._owner(session_id) not in (None, self.engine_id):
+                lost.append(session_id)
+                continue
+            self.records.pop(session_id, None)
+            self.owners.pop(session_id, None)
+            for channel_id in channels:
+                if self.channels.get(channel_id) == session_id:
+                    del self.channels[channel_id]
+        self._log_lost(lost)
+
+    async def renew(self, session_ids: List[str]) -> None:
+        expires = time.monotonic() + self.owner_ttl
+        for session_id in session_ids:
+            if self._owner(session_id) == self.engine_id:
+                self.owners[session_id] = (self.engine_id, expires)
+
+    async def claim(self, session_id: str) -> bool:
+        owner = self._owner(session_id)
+        if owner not in (None, self.engine_id):
+            return False
+        self.owners[session_id] = (self.engine_id, time.monotonic() + self.owner_ttl)
+        return True
+
+    async def lookup_channel(self, channel_id: str) -> Optional[str]:
+        return self.channels.get(channel_id)
+
+    async def load(self, session_id: str) -> Optional[Dict[str, Any]]:
+        raw = self.records.get(session_id)
+        return json.loads(raw) if raw else None
+
+    async def load_owned(self) -> List[Dict[str, Any]]:
+        records = []
+        for session_id in list(self.records):
+            if await self.claim(session_id):
+                records.append(json.loads(self.records[session_id]))
+        return records
+
+
+class RedisSessionStore(SessionStore):
+    """
+    Redis-protocol store. Keys (prefix defaults to "smartcall"):
+      <p>:session:<id>   JSON record, expires after `ttl`
+      <p>:owner:<id>     owning engine id, expires after `owner_ttl` unless renewed
+      <p>:channel:<ch>   session id for an ARI channel, expires after `ttl`
+      <p>:engine:<eid>   set of session ids an engine has written
+    """
+
+    def __init__(
+        self,
+        url: str,
+        engine_id: str,
+        ttl: int = 3600,
+        owner_ttl: int = 30,
+        prefix: str = "smartcall",
+    ):
+        super().__init__(engine_id, ttl, owner_ttl)
+        self.client = RespClient(url)
+        self.prefix = prefix
+
+    def _key(self, kind: str, ident: str) -> str:
+        return f"{self.prefix}:{kind}:{ident}"
+
+    async def write(self, upserts: Upserts, deletes: Deletes) -> None:
+        engine_key = self._key("engine", self.engine_id)
+        owned = await self._claim_all([*upserts, *deletes])
+        lost = [sid for sid in [*upserts, *deletes] if sid not in owned]
+        commands: List[Tuple[Any, ...]] = []
+        for session_id, (record, channels) in upserts.items():
+            if session_id not in owned:
+                continue
+            commands.append(("SET", self._key("session", session_id), json.dumps(record, ensure_ascii=False), "EX", self.ttl))
+            commands.append(("EXPIRE", self._key("owner", session_id), self.owner_ttl))
+            for channel_id in channels:
+                commands.append(("SET", self._key("channel", channel_id), session_id, "EX", self.ttl))
+        written = [sid for sid in upserts if sid in owned]
+        if written:
+            commands.append(("SADD", engine_key, *written))
+        for session_id, channels in deletes.items():
+            if session_id not in owned:
+                continue
+            commands.append(("DEL", self._key("session", session_id), self._key("owner", session_id)))
+            if channels:
+                commands.append(("DEL", *(self._key("channel", c) for c in channels)))
+        if deletes or lost:
+            # Finished here, or taken over by another engine: either way no longer ours.
+            commands.append(("SREM", engine_key, *{*deletes, *lost}))
+        self._log_lost(lost)
+        if commands:
+            self._log_errors(await self.client.pipeline(commands), "write")
+
+    async def _claim_all(self, session_ids: List[str]) -> Set[str]:
+        """
+        The subset of `session_ids` this engine owns, claiming unowned ones on the way.
+        GET-compare in one round trip (no Lua, so the local stand-in server works too);
+        what is left is a window of one round trip, well inside `owner_ttl`.
+        """
+        if not session_ids:
+            return set()
+        commands: List[Tuple[Any, ...]] = []
+        for session_id in session_ids:
+            owner_key = self._key("owner", session_id)
+            commands.append(("SET", owner_key, self.engine_id, "NX", "EX", self.owner_ttl))
+            commands.append(("GET", owner_key))
+        replies = await self.client.pipeline(commands)
+        return {sid for sid, owner in zip(session_ids, replies[1::2]) if owner == self.engine_id}
+
+    async def renew(self, session_ids: List[str]) -> None:
+        if not session_ids:
+            return
+        owners = await self.client.pipeline([("GET", self._key("owner", sid)) for sid in session_ids])
+        commands = [
+            ("EXPIRE", self._key("owner", sid), self.owner_ttl)
+            for sid, owner in zip(session_ids, owners)
+            if owner == self.engine_id
+        ]
+        if commands:
+            self._log_errors(await self.client.pipeline(commands), "renew")
+
+    async def claim(self, session_id: str) -> bool:
+        if not await self._claim_all([session_id]):
+            return False
+        await self.client.execute("SADD", self._key("engine", self.engine_id), session_id)
+        return True
+
+    async def lookup_channel(self, channel_id: str) -> Optional[str]:
+        return await self.client.execute("GET", self._key("channel", channel_id))
+
+    async def load(self, session_id: str) -> Optional[Dict[str, Any]]:
+        raw = await self.client.execute("GET", self._key("session", session_id))
+        return json.loads(raw) if raw else None
+
+    async def load_owned(self) -> List[Dict[str, Any]]:
+        engine_key = self._key("engine", self.engine_id)
+        session_ids = await self.client.execute("SMEMBERS", engine_key) or []
+        records: List[Dict[str, Any]] = []
+        stale: List[str] = []
+        for session_id in session_ids:
+            record = await self.load(session_id)
+            if record is None or not await self.claim(session_id):
+                # Finished meanwhile, or another engine already took it over.
+                stale.append(session_id)
+                continue
+            records.append(record)
+        if stale:
+            await self.client.execute("SREM", engine_key, *stale)
+        return records
+
+    def _log_errors(self, replies: List[Any], op: str) -> None:
+        errors = [r for r in replies if isinstance(r, RespError)]
+        if errors:
+            logger.warning("Session store %s: %d command(s) failed, first: %s", op, len(errors), errors[0])
+
+    async def close(self) -> None:
+        await self.client.close()
+
+
+def default_engine_id() -> str:
+    # Stable across restarts on the same host so a restarted engine finds its own calls.
+    return socket.gethostname()
+
+
+def build_session_store(
+    backend: str,
+    url: str = "",
+    engine_id: str = "",
+    ttl: int = 3600,
+    owner_ttl: int = 30,
+) -> Optional[SessionStore]:
+    backend = (backend or "").lower()
+    engine_id = engine_id or default_engine_id()
+    if backend in ("", "none", "off"):
+        return None
+    if backend == "memory":
+        return InMemorySessionStore(engine_id, ttl=ttl, owner_ttl=owner_ttl)
+    if backend == "redis":
+        return RedisSessionStore(url, engine_id, ttl=ttl, owner_ttl=owner_ttl)
+    logger.warning("Unknown SESSION_STORE=%s; sessions will not be persisted", backend)
+    return None
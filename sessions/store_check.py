@@ -0,0 +1,167 @@
+"""
+Check the session store backends against each other's claims, without Redis: the
+Redis backend runs against the local stand-in server (utils/resp_server.py) on a
+free port.
+
+Usage:
+    python -m sessions.store_check              # both backends
+    python -m sessions.store_check --backend redis
+
+Exits non-zero if any check fails.
+"""
+import argparse
+import asyncio
+import logging
+import sys
+from typing import Any, Dict, List, Tuple
+
+from core.replay import FakeAriClient
+from logic.base import BaseScenario
+from sessions.session_manager import SessionManager
+from sessions.store import InMemorySessionStore, RedisSessionStore, SessionStore
+from utils.resp_server import RespServer
+
+
+# Short enough to watch a claim expire, long enough for a few round trips.
+OWNER_TTL = 1
+
+
+def _record(session_id: str, note: str) -> Tuple[Dict[str, Any], List[str]]:
+    return {"session_id": session_id, "note": note}, [f"{session_id}-ch"]
+
+
+class StoreCheck:
+    def __init__(self, backend: str):
+        self.backend = backend
+        self.failures: List[str] = []
+
+    def check(self, ok: bool, what: str) -> None:
+        if not ok:
+            self.failures.append(what)
+        print(f"  [{'ok' if ok else 'FAIL'}] {self.backend}: {what}")
+
+    async def run(self, make) -> None:
+        a: SessionStore = make("engine-a")
+        b: SessionStore = make("engine-b")
+        try:
+            # Claim: the first writer owns the session; the other engine can neither claim,
+            # overwrite nor renew it.
+            await a.write({"s1": _record("s1", "a")}, {})
+            self.check(await a.claim("s1"), "owner re-claims its own session")
+            self.check(not await b.claim("s1"), "claim held by another engine is refused")
+            await b.write({"s1": _record("s1", "b")}, {})
+            self.check((await a.load("s1") or {}).get("note") == "a", "write by a non-owner is dropped")
+
+            # Lookup from any engine.
+            self.check(await b.lookup_channel("s1-ch") == "s1", "channel lookup finds the session")
+            self.check(await b.lookup_channel("unknown-ch") is None, "unknown channel looks up to None")
+
+            # Takeover once the owner stops renewing; the old owner is then locked out.
+            await b.renew(["s1"])
+            await asyncio.sleep(OWNER_TTL + 0.2)
+            self.check(await b.claim("s1"), "claim is taken over after owner_ttl")
+            await a.write({"s1": _record("s1", "a-late")}, {})
+            await a.renew(["s1"])
+            self.check((await b.load("s1") or {}).get("note") == "a", "stale owner's write-behind flush is dropped")
+            self.check(not await a.claim("s1"), "stale owner's renew does not win the claim back")
+            await a.write({}, {"s1": ["s1-ch"]})
+            self.check(await b.load("s1") is not None, "stale owner cannot delete the session")
+
+            # Delete by the owner clears the record and its channel index.
+            await b.write({}, {"s1": ["s1-ch"]})
+            self.check(await b.load("s1") is None, "delete removes the record")
+            self.check(await a.lookup_channel("s1-ch") is None, "delete removes the channel index")
+
+            # load_owned: a restarted engine (same id) gets back its own sessions only.
+            await a.write({"s2": _record("s2", "a"), "s3": _record("s3", "a")}, {})
+            await b.write({"s4": _record("s4", "b")}, {})
+            restarted = make("engine-a")
+            owned = sorted(r["session_id"] for r in await restarted.load_owned())
+            self.check(owned == ["s2", "s3"], f"load_owned returns the engine's own sessions ({owned})")
+            if restarted is not a:
+                await restarted.close()
+        finally:
+            await a.close()
+            await b.close()
+        await self.run_managers(make)
+
+    async def run_managers(self, make) -> None:
+        # Two engines on one ARI app both receive every StasisStart; only the session's
+        # owner may bridge and drive the call.
+        ari_a, ari_b = FakeAriClient(), FakeAriClient()
+        a, b = SessionManager(ari_a, BaseScenario()), SessionManager(ari_b, BaseScenario())
+        a.attach_store(make("engine-a"), flush_interval=60)
+        b.attach_store(make("engine-b"), flush_interval=60)
+        try:
+            session = await a.create_outbound_session("09120000001")
+            for manager in (a, b):
+                await manager.handle_event(
+                    {"type": "StasisStart", "channel": {"id": "m1-ch"}, "args": ["outbound", session.session_id]}
+                )
+                await manager.handle_event(
+                    {"type": "StasisStart", "channel": {"id": "m1-op"}, "args": ["operator", session.session_id]}
+                )
+            self.check(a.channel_to_session.get("m1-ch") == session.session_id, "owning manager handles its StasisStart")
+            self.check(
+                session.session_id not in b.sessions and not ari_b.calls,
+                f"other manager leaves the owned call alone (ARI calls: {dict(ari_b.calls)})",
+            )
+            # A call nobody claimed yet (e.g. inbound) goes to the first engine to claim it.
+            inbound = {"type": "StasisStart", "channel": {"id": "m2-in"}, "args": []}
+            await b.handle_event(inbound)
+            await a.handle_event(inbound)
+            self.check("m2-in" in b.sessions and "m2-in" not in a.sessions, "unclaimed call goes to the first claimer")
+        finally:
+            await a.close_store()
+            await b.close_store()
+
+
+async def check_memory() -> List[str]:
+    shared: Dict[str, Any] = {}
+
+    def make(engine_id: str) -> SessionStore:
+        store = InMemorySessionStore(engine_id, owner_ttl=OWNER_TTL)
+        # Engines in one process share the maps, as they would share a Redis.
+        if shared:
+            store.records, store.channels, store.owners = shared["records"], shared["channels"], shared["owners"]
+        else:
+            shared.update(records=store.records, channels=store.channels, owners=store.owners)
+        return store
+
+    check = StoreCheck("memory")
+    await check.run(make)
+    return check.failures
+
+
+async def check_redis() -> List[str]:
+    server = await RespServer().serve("127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    check = StoreCheck("redis")
+    try:
+        await check.run(lambda engine_id: RedisSessionStore(f"redis://127.0.0.1:{port}/0", engine_id, owner_ttl=OWNER_TTL))
+    finally:
+        server.close()
+        await server.wait_closed()
+    return check.failures
+
+
+async def _main(backends: List[str]) -> int:
+    failures: List[str] = []
+    if "memory" in backends:
+        failures += await check_memory()
+    if "redis" in backends:
+        failures += await check_redis()
+    print(f"{len(failures)} failure(s)")
+    return 1 if failures else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Check the session store backends.")
+    parser.add_argument("--backend", choices=["memory", "redis"], action="append")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.ERROR)
+    sys.exit(asyncio.run(_main(args.backend or ["memory", "redis"])))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+class Journal:
+    """
+    Append-only JSON-lines journal for crash recovery.
+
+    `append` only buffers the record; a background task writes the buffer and fsyncs
+    once per `fsync_interval` (group commit), so callers never block on disk. After
+    `compact_every` records the log is rewritten from `snapshot()` — the owners'
+    current state expressed as ordinary records — via write-to-temp + atomic rename,
+    which keeps replay time bounded.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        fsync_interval: float = 0.05,
+        compact_every: int = 5000,
+        snapshot: Optional[Callable[[], List[Dict[str, Any]]]] = None,
+    ):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.fsync_interval = fsync_interval
+        self.compact_every = compact_every
+        self.snapshot = snapshot
+        self.records_since_compact = 0
+        self.fsyncs = 0
+        self.compactions = 0
+        self._buffer: List[str] = []
+        self._file = None
+        self._wakeup = asyncio.Event()
+        self._closing = False
+        self._task: Optional[asyncio.Task] = None
+
+    def load(self) -> List[Dict[str, Any]]:
+        """Read every intact record; a torn last line (crash mid-write) is ignored."""
+        if not self.path.exists():
+            return []
+        started = time.perf_counter()
+        records: List[Dict[str, Any]] = []
+        with open(self.path, "r", encoding="utf-8") as handle:
+            for line in handle:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    logger.warning("Ignoring torn journal record in %s", self.path)
+        self.records_since_compact = len(records)
+        logger.info(
+            "Loaded %d journal record(s) from %s in %.1fms",
+            len(records),
+            self.path,
+            (time.perf_counter() - started) * 1000,
+        )
+        return records
+
+    def append(self, kind: str, **data: Any) -> None:
+        data["k"] = kind
+        self._buffer.append(json.dumps(data, ensure_ascii=False, separators=(",", ":")) + "\n")
+        self.records_since_compact += 1
+        if len(self._buffer) == 1:
+            self._wakeup.set()
+
+    def start(self) -> None:
+        if self._task is None:
+            # compact() may already have opened the log (main.py compacts before start).
+            if self._file is None:
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        if self._task:
+            # Let an in-flight write/compaction finish rather than cancelling it mid-rename.
+            self._closing = True
+            self._wakeup.set()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._file:
+            await self._flush()
+            self._file.close()
+            self._file = None
+
+    async def _run(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            if self._closing:
+                return
+            # Let concurrent appends pile up so one fsync covers them all.
+            await asyncio.sleep(self.fsync_interval)
+            try:
+                if self.snapshot and self.records_since_compact >= self.compact_every:
+                    await self.compact()
+                else:
+                    await self._flush()
+            except Exception as exc:
+                logger.warning("Journal write failed (%s); will retry: %s", self.path, exc)
+                self._wakeup.set()
+
+    async def _flush(self) -> None:
+        if not self._buffer or self._file is None:
+            return
+        pending, self._buffer = self._buffer, []
+        try:
+            await asyncio.to_thread(self._write_sync, self._file, "".join(pending))
+        except Exception:
+            self._buffer = pending + self._buffer
+            raise
+        self.fsyncs += 1
+
+    @staticmethod
+    def _write_sync(handle, chunk: str) -> None:
+        handle.write(chunk)
+        handle.flush()
+        os.fsync(handle.fileno())
+
+    async def compact(self) -> None:
+        """Replace the log with a snapshot of current state."""
+        if self.snapshot is None:
+            return
+        # Snapshot and buffer swap happen together on the loop: buffered records are
+        # already reflected in the snapshot, later ones go to the new file.
+        records = self.snapshot()
+        pending, self._buffer = self._buffer, []
+        chunk = "".join(json.dumps(r, ensure_ascii=False, separators=(",", ":")) + "\n" for r in records)
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        started = time.perf_counter()
+        try:
+            await asyncio.to_thread(self._replace_sync, tmp, chunk)
+        except Exception:
+            # The old log is still intact; keep appending to it.
+            self._buffer = pending + self._buffer
+            raise
+        if self._file:
+            self._file.close()
+        self._file = open(self.path, "a", encoding="utf-8")
+        self.records_since_compact = len(records)
+        self.compactions += 1
+        logger.info(
+            "Compacted journal %s to %d record(s) in %.1fms",
+            self.path,
+            len(records),
+            (time.perf_counter() - started) * 1000,
+        )
+
+    def _replace_sync(self, tmp: Path, chunk: str) -> None:
+        with open(tmp, "w", encoding="utf-8") as handle:
+            handle.write(chunk)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(tmp, self.path)
+        # Persist the rename itself.
+        dir_fd = os.open(self.path.parent, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
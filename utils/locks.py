@@ -0,0 +1,64 @@
+import asyncio
+import time
+import zlib
+from typing import Dict, List
+
+from utils.metrics import LatencyStats
+
+
+class InstrumentedLock:
+    """
+    asyncio.Lock that records how long callers waited to acquire it.
+    Uncontended acquisitions skip the clock entirely.
+    """
+
+    def __init__(self, name: str = "lock"):
+        self.name = name
+        self._lock = asyncio.Lock()
+        self.acquisitions = 0
+        self.contended = 0
+        self.wait = LatencyStats()
+
+    async def __aenter__(self) -> "InstrumentedLock":
+        self.acquisitions += 1
+        if not self._lock.locked():
+            await self._lock.acquire()
+            return self
+        self.contended += 1
+        started = time.perf_counter()
+        await self._lock.acquire()
+        self.wait.observe(time.perf_counter() - started)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self._lock.release()
+
+    def locked(self) -> bool:
+        return self._lock.locked()
+
+
+class ShardedLock:
+    """
+    Fixed set of instrumented locks selected by key hash, for multi-step mutations
+    that must be atomic per key (line, session) without serialising unrelated keys.
+    """
+
+    def __init__(self, shards: int = 16, name: str = "shard"):
+        self.shards: List[InstrumentedLock] = [InstrumentedLock(f"{name}[{i}]") for i in range(max(1, shards))]
+
+    def for_key(self, key: str) -> InstrumentedLock:
+        return self.shards[zlib.crc32(key.encode()) % len(self.shards)]
+
+    def stats(self) -> Dict[str, object]:
+        acquisitions = sum(lock.acquisitions for lock in self.shards)
+        contended = sum(lock.contended for lock in self.shards)
+        waits = [lock.wait for lock in self.shards if lock.wait.count]
+        total_wait = sum(w.total for w in waits)
+        return {
+            "shards": len(self.shards),
+            "acquisitions": acquisitions,
+            "contended": contended,
+            "wait_total_ms": round(total_wait * 1000, 3),
+            "wait_avg_ms": round(total_wait * 1000 / contended, 3) if contended else 0.0,
+            "wait_max_ms": round(max((w.max for w in waits), default=0.0) * 1000, 3),
+        }
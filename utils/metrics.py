@@ -0,0 +1,59 @@
+import time
+from collections import deque
+from typing import Callable, Deque, Dict
+
+
+class LatencyStats:
+    """
+    Running count/avg/max for a latency series (seconds).
+    """
+
+    __slots__ = ("count", "total", "max", "last")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.last = value
+        if value > self.max:
+            self.max = value
+
+    def snapshot(self) -> Dict[str, float]:
+        avg = self.total / self.count if self.count else 0.0
+        return {
+            "count": self.count,
+            "avg_ms": round(avg * 1000, 3),
+            "max_ms": round(self.max * 1000, 3),
+            "last_ms": round(self.last * 1000, 3),
+        }
+
+
+class RateMeter:
+    """
+    Events per second over a sliding window (monotonic clock).
+    """
+
+    __slots__ = ("window", "events", "started", "clock")
+
+    def __init__(self, window: float = 60.0, clock: Callable[[], float] = time.monotonic) -> None:
+        self.window = window
+        self.events: Deque[float] = deque()
+        self.started = clock()
+        self.clock = clock
+
+    def observe(self) -> None:
+        self.events.append(self.clock())
+
+    def rate(self) -> float:
+        now = self.clock()
+        cutoff = now - self.window
+        while self.events and self.events[0] < cutoff:
+            self.events.popleft()
+        # Until a full window has passed, average over the time actually observed.
+        span = min(self.window, max(now - self.started, 1.0))
+        return len(self.events) / span
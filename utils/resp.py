@@ -0,0 +1,131 @@
+import asyncio
+import logging
+from typing import Any, List, Optional, Sequence
+from urllib.parse import unquote, urlparse
+
+
+logger = logging.getLogger(__name__)
+
+
+class RespError(Exception):
+    """Error reply (`-ERR ...`) from a Redis-protocol server."""
+
+
+def encode_command(args: Sequence[Any]) -> bytes:
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if isinstance(arg, bytes):
+            data = arg
+        else:
+            data = str(arg).encode()
+        parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+    return b"".join(parts)
+
+
+async def read_reply(reader: asyncio.StreamReader) -> Any:
+    """
+    Read one RESP2 reply. Bulk strings are returned as str; error replies are returned
+    (not raised) as RespError so a pipeline can carry on past them.
+    """
+    line = await reader.readline()
+    if not line:
+        raise ConnectionError("connection closed by server")
+    kind, payload = line[:1], line[1:-2]
+    if kind == b"+":
+        return payload.decode()
+    if kind == b"-":
+        return RespError(payload.decode())
+    if kind == b":":
+        return int(payload)
+    if kind == b"$":
+        length = int(payload)
+        if length < 0:
+            return None
+        data = await reader.readexactly(length + 2)
+        return data[:-2].decode()
+    if kind == b"*":
+        count = int(payload)
+        if count < 0:
+            return None
+        return [await read_reply(reader) for _ in range(count)]
+    raise ConnectionError(f"unexpected RESP reply: {line!r}")
+
+
+class RespClient:
+    """
+    Minimal asyncio Redis-protocol client (one connection, pipelined requests).
+    URL form: redis://[:password@]host[:port][/db]
+    """
+
+    def __init__(self, url: str, timeout: float = 5.0):
+        parsed = urlparse(url or "redis://127.0.0.1:6379/0")
+        self.host = parsed.hostname or "127.0.0.1"
+        self.port = parsed.port or 6379
+        self.password = unquote(parsed.password) if parsed.password else None
+        path = (parsed.path or "").lstrip("/")
+        self.db = int(path) if path.isdigit() else 0
+        self.timeout = timeout
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._lock = asyncio.Lock()
+
+    async def _connect(self) -> None:
+        self._reader, self._writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), timeout=self.timeout
+        )
+        handshake: List[Sequence[Any]] = []
+        if self.password:
+            handshake.append(("AUTH", self.password))
+        if self.db:
+            handshake.append(("SELECT", self.db))
+        for reply in await self._roundtrip(handshake):
+            if isinstance(reply, RespError):
+                raise reply
+        logger.info("Connected to session store at %s:%s/%s", self.host, self.port, self.db)
+
+    async def _roundtrip(self, commands: List[Sequence[Any]]) -> List[Any]:
+        if not commands:
+            return []
+        assert self._writer and self._reader
+        self._writer.write(b"".join(encode_command(cmd) for cmd in commands))
+        await self._writer.drain()
+        return [
+            await asyncio.wait_for(read_reply(self._reader), timeout=self.timeout) for _ in commands
+        ]
+
+    async def pipeline(self, commands: List[Sequence[Any]]) -> List[Any]:
+        """
+        Send all commands in one write and read the replies in order.
+        Reconnects once if the connection dropped.
+        """
+        async with self._lock:
+            for attempt in (1, 2):
+                try:
+                    if self._writer is None:
+                        await self._connect()
+                    return await self._roundtrip(commands)
+                except (ConnectionError, OSError, asyncio.IncompleteReadError, asyncio.TimeoutError) as exc:
+                    await self._drop()
+                    if attempt == 2:
+                        raise ConnectionError(f"session store unreachable: {exc}") from exc
+                    logger.warning("Session store connection lost (%s); reconnecting", exc)
+        return []
+
+    async def execute(self, *args: Any) -> Any:
+        reply = (await self.pipeline([args]))[0]
+        if isinstance(reply, RespError):
+            raise reply
+        return reply
+
+    async def _drop(self) -> None:
+        writer, self._writer, self._reader = self._writer, None, None
+        if writer is not None:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except Exception:
+                pass
+
+    async def close(self) -> None:
+        async with self._lock:
+            await self._drop()
@@ -0,0 +1,215 @@
+"""
+Local stand-in for a Redis server, for development and for exercising the session store
+without a real Redis. Implements only the commands RedisSessionStore uses.
+
+    python -m utils.resp_server --port 6390
+    SESSION_STORE=redis SESSION_STORE_URL=redis://127.0.0.1:6390/0 python main.py
+
+Not for production: single process, no persistence beyond the process lifetime.
+"""
+import argparse
+import asyncio
+import fnmatch
+import logging
+import time
+from typing import Any, Dict, List, Optional, Set, Union
+
+from utils.resp import RespError, encode_command
+
+
+logger = logging.getLogger(__name__)
+
+Value = Union[str, Set[str]]
+
+
+def _encode_reply(value: Any) -> bytes:
+    if value is None:
+        return b"$-1\r\n"
+    if isinstance(value, RespError):
+        return b"-%s\r\n" % str(value).encode()
+    if isinstance(value, bool):
+        return b":%d\r\n" % int(value)
+    if isinstance(value, int):
+        return b":%d\r\n" % value
+    if isinstance(value, (list, tuple, set)):
+        return encode_command(list(value))
+    if value == "OK" or value == "PONG":
+        return b"+%s\r\n" % value.encode()
+    data = str(value).encode()
+    return b"$%d\r\n%s\r\n" % (len(data), data)
+
+
+class RespServer:
+    def __init__(self) -> None:
+        self.data: Dict[str, Value] = {}
+        self.expires: Dict[str, float] = {}
+
+    # Keyspace -----------------------------------------------------------
+    def _alive(self, key: str) -> bool:
+        deadline = self.expires.get(key)
+        if deadline is not None and deadline <= time.monotonic():
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return key in self.data
+
+    def _get(self, key: str) -> Optional[Value]:
+        return self.data.get(key) if self._alive(key) else None
+
+    def _set_of(self, key: str) -> Optional[Set[str]]:
+        value = self._get(key)
+        if value is None:
+            return None
+        if not isinstance(value, set):
+            raise RespError("WRONGTYPE Operation against a key holding the wrong kind of value")
+        return value
+
+    # Commands -----------------------------------------------------------
+    def cmd_ping(self, args: List[str]) -> Any:
+        return args[0] if args else "PONG"
+
+    def cmd_auth(self, args: List[str]) -> Any:
+        return "OK"
+
+    def cmd_select(self, args: List[str]) -> Any:
+        return "OK"
+
+    def cmd_get(self, args: List[str]) -> Any:
+        value = self._get(args[0])
+        if isinstance(value, set):
+            raise RespError("WRONGTYPE Operation against a key holding the wrong kind of value")
+        return value
+
+    def cmd_set(self, args: List[str]) -> Any:
+        key, value, options = args[0], args[1], [a.upper() for a in args[2:]]
+        ttl: Optional[float] = None
+        for idx, opt in enumerate(options):
+            if opt == "EX":
+                ttl = float(args[3 + idx])
+            elif opt == "PX":
+                ttl = float(args[3 + idx]) / 1000.0
+        exists = self._alive(key)
+        if ("NX" in options and exists) or ("XX" in options and not exists):
+            return None
+        self.data[key] = value
+        if ttl is not None:
+            self.expires[key] = time.monotonic() + ttl
+        else:
+            self.expires.pop(key, None)
+        return "OK"
+
+    def cmd_del(self, args: List[str]) -> Any:
+        removed = 0
+        for key in args:
+            if self._alive(key):
+                removed += 1
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return removed
+
+    def cmd_exists(self, args: List[str]) -> Any:
+        return sum(1 for key in args if self._alive(key))
+
+    def cmd_expire(self, args: List[str]) -> Any:
+        if not self._alive(args[0]):
+            return 0
+        self.expires[args[0]] = time.monotonic() + float(args[1])
+        return 1
+
+    def cmd_ttl(self, args: List[str]) -> Any:
+        if not self._alive(args[0]):
+            return -2
+        deadline = self.expires.get(args[0])
+        return -1 if deadline is None else int(deadline - time.monotonic())
+
+    def cmd_sadd(self, args: List[str]) -> Any:
+        members = self._set_of(args[0])
+        if members is None:
+            members = self.data[args[0]] = set()
+        before = len(members)
+        members.update(args[1:])
+        return len(members) - before
+
+    def cmd_srem(self, args: List[str]) -> Any:
+        members = self._set_of(args[0])
+        if not members:
+            return 0
+        before = len(members)
+        members.difference_update(args[1:])
+        if not members:
+            self.cmd_del([args[0]])
+        return before - len(members)
+
+    def cmd_smembers(self, args: List[str]) -> Any:
+        return sorted(self._set_of(args[0]) or ())
+
+    def cmd_keys(self, args: List[str]) -> Any:
+        return [key for key in list(self.data) if self._alive(key) and fnmatch.fnmatchcase(key, args[0])]
+
+    def cmd_flushall(self, args: List[str]) -> Any:
+        self.data.clear()
+        self.expires.clear()
+        return "OK"
+
+    def dispatch(self, command: List[str]) -> Any:
+        handler = getattr(self, f"cmd_{command[0].lower()}", None)
+        if handler is None:
+            return RespError(f"ERR unknown command '{command[0]}'")
+        try:
+            return handler(command[1:])
+        except RespError as exc:
+            return exc
+        except (IndexError, ValueError):
+            return RespError(f"ERR wrong arguments for '{command[0]}' command")
+
+    # Network ------------------------------------------------------------
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                header = await reader.readline()
+                if not header:
+                    break
+                if not header.startswith(b"*"):
+                    command = header.decode().split()
+                else:
+                    command = []
+                    for _ in range(int(header[1:-2])):
+                        length = int((await reader.readline())[1:-2])
+                        command.append((await reader.readexactly(length + 2))[:-2].decode())
+                if not command:
+                    continue
+                if command[0].upper() == "QUIT":
+                    writer.write(b"+OK\r\n")
+                    break
+                writer.write(_encode_reply(self.dispatch(command)))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 6390) -> asyncio.AbstractServer:
+        server = await asyncio.start_server(self.handle_client, host, port)
+        logger.info("RESP stand-in listening on %s:%d", host, port)
+        return server
+
+
+async def _run(host: str, port: int) -> None:
+    server = await RespServer().serve(host, port)
+    async with server:
+        await server.serve_forever()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local Redis-protocol stand-in for the session store.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6390)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(_run(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()